@@ -0,0 +1,68 @@
+"""
+bench_headless.py
+-----------------
+Gain du mode headless : ticks/s d'une même bataille selon que get_state()
+est construit à chaque pas, une fois par frame accélérée (speed=5) ou jamais.
+
+    python -m benchmarks.bench_headless [N] [TICKS]
+"""
+import json
+import sys
+import time
+
+import numpy as np
+
+from src.ai import get_general
+from src.core.battle import Battle
+from src.core.scenario import lanchester_scenario
+from src.core.units import UnitType
+
+
+def build_battle(n: int, headless: bool) -> Battle:
+    np.random.seed(0)  # même carte pour chaque mode
+    players, world_map = lanchester_scenario(UnitType.KNIGHT, n, get_general("daft"), get_general("daft"))
+    return Battle(players, world_map, headless=headless)
+
+
+def ticks_per_second(n: int, ticks: int, headless: bool, speed: int, repeats: int = 3) -> float:
+    best = 0.0
+    for _ in range(repeats):
+        battle = build_battle(n, headless)
+        start = time.perf_counter()
+        while battle.step_count < ticks and not battle.finished:
+            battle.update(speed=speed)
+        best = max(best, battle.step_count / (time.perf_counter() - start))
+    return best
+
+
+def state_cost_us(n: int, calls: int = 200) -> float:
+    battle = build_battle(n, headless=True)
+    start = time.perf_counter()
+    for _ in range(calls):
+        battle.get_state()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 50
+    ticks = int(argv[1]) if len(argv) > 1 else 200
+
+    modes = {
+        "state_every_tick": ticks_per_second(n, ticks, headless=False, speed=1),
+        "state_every_5_ticks": ticks_per_second(n, ticks, headless=False, speed=5),
+        "headless": ticks_per_second(n, ticks, headless=True, speed=1),
+    }
+    base = modes["state_every_tick"]
+    report = {
+        "units": 3 * n,
+        "ticks": ticks,
+        "get_state_us": round(state_cost_us(n), 1),
+        "ticks_per_sec": {k: round(v, 1) for k, v in modes.items()},
+        "gain_vs_state_every_tick": {k: f"{(v / base - 1) * 100:+.1f}%" for k, v in modes.items()},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
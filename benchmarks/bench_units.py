@@ -0,0 +1,63 @@
+"""
+bench_units.py
+--------------
+Mémoire et coût de lecture des stats pour une grande population d'unités.
+
+    python -m benchmarks.bench_units [N]
+
+Affiche (en JSON) les octets par unité mesurés avec tracemalloc et le coût
+moyen d'une lecture de stat, via l'accesseur get_*() et via la fiche `stats`.
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from src.core.units import UnitType, create_unit
+
+TYPES = list(UnitType)
+
+
+def build_units(n: int):
+    return [create_unit(TYPES[i % len(TYPES)], float(i % 1000), float(i // 1000), None) for i in range(n)]
+
+
+def measure_memory(n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    units = build_units(n)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    del units
+    return allocated / n
+
+
+def measure_lookup(units, read) -> float:
+    start = time.perf_counter()
+    total = 0.0
+    for u in units:
+        total += read(u)
+    return (time.perf_counter() - start) / len(units) * 1e9
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 100_000
+
+    units = build_units(n)
+    report = {
+        "units": n,
+        "bytes_per_unit": round(measure_memory(n), 1),
+        "ns_per_lookup": {
+            "get_attack()": round(measure_lookup(units, lambda u: u.get_attack()), 1),
+            "stats.attack": round(measure_lookup(units, lambda u: u.stats.attack), 1),
+            "get_collision_radius()": round(measure_lookup(units, lambda u: u.get_collision_radius()), 1),
+            "stats.collision_radius": round(measure_lookup(units, lambda u: u.stats.collision_radius), 1),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,40 @@
-from .General import General
+import numpy as np
+
+from .General import General, BatchOrders, nearest_enemy_indices
 
 class Daft(General):
+    supports_batch = True
+
     def __init__(self):
         super().__init__("Daft")
 
+    def give_orders_batch(self, view):
+        """Version tableaux : argmin de la matrice des distances, hold sans ennemi."""
+        n = len(view)
+        if not len(view.enemies):
+            return BatchOrders(target=np.full(n, -1, dtype=np.int64), hold=np.ones(n, dtype=bool))
+        return BatchOrders(target=nearest_enemy_indices(view.x, view.y, view.ex, view.ey))
+
     def give_orders(self, current_player, all_players, map, units_needing_orders):
         orders = []
+        # Index des ennemis du tick (partagé par toutes les unités du général)
+        enemies = map.get_enemy_index(current_player, all_players)
         
         for unit in units_needing_orders:
-            # Cherche d'abord les ennemis en vue
-            enemies_in_sight = self.get_enemies_in_sight(unit, all_players)
-            
-            if enemies_in_sight:
-                closest_enemy = self.get_closest_enemy(unit, enemies_in_sight)
+            # Le plus proche en vue est aussi le plus proche de toute la carte :
+            # une seule requête couvre les deux cas
+            closest_enemy = enemies.nearest(unit.x, unit.y)
+            if closest_enemy:
                 # DONNER DIRECTEMENT UN ORDRE 'attack' : l'unité se déplacera si nécessaire
                 order = {'type': 'attack', 'unit': unit, 'target': closest_enemy}
             else:
-                # Cherche l'ennemi le plus proche sur toute la carte
-                all_enemies = self.get_all_enemies(unit, all_players)
-                closest_enemy = self.get_closest_enemy(unit, all_enemies)
-                if closest_enemy:
-                    # attaquer une cible lointaine (l'unité avancera)
-                    order = {'type': 'attack', 'unit': unit, 'target': closest_enemy}
-                else:
-                    order = {'type': 'hold', 'unit': unit}
+                order = {'type': 'hold', 'unit': unit}
             
             if order:
                 orders.append(order)
         
         return orders
 
-    def get_enemies_in_sight(self, unit, all_players):
-        """Ennemis dans la ligne de vue"""
-        enemies = []
-        sight_range = unit.get_line_of_sight()
-        
-        for player in all_players:
-            if player != unit.player:
-                for enemy_unit in player.get_alive_units():
-                    if unit.distance_to(enemy_unit) <= sight_range:
-                        enemies.append(enemy_unit)
-        return enemies
-
-    def get_all_enemies(self, unit, all_players):
-        """Tous les ennemis vivants"""
-        enemies = []
-        for player in all_players:
-            if player != unit.player:
-                enemies.extend(player.get_alive_units())
-        return enemies
-
-    def get_closest_enemy(self, unit, enemies):
-        """Trouve l'ennemi le plus proche dans une liste"""
-        if not enemies:
-            return None
-        
-        closest_enemy = enemies[0]
-        min_distance = unit.distance_to(closest_enemy)
-        
-        for enemy in enemies[1:]:
-            distance = unit.distance_to(enemy)
-            if distance < min_distance:
-                min_distance = distance
-                closest_enemy = enemy
-        
-        return closest_enemy
-
     def _decide_combat_action(self, unit, enemy, map):
         """Maintenu pour compatibilité, mais désormais on attaque toujours via give_orders"""
         if enemy is None:
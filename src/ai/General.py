@@ -1,25 +1,116 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from ..core.units import UnitType, UNIT_STATS
+
+# Codes entiers des types d'unités dans les vues tableaux (ordre de l'enum)
+UNIT_TYPE_LIST = list(UnitType)
+UNIT_TYPE_CODES = {t: k for k, t in enumerate(UNIT_TYPE_LIST)}
+RANGE_BY_CODE = np.array([UNIT_STATS[t].range for t in UNIT_TYPE_LIST], dtype=float)
+
+
+@dataclass
+class BatchView:
+    """
+    État d'un tick vu par un général « tableaux » : une ligne par unité.
+    Les unités amies sont celles qui attendent un ordre, dans l'ordre des
+    escouades ; les ennemis sont toutes les unités vivantes adverses.
+    """
+    units: List            # unités amies (objets Unit, pour référence)
+    x: np.ndarray
+    y: np.ndarray
+    hp: np.ndarray
+    type: np.ndarray       # codes UNIT_TYPE_CODES
+    range: np.ndarray
+    enemies: List          # unités ennemies (objets Unit)
+    ex: np.ndarray
+    ey: np.ndarray
+    ehp: np.ndarray
+    etype: np.ndarray
+    erange: np.ndarray
+    map: object = None
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+
+@dataclass
+class BatchOrders:
+    """
+    Ordres renvoyés par give_orders_batch, alignés sur BatchView.units :
+    - target : indice dans BatchView.enemies, -1 = pas d'attaque ;
+    - move : positions visées (n, 2), NaN = pas de déplacement ;
+    - hold : True = ordre "hold".
+    Une unité sans aucun des trois garde son ordre actuel.
+    """
+    target: np.ndarray
+    move: Optional[np.ndarray] = None
+    hold: Optional[np.ndarray] = None
+
 
 class General(ABC):
     """Classe abstraite pour tous les généraux IA"""
-    
-    def __init__(self, name: str):
+
+    # Un général qui implémente give_orders_batch passe ce drapeau à True :
+    # Battle lui fournit alors des tableaux au lieu d'appeler give_orders.
+    supports_batch = False
+
+    # Fréquence de décision (Hz). None : à chaque tick logique. Sinon chaque
+    # unité est re-planifiée à ce rythme (créneaux étalés sur les ticks) et
+    # aussitôt qu'elle perd son ordre ; la physique garde son propre pas.
+    decision_hz: Optional[float] = None
+
+    def __init__(self, name: str, decision_hz: Optional[float] = None):
         self.name = name
-        
+        if decision_hz is not None:
+            self.decision_hz = decision_hz
+
     @abstractmethod
     def give_orders(self, current_player, all_players, map, units_needing_orders):
         """Méthode principale où le général prend ses décisions
-        
+
         Args:
             current_player: Le joueur que ce général contrôle
             all_players: Liste de tous les joueurs de la bataille
             map: La carte de jeu pour les déplacements
             units_needing_orders: Liste des unités qui ont besoin de nouveaux ordres
-            
+
         Returns:
             Liste d'ordres à exécuter
         """
         pass
 
+    def give_orders_batch(self, view: BatchView) -> BatchOrders:
+        """Variante vectorisée (optionnelle) de give_orders, voir supports_batch."""
+        raise NotImplementedError
+
     def get_name(self) -> str:
         return self.name
+
+
+def nearest_enemy_indices(x: np.ndarray, y: np.ndarray, ex: np.ndarray, ey: np.ndarray,
+                          block: int = 262_144) -> np.ndarray:
+    """
+    Indice de l'ennemi le plus proche pour chaque ligne (argmin de la matrice
+    des distances, calculée par blocs de lignes pour borner la mémoire).
+    Distances calculées comme Unit.distance_to ; à égalité, le premier ennemi.
+    """
+    n, m = len(x), len(ex)
+    out = np.full(n, -1, dtype=np.int64)
+    if not n or not m:
+        return out
+    rows = max(1, block // m)
+    for start in range(0, n, rows):
+        stop = min(n, start + rows)
+        # Blocs de taille modeste : les temporaires restent en cache
+        d = np.subtract.outer(x[start:stop], ex)
+        d *= d
+        dy = np.subtract.outer(y[start:stop], ey)
+        dy *= dy
+        d += dy
+        np.sqrt(d, out=d)  # comme distance_to : les égalités après arrondi gardent le premier
+        out[start:stop] = np.argmin(d, axis=1)
+    return out
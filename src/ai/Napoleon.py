@@ -1,25 +1,47 @@
-from .General import General
+import numpy as np
+
+from .General import General, BatchOrders, nearest_enemy_indices
+
+# Seuil de distance (en pixels). 200 pixels = environ 6 cases (6 * 32).
+MAX_FOCUS_DISTANCE = 200.0
 
 class Napoleon(General):
+    supports_batch = True
+
     def __init__(self):
         super().__init__("Napoleon")
 
+    def give_orders_batch(self, view):
+        """Version tableaux : focus sur l'ennemi le plus faible à moins de 200 px, sinon le plus proche."""
+        n = len(view)
+        target = np.full(n, -1, dtype=np.int64)
+        if not len(view.enemies):
+            return BatchOrders(target=target)
+
+        primary = int(np.argmin(view.ehp))  # premier des plus faibles, comme min()
+        dx, dy = view.x - view.ex[primary], view.y - view.ey[primary]
+        focus = np.sqrt(dx * dx + dy * dy) <= MAX_FOCUS_DISTANCE
+        target[focus] = primary
+        far = ~focus
+        if far.any():
+            target[far] = nearest_enemy_indices(view.x[far], view.y[far], view.ex, view.ey)
+        return BatchOrders(target=target)
+
     def give_orders(self, current_player, all_players, map, units_needing_orders):
         orders = []
         
-        # 1. Identifier tous les ennemis
-        visible_enemies = self.get_visible_enemies(current_player, all_players)
+        # 1. Identifier tous les ennemis (index du tick, partagé)
+        visible_enemies = map.get_enemy_index(current_player, all_players)
         
         if not visible_enemies:
             return []
 
         # 2. CHOIX DE LA CIBLE PRIORITAIRE GLOBALE
         # On garde la logique : taper le plus faible pour réduire le nombre d'ennemis.
-        primary_target = min(visible_enemies, key=lambda e: e.current_hp)
+        primary_target = visible_enemies.weakest()
 
-        # Seuil de distance (en pixels). 200 pixels = environ 6 cases (6 * 32).
-        # Si un soldat est plus loin que ça, il ne doit pas essayer de rejoindre la mêlée centrale.
-        MAX_FOCUS_DISTANCE = 200.0
+        # Si un soldat est plus loin que MAX_FOCUS_DISTANCE, il ne doit pas
+        # essayer de rejoindre la mêlée centrale.
 
         for unit in units_needing_orders:
             dist_to_primary = unit.distance_to(primary_target)
@@ -32,19 +54,8 @@ class Napoleon(General):
             
             # Cas B : Je suis trop loin -> J'attaque le plus proche pour avancer
             else:
-                closest_local = self.get_closest(unit, visible_enemies)
+                closest_local = visible_enemies.nearest(unit.x, unit.y)
                 if closest_local:
                     orders.append({'type': 'attack', 'unit': unit, 'target': closest_local})
         
         return orders
-
-    def get_visible_enemies(self, current_player, all_players):
-        enemies = []
-        for p in all_players:
-            if p != current_player:
-                enemies.extend(p.get_alive_units())
-        return enemies
-
-    def get_closest(self, unit, candidates):
-        if not candidates: return None
-        return min(candidates, key=lambda e: unit.distance_to(e))
\ No newline at end of file
@@ -1,6 +1,6 @@
 import random
 from .General import General
-from ..core.units import Crossbowman, Knight, Pikeman, LongSwordsman, EliteSkirmisher
+from ..core.units import Crossbowman, Knight, Pikeman, LongSwordsman, EliteSkirmisher, UnitType
 
 class SunTzu(General):
     """
@@ -15,8 +15,8 @@ class SunTzu(General):
     def give_orders(self, current_player, all_players, map, units_needing_orders):
         orders = []
         
-        # Récupération de tous les ennemis visibles une seule fois pour optimiser
-        visible_enemies = self.get_all_visible_enemies(current_player, all_players)
+        # Index des ennemis du tick, construit une seule fois pour tous les généraux
+        visible_enemies = map.get_enemy_index(current_player, all_players)
         
         if not visible_enemies:
             # Si personne n'est visible, on peut soit attendre, soit explorer
@@ -32,14 +32,14 @@ class SunTzu(General):
 
     def decide_unit_action(self, unit, enemies, map):
         # 1. Identifier les cibles prioritaires selon le type de mon unité
-        targets = self.filter_targets_by_counter(unit, enemies)
+        counter = self.counter_type(unit)
         
-        if not targets:
-            # Fallback : Si pas de contre idéal, attaquer l'ennemi le plus proche
-            targets = enemies
-            
         # Trouver la cible la plus proche parmi les candidates
-        best_target = self.get_closest_unit(unit, targets)
+        if counter is not None and enemies.has_type((counter,)):
+            best_target = enemies.nearest_of_type(unit.x, unit.y, (counter,))
+        else:
+            # Fallback : Si pas de contre idéal, attaquer l'ennemi le plus proche
+            best_target = enemies.nearest(unit.x, unit.y)
         
         if not best_target:
             return None
@@ -67,34 +67,15 @@ class SunTzu(General):
         # 3. Comportement Standard (Mêlée)
         return {'type': 'attack', 'unit': unit, 'target': best_target}
 
-    def filter_targets_by_counter(self, unit, enemies):
-        """Retourne une sous-liste d'ennemis que mon unité contre naturellement."""
+    def counter_type(self, unit):
+        """Type d'ennemi que mon unité contre naturellement (None : pas de préférence)."""
         if isinstance(unit, Pikeman):
-            # Les piquiers chassent les chevaliers
-            return [e for e in enemies if isinstance(e, Knight)]
-        
+            return UnitType.KNIGHT
         elif isinstance(unit, Knight):
-            # Les chevaliers chassent les archers (et autres unités fragiles)
-            return [e for e in enemies if isinstance(e, Crossbowman)]
-        
+            return UnitType.CROSSBOWMAN
         elif isinstance(unit, Crossbowman):
-            # Les arbalétriers chassent l'infanterie lente (Piquiers)
-            return [e for e in enemies if isinstance(e, Pikeman)]
-        
-        return enemies # Pas de préférence spécifique
-
-    def get_all_visible_enemies(self, current_player, all_players):
-        """Récupère tous les ennemis vivants des autres joueurs."""
-        enemies = []
-        for p in all_players:
-            if p != current_player:
-                enemies.extend(p.get_alive_units())
-        return enemies
-
-    def get_closest_unit(self, unit, candidates):
-        if not candidates:
-            return None
-        return min(candidates, key=lambda e: unit.distance_to(e))
+            return UnitType.PIKEMAN
+        return None
 
     def calculate_retreat_position(self, unit, enemy, map):
         """Calcule une position pour s'éloigner de l'ennemi."""
@@ -1,4 +1,4 @@
-from .General import General
+from .General import General, BatchView, BatchOrders
 from .BrainDead import BrainDead
 from .Daft import Daft
 from .Napoleon import Napoleon
@@ -4,6 +4,7 @@ CLI (Command Line Interface) du projet MedievAIl.
 from __future__ import annotations
 import argparse
 import time
+import os
 import pygame
 
 # --- Imports du Moteur ---
@@ -17,6 +18,7 @@ from src.core.battle import Battle
 # --- Imports Visuels ---
 from src.vis.terminal_view import TerminalView
 from src.vis.gui_view import IsometricView
+from src.vis.view_base import StateMirror
 
 # --- LES 3 FICHIERS HTML ---
 from src.fichiers.html_generator import generate_snapshot_html  # 1. HUD Tactique (TAB)
@@ -45,6 +47,14 @@ def build_parser():
     run.add_argument("-t", "--terminal", action="store_true")
     # Argument pour l'export HTML (-d)
     run.add_argument("-d", "--data", type=str, default=None, help="Fichier de sortie des données")
+    run.add_argument("--engine", choices=Battle.ENGINES, default="python", help="Backend de simulation")
+    run.add_argument("--seed", type=int, default=None, help="Graine (terrain et placement reproductibles)")
+    run.add_argument("--profile", action="store_true", help="Chronométrage par phase et par général")
+    run.add_argument("--ai-hz", type=float, default=None,
+                     help="Fréquence de décision des généraux en Hz (défaut : à chaque tick)")
+    run.add_argument("--record", type=str, default=None, help="Enregistrer la bataille dans ce replay (.rpl)")
+    run.add_argument("--telemetry", type=str, default=None, metavar="OUT_DIR",
+                     help="Séries par tick (vivants, PV, dégâts, ordres) en fragments .npz")
 
     # ... (Arguments pour plot, inchangés) ...
     plot = sub.add_parser("plot", help="Lancer une expérimentation")
@@ -54,11 +64,16 @@ def build_parser():
     plot.add_argument("unit_types", type=str)
     plot.add_argument("N_range", type=str)
     plot.add_argument("-N", "--repeats", type=int, default=10)
+    plot.add_argument("-j", "--jobs", type=int, default=1, help="Processus parallèles (0 = un par cœur)")
+    plot.add_argument("--seed", type=int, default=0, help="Graine de base des batailles (-1 = tirage libre, sans cache)")
+    plot.add_argument("--no-cache", action="store_true", help="Rejouer même les batailles déjà en cache")
 
     #load
     load = sub.add_parser("load", help="Charger une bataille sauvegardÃ©e")
-    load.add_argument("savefile", type=str)
+    load.add_argument("savefile", type=str, nargs="?", default="quicksave.sav")
     load.add_argument("-t", "--terminal", action="store_true")
+    load.add_argument("-l", "--list", action="store_true",
+                      help="Lister les sauvegardes (fichier ou dossier) sans les charger")
 
     #tourney
     tourney = sub.add_parser("tourney", help="Lancer un tournoi automatique")
@@ -66,8 +81,50 @@ def build_parser():
     tourney.add_argument("-S", "--scenarios", nargs="+", required=True)
     tourney.add_argument("-N", type=int, default=10)
     tourney.add_argument("-na", action="store_true")
-    tourney.add_argument("-d", "--datafile", type=str, required=True)
-
+    tourney.add_argument("-d", "--datafile", type=str, required=True,
+                         help="Base SQLite des résultats (un enregistrement par match terminé)")
+    tourney.add_argument("--resume", action="store_true",
+                         help="Reprendre le dernier tournoi de même configuration dans la base")
+    tourney.add_argument("--engine", choices=Battle.ENGINES, default="python", help="Backend de simulation")
+    tourney.add_argument("-j", "--jobs", type=int, default=1, help="Processus parallèles (0 = un par cœur)")
+    tourney.add_argument("--seed", type=int, default=0, help="Graine de base des matchs (-1 = tirage libre, sans cache)")
+    tourney.add_argument("--no-cache", action="store_true", help="Rejouer même les matchs déjà en cache")
+    tourney.add_argument("--profile", action="store_true", help="Chronométrage par phase et par général")
+    tourney.add_argument("--ai-hz", type=float, default=None,
+                         help="Fréquence de décision des généraux en Hz (défaut : à chaque tick)")
+    tourney.add_argument("--record", type=str, default=None, metavar="DIR",
+                         help="Enregistrer un replay par match dans ce dossier (désactive le cache)")
+
+    #bench
+    bench = sub.add_parser("bench", help="Suite de performance du moteur (JSON)")
+    bench.add_argument("--ticks", type=int, default=100, help="Ticks joués par cas")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000], help="N des variantes de taille")
+    bench.add_argument("--scenarios", nargs="*", default=None, help="Scénarios de base (défaut : tous)")
+    bench.add_argument("--scaled", nargs="*", default=["lanchester"], help="Scénarios déclinés en variantes de taille")
+    bench.add_argument("--general", type=str, default="daft")
+    bench.add_argument("--engine", choices=Battle.ENGINES, default="python", help="Backend de simulation")
+    bench.add_argument("-o", "--output", type=str, default=None, help="Fichier JSON du rapport")
+    bench.add_argument("--compare", type=str, default=None, help="Rapport de référence (baseline.json)")
+    bench.add_argument("--threshold", type=float, default=0.10, help="Baisse de ticks/s tolérée (0.10 = 10 %%)")
+    bench.add_argument("--no-isolate", action="store_true", help="Tous les cas dans ce processus (RSS cumulée)")
+
+    #replay
+    replay = sub.add_parser("replay", help="Revoir une bataille enregistrée (.rpl)")
+    replay.add_argument("replayfile", type=str)
+    replay.add_argument("-t", "--terminal", action="store_true")
+    replay.add_argument("--at", type=float, default=0.0, help="Démarrer à cet instant (secondes de bataille)")
+    replay.add_argument("--speed", type=int, default=1, help="Ticks rejoués par image")
+    replay.add_argument("--info", action="store_true", help="Afficher l'index du replay sans le lire")
+
+    #history
+    history = sub.add_parser("history", help="Vue filtrée de l'historique des batailles (HTML)")
+    history.add_argument("-G", "--general", type=str, default=None, help="Batailles jouées par ce général")
+    history.add_argument("-S", "--scenario", type=str, default=None)
+    history.add_argument("--since", type=str, default=None, help="Date ISO minimale (ex. 2024-05-01)")
+    history.add_argument("--page", type=int, default=1, help="Page (1 = les plus récentes)")
+    history.add_argument("-o", "--output", type=str, default="history_view.html")
+    history.add_argument("--rebuild", action="store_true",
+                         help="Régénérer history.html et les archives depuis la base")
 
     return parser
 
@@ -107,21 +164,32 @@ def run_battle(args):
     # On déballe les paramètres spécifiques, puis on ajoute les généraux
     # Signature finale : scenario_fn(param1, param2, ..., general_a, general_b)
     try:
-        players, world_map = scenario_fn(*extra_params, general_a, general_b)
+        players, world_map = scenario_fn(*extra_params, general_a, general_b, seed=args.seed)
     except Exception as e:
         print(f"Erreur lors du lancement du scénario {args.scenario}: {e}")
         return
     
+    if args.ai_hz:
+        from src.core.tournament import set_decision_rate
+        set_decision_rate(players, args.ai_hz)
+
     start_count_a = len(players[0].squad)
     start_count_b = len(players[1].squad)
 
     # Création de l'objet Battle
-    battle = Battle(players=players, world_map=world_map, logic_dt=0.05, max_time=120)
+    # Headless : la vue reçoit des deltas via le miroir, pas un get_state() par frame
+    battle = Battle(players=players, world_map=world_map, logic_dt=0.05, max_time=120,
+                    engine=args.engine, headless=True, seed=args.seed, profile=args.profile)
+    if args.record:
+        battle.record(args.record, meta={"scenario": args.scenario, "generals": [args.ai_a, args.ai_b]})
+    if args.telemetry:
+        battle.stream_telemetry(args.telemetry)
+    mirror = StateMirror()
 
     # --- 2. Initialisation de la Vue ---
     viewer = TerminalView() if args.terminal else IsometricView()
     if viewer:
-        viewer.on_enter(battle, battle.get_state())
+        viewer.on_enter(battle, mirror.pull(battle))
     
     # --- 3. État du Contrôleur (Flags) ---
     running = True
@@ -156,7 +224,7 @@ def run_battle(args):
         elif action == "switch_view":
             viewer.on_exit()
             viewer = IsometricView() if isinstance(viewer, TerminalView) else TerminalView()
-            viewer.on_enter(battle, battle.get_state())
+            viewer.on_enter(battle, mirror.pull(battle))
 
         elif action == "\t": 
             print("📸 Génération du snapshot HTML (Le combat continue...)")
@@ -171,17 +239,20 @@ def run_battle(args):
         elif action == "load":
             loaded_battle = Battle.load_state()
             if loaded_battle:
-                battle = loaded_battle 
-                viewer.on_enter(battle, battle.get_state())
+                battle.stop_recording()  # replay et télémétrie s'arrêtent à la bataille quittée
+                battle.stop_telemetry()
+                battle = loaded_battle
+                battle.headless = True
+                mirror.reset()
+                viewer.on_enter(battle, mirror.pull(battle))
                 print("📂 Partie chargée !")
 
         # B) Mise à jour de la Simulation
         if not is_paused:
             # Appel de la méthode update avec le paramètre speed (boucle interne de Battle)
-            game_state = battle.update(speed=current_speed)
-        else:
-            # En pause, on récupère l'état statique pour l'affichage
-            game_state = battle.get_state()
+            battle.update(speed=current_speed)
+        # Seules les unités modifiées depuis la dernière frame sont recopiées
+        game_state = mirror.pull(battle)
 
         # C) Rendu Visuel
         if game_state:
@@ -190,7 +261,16 @@ def run_battle(args):
         time.sleep(FRAME_DELAY)
 
     # --- 5. FIN DU COMBAT ET EXPORTS ---
+    if battle.recorder is not None:
+        battle.stop_recording()
+        print(f"🎞  Replay enregistré : {args.record}")
+    if battle.telemetry is not None:
+        battle.stop_telemetry()
+        print(f"📈 Télémétrie écrite dans '{args.telemetry}'")
     print_battle_summary(battle)
+    if args.profile:
+        from src.core.metrics import format_metrics
+        print(format_metrics(battle.get_metrics()))
 
     if args.data:
         save_battle_report(args.data, battle, args)
@@ -213,80 +293,75 @@ def run_battle(args):
             u2_start=start_count_b,
             winner=winner_name,
             duration=battle.time,
-            survivors_data=survivors_data
+            survivors_data=survivors_data,
+            scenario=args.scenario,
         )
         print("📜 Historique mis à jour (history.html)")
     except Exception as e:
         print(f"⚠️ Erreur Historique : {e}")
 
-from itertools import product
 import json
 
-def tourney(args):
-    results = []
-    stats = {}
-    
-    # 1. Initialisation
-    for sc in args.scenarios:
-        stats[sc] = {}
-        for g1 in args.generals:
-            stats[sc][g1] = {}
-            for g2 in args.generals:
-                stats[sc][g1][g2] = {'wins': 0, 'draws': 0, 'matches': 0}
-
-    for scenario_name in args.scenarios:
-        config = SCENARIO_CONFIG.get(scenario_name)
-        if not config: continue
-        scenario_fn = config["fn"]
-        extra_params = config.get("args", [])
-
-        # Utilisation de product pour tester toutes les combinaisons
-        for ai1, ai2 in product(args.generals, repeat=2):
-            if ai1 == ai2:
-                # Cas particulier : IA contre elle-même (ex: Braindead vs Braindead)
-                # On ne joue le match qu'une fois pour ne pas doubler les stats
-                for n in range(args.N):
-                    players, world_map = scenario_fn(*extra_params, get_general(ai1), get_general(ai2))
-                    players[0].name, players[1].name = "Army A", "Army B"
-                    battle_result = Battle(players, world_map).run()
-                    
-                    stats[scenario_name][ai1][ai2]['matches'] += 1
-                    if battle_result.winner is None:
-                        stats[scenario_name][ai1][ai2]['draws'] += 1
-                    else:
-                        # Dans un miroir, c'est forcément une victoire pour l'IA concernée
-                        stats[scenario_name][ai1][ai2]['wins'] += 1
-                continue
-
-            # Cas normal : Duel entre deux IAs différentes
-            for n in range(args.N):
-                # Équité des camps
-                a_name, b_name = (ai2, ai1) if (not args.na and n % 2 == 1) else (ai1, ai2)
-
-                players, world_map = scenario_fn(*extra_params, get_general(a_name), get_general(b_name))
-                players[0].name, players[1].name = "Army A", "Army B"
-                
-                battle_result = Battle(players, world_map).run()
-                name_map = {"Army A": a_name, "Army B": b_name, None: None}
-                real_winner = name_map.get(battle_result.winner)
+def open_result_cache(args):
+    """Cache des résultats, sauf --no-cache, graine libre (-1), --profile ou --record."""
+    from src.core.result_cache import ResultCache
 
-                # --- MISE À JOUR SYMÉTRIQUE ---
-                # On met à jour le compteur de matchs pour les deux cases
-                stats[scenario_name][ai1][ai2]['matches'] += 1
-                
-                if real_winner is None:
-                    # Le nul profite aux deux cases
-                    stats[scenario_name][ai1][ai2]['draws'] += 1
-                elif real_winner == ai1:
-                    # Victoire pour l'IA de la LIGNE
-                    stats[scenario_name][ai1][ai2]['wins'] += 1
-                
-                # Note : Si c'est ai2 qui gagne, on ne fait rien ici. 
-                # Le point sera compté quand la boucle passera sur (ai2, ai1).
-                
-                print(f"🏁 {scenario_name} | {a_name} vs {b_name} | Vainqueur: {real_winner if real_winner else 'DRAW'}")
+    if (args.no_cache or args.seed is None or args.seed < 0 or getattr(args, "profile", False)
+            or getattr(args, "record", None)):
+        return None
+    return ResultCache()
+
+
+def tourney(args):
+    import sqlite3
+    from src.core.tournament import build_jobs, iter_results, match_id
+    from src.core.tournament_store import TournamentStore
 
-    generate_tournament_report(stats, args.generals, args.scenarios)
+    # 1. Initialisation
+    cache = open_result_cache(args)
+    seed = args.seed if args.seed >= 0 else None
+    try:
+        store = TournamentStore(args.datafile)
+    except sqlite3.DatabaseError as e:
+        print(f"❌ Base de résultats illisible '{args.datafile}' : {e}")
+        return
+    config = {
+        "generals": args.generals, "scenarios": args.scenarios, "N": args.N, "na": args.na,
+        "engine": args.engine, "seed": seed, "ai_hz": args.ai_hz,
+    }
+    tournament_id, resumed = store.open_tournament(config, resume=args.resume)
+
+    # 2. Matchs (ordre fixe : l'agrégation est identique avec ou sans --jobs)
+    jobs = build_jobs(args.scenarios, args.generals, args.N, na=args.na, engine=args.engine, seed=seed,
+                      profile=args.profile, ai_hz=args.ai_hz, record_dir=args.record)
+    if resumed:
+        done = store.done_ids(tournament_id)
+        jobs = [job for job in jobs if match_id(job) not in done]
+        print(f"↩️  Reprise du tournoi #{tournament_id} : {len(done)} match(s) en base, {len(jobs)} à jouer")
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    profiles, labels = [], []
+    try:
+        for job, battle_result in iter_results(jobs, workers=args.jobs, cache=cache):
+            # Enregistré tout de suite : un arrêt ne perd que le match en cours
+            real_winner = store.record(tournament_id, job, battle_result)
+            if battle_result.metrics:
+                profiles.append(battle_result.metrics)
+                labels.append({"Army A": job.a_name, "Army B": job.b_name})
+            if not job.is_mirror:
+                print(f"🏁 {job.scenario} | {job.a_name} vs {job.b_name} | Vainqueur: {real_winner if real_winner else 'DRAW'}")
+    except KeyboardInterrupt:
+        print(f"\n⏹  Tournoi interrompu : {store.match_count(tournament_id)} match(s) en base, "
+              f"relancer avec --resume pour continuer")
+
+    if cache is not None:
+        print(f"💾 Cache : {cache.hits} match(s) réutilisé(s), {cache.misses} simulé(s)")
+    if args.profile and profiles:
+        from src.core.metrics import merge_metrics, format_metrics
+        print("\n⏱  PROFIL DU TOURNOI (cumul de tous les matchs)")
+        print(format_metrics(merge_metrics(profiles, labels)))
+    generate_tournament_report(store, tournament_id, args.generals, args.scenarios)
+    store.close()
 # ============================================================
 def run_plot(args):
     from src.core.scenario import run_lanchester_experiment
@@ -300,20 +375,56 @@ def run_plot(args):
         general_name=args.ai,
         unit_types=unit_types,
         N_range=N_range,
-        repeats=args.repeats
+        repeats=args.repeats,
+        jobs=args.jobs,
+        seed=args.seed if args.seed >= 0 else None,
+        cache=open_result_cache(args)
     )
     plotter = get_plotter(args.plotter)
     plotter.plot(data)
 
 
+def list_saves(path: str):
+    """Tableau des sauvegardes : seules les métadonnées des .sav sont lues."""
+    from src.core.savefile import SaveFormatError, is_savefile, read_metadata
+
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith((".sav", ".pkl")))
+    else:
+        files = [path] if os.path.exists(path) else []
+    if not files:
+        print(f"⚠️ Aucune sauvegarde trouvée dans '{path}'")
+        return
+
+    print(f"{'FICHIER':<28} {'TEMPS':>7} {'TICKS':>7} {'MOTEUR':>7}  ARMÉES")
+    for filename in files:
+        name = os.path.basename(filename)
+        if not is_savefile(filename):
+            print(f"{name:<28} {'':>7} {'':>7} {'':>7}  (ancien format pickle)")
+            continue
+        try:
+            meta = read_metadata(filename)
+        except (OSError, ValueError, SaveFormatError) as e:
+            print(f"{name:<28} illisible : {e}")
+            continue
+        armies = " vs ".join(f"{p['name']} [{p['general']}] {p['alive']}/{p['units']}" for p in meta["players"])
+        print(f"{name:<28} {meta['time']:>6.1f}s {meta['step_count']:>7} {meta['engine']:>7}  {armies}")
+
+
 def run_load(args):
+    if args.list:
+        list_saves(args.savefile if args.savefile != "quicksave.sav" else ".")
+        return
     battle = Battle.load_state(args.savefile)
     if not battle:
         return
 
+    battle.headless = True
+    mirror = StateMirror()
+
     viewer = TerminalView() if args.terminal else IsometricView()
     if viewer:
-        viewer.on_enter(battle, battle.get_state())
+        viewer.on_enter(battle, mirror.pull(battle))
     if isinstance(viewer, IsometricView):
         pygame.display.set_mode((1800, 1000))
     
@@ -323,7 +434,7 @@ def run_load(args):
 
     while not battle.finished and running:
         battle.update()
-        game_state = battle.get_state()
+        game_state = mirror.pull(battle)
         
         action = viewer.handle_input()
 
@@ -366,6 +477,119 @@ def run_load(args):
 
 
 
+SEEK_SECONDS = 10.0  # saut des touches de navigation du replay
+
+
+def run_replay(args):
+    from src.core.replay import ReplayReader, ReplayFormatError
+
+    try:
+        reader = ReplayReader(args.replayfile)
+    except (OSError, ReplayFormatError) as e:
+        print(f"❌ Replay illisible : {e}")
+        return
+    meta = reader.meta
+    dt = meta["logic_dt"]
+    armies = " vs ".join(
+        f"{name} [{general}]" for name, general in zip(meta["players"], meta.get("generals", ["?"] * len(meta["players"])))
+    )
+    if args.info:
+        print(f"🎞  {args.replayfile} : {armies} "
+              f"(scénario {meta.get('scenario', '?')}, graine {meta['seed']}, moteur {meta['engine']})")
+        print(f"   ticks {reader.first_step} → {reader.last_step}, "
+              f"{len(reader.keyframes)} image(s) clé(s), {len(reader.orders)} tick(s) avec ordres")
+        if reader.end:
+            print(f"   fin : {reader.end['time']:.1f}s, vainqueur {reader.end['winner'] or 'DRAW'}")
+        return
+
+    seek_ticks = max(1, int(round(SEEK_SECONDS / dt)))
+    battle = reader.battle_at(int(round(args.at / dt)))
+    mirror = StateMirror()
+    viewer = TerminalView() if args.terminal else IsometricView()
+    viewer.on_enter(battle, mirror.pull(battle))
+
+    is_paused = False
+    current_speed = max(1, args.speed)
+    print(f"🎞  Replay : {armies} — {reader.last_step} ticks")
+    print("👉 COMMANDES : [P] Pause | [K] Accélérer | [R] Vitesse normale | [PgPréc/PgSuiv] -/+10s | [Début] Début")
+
+    while True:
+        action = viewer.handle_input()
+        target = None
+
+        if action == "quit":
+            break  # la vue est déjà fermée
+        elif action == "pause":
+            is_paused = not is_paused
+        elif action == "accelerer":
+            current_speed = min(current_speed * 5, 1000)
+            print(f"⏩ VITESSE x{current_speed}")
+        elif action == "normal":
+            current_speed = max(1, args.speed)
+        elif action == "seek_back":
+            target = battle.step_count - seek_ticks
+        elif action == "seek_forward":
+            target = battle.step_count + seek_ticks
+        elif action == "seek_start":
+            target = reader.first_step
+        elif action == "switch_view":
+            viewer.on_exit()
+            viewer = IsometricView() if isinstance(viewer, TerminalView) else TerminalView()
+            viewer.on_enter(battle, mirror.pull(battle))
+
+        if target is not None:
+            # Saut : image clé la plus proche, puis avance rapide jusqu'au tick visé
+            battle = reader.battle_at(target)
+            mirror.reset()
+            viewer.on_enter(battle, mirror.pull(battle))
+        elif not is_paused and battle.step_count < reader.last_step:
+            battle.update(speed=min(current_speed, reader.last_step - battle.step_count))
+
+        game_state = mirror.pull(battle)
+        if game_state:
+            viewer.render(game_state)
+        time.sleep(FRAME_DELAY)
+
+    print_battle_summary(battle)
+
+
+def run_bench(args):
+    import sys
+    from src.core.bench import build_cases, run_suite, compare, load_report
+
+    cases = build_cases(args.scenarios, args.scaled, args.sizes)
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = run_suite(cases, ticks=args.ticks, general=args.general, engine=args.engine,
+                       isolate=not args.no_isolate, log=log)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        log(f"📄 Rapport écrit dans {args.output}")
+    print(text)
+
+    if args.compare:
+        rows = compare(report, load_report(args.compare), args.threshold)
+        log(f"\n{'CAS':<22} {'RÉF.':>10} {'ACTUEL':>10} {'ÉCART':>8}")
+        for r in rows:
+            flag = "  ❌ RÉGRESSION" if r["regression"] else ""
+            log(f"{r['name']:<22} {r['baseline']:>10.1f} {r['current']:>10.1f} {r['change']*100:>+7.1f}%{flag}")
+        if any(r["regression"] for r in rows):
+            raise SystemExit(1)
+
+
+def run_history(args):
+    from src.fichiers.history import rebuild_history_pages, render_history_view
+
+    if args.rebuild:
+        rebuild_history_pages()
+        print("📜 history.html et archives régénérés")
+    total = render_history_view(args.output, general=args.general, scenario=args.scenario,
+                                since=args.since, page=max(0, args.page - 1))
+    print(f"📜 {total} batailles correspondantes -> {args.output}")
+
+
 def main(argv=None):
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -378,6 +602,12 @@ def main(argv=None):
         tourney(args)
     elif args.command == "load":
         run_load(args)
+    elif args.command == "bench":
+        run_bench(args)
+    elif args.command == "replay":
+        run_replay(args)
+    elif args.command == "history":
+        run_history(args)
 
 if __name__ == "cli_main":
     main()
\ No newline at end of file
@@ -8,6 +8,15 @@ from dataclasses import dataclass
 from typing import Optional
 import time
 
+from src.core.metrics import BattleMetrics
+from src.core.scheduler import EventScheduler
+
+# Données partagées des ordres "hold" posés par les généraux « tableaux »
+_HOLD_DATA: Dict[str, Any] = {}
+
+# Version des règles de simulation : à incrémenter dès qu'un changement
+# modifie l'issue des batailles (invalide le cache de résultats).
+ENGINE_VERSION = 1
 
 
 @dataclass
@@ -16,6 +25,80 @@ class BattleResult:
     turns: int
     duration: float
     remaining_units: int
+    winner_hp_lost: int = 0   # PV perdus par les survivants du gagnant (Lanchester)
+    metrics: Optional[Dict[str, Any]] = None  # get_metrics() si la bataille était profilée
+
+
+class UnitRegistry:
+    """
+    Registre des unités vivantes, maintenu incrémentalement par Battle.
+
+    - `units` : tableau des unités vivantes, partagé par tous les chemins
+      chauds d'un tick (il n'est jamais modifié sur place : un compactage
+      crée un nouveau tableau, les itérations en cours restent valides) ;
+    - les vues par joueur sont les `Player.squad` eux-mêmes ;
+    - `mark_dead` enregistre une mort (appelé par Unit.take_damage), le
+      compactage n'a lieu qu'au prochain accès qui en a besoin.
+    """
+
+    def __init__(self, players: List, world_map=None):
+        self.players = players
+        self.world_map = world_map
+        self.units: List = []
+        self._alive_count: Dict[Any, int] = {}  # clé : l'objet Player (survit au pickle, contrairement à id())
+        self._pending: List = []  # morts pas encore retirés
+        self.rebuild()
+
+    def rebuild(self, battle=None):
+        self.units = []
+        self._pending = []
+        for p in self.players:
+            alive = [u for u in p.squad if getattr(u, "is_alive", False)]
+            self._alive_count[p] = len(alive)
+            self.units.extend(alive)
+        if battle is not None:
+            uid = 0
+            for p in self.players:
+                for k, u in enumerate(p.squad):
+                    u.battle = battle
+                    u._ai_slot = k  # répartit la re-planification sur les ticks
+                    u.uid = uid
+                    uid += 1
+
+    def mark_dead(self, unit):
+        if getattr(unit, "_registry_dead", False):
+            return
+        unit._registry_dead = True
+        self._pending.append(unit)
+        if getattr(unit, "_watchers", None):
+            unit.alert_watchers()  # ses attaquants garés abandonnent la cible
+        if unit.player in self._alive_count:
+            self._alive_count[unit.player] -= 1
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def compact(self):
+        """Retire les morts en attente du tableau, des escouades et de l'index spatial."""
+        if not self._pending:
+            return
+        dead_players = {u.player for u in self._pending}
+        if self.world_map is not None:
+            for u in self._pending:
+                self.world_map.remove_unit(u)
+        self._pending = []
+        self.units = [u for u in self.units if u.is_alive]
+        for p in self.players:
+            if p in dead_players:
+                p.squad = [u for u in p.squad if u.is_alive]
+
+    def live_units(self) -> List:
+        self.compact()
+        return self.units
+
+    def alive_count(self, player) -> int:
+        return self._alive_count.get(player, 0)
 
 
 
@@ -24,24 +107,186 @@ class Battle:
     Moteur de simulation RTS indépendant de la visualisation.
     """
 
+    ENGINES = ("python", "numpy")
+
     def __init__(
         self,
         players: List,
         world_map,
         logic_dt: float = 0.05,
-        max_time: float = 300.0
+        max_time: float = 300.0,
+        engine: str = "python",
+        headless: bool = False,
+        seed: Optional[int] = None,
+        profile: bool = False
     ):
         self.players = players
         self.map = world_map
         self.world_map = world_map  # alias
         self.logic_dt = logic_dt
         self.max_time = max_time
+        # Headless : update() ne construit jamais de get_state() (tournoi, expériences)
+        self.headless = headless
+        # Graine de la bataille (par défaut celle du terrain) : métadonnée de
+        # reproductibilité, la simulation elle-même est déterministe
+        self.seed = seed if seed is not None else getattr(world_map, "seed", None)
+        # Chronométrage par phase (opt-in) : None = aucun coût
+        self.metrics = BattleMetrics() if profile else None
+        # Replays : enregistreur des ordres émis (Battle.record), ou source
+        # d'ordres enregistrés qui remplace les généraux (ReplayReader)
+        self.recorder = None
+        self.order_source = None
+        # Séries temporelles par tick (Battle.stream_telemetry)
+        self.telemetry = None
 
         self.time = 0.0
         self.finished = False
         self.winner = None
         self.step_count = 0
 
+        # Suivi des changements pour get_state_delta()
+        self._delta_records: Dict[int, list] = {}
+        self._delta_removed: List = []   # (version, id) des unités disparues
+        self._delta_pass = 0
+        self._delta_scanned = None
+
+        # Registre des vivants (remplace les reconstructions de all_units())
+        self.registry = UnitRegistry(players, world_map)
+        self.registry.rebuild(battle=self)
+
+        # Réveils planifiés (windup, rechargement) : les unités en attente sont sautées
+        self.scheduler = EventScheduler()
+        # Unités endormies (inactives, aucun ennemi dans leur rayon de réveil)
+        self.dormant_count = 0
+
+        # Index spatial partagé (séparation, ligne de vue, requêtes de rayon)
+        self.map.build_spatial_index(self.registry.units)
+        self._max_wake_radius = max(
+            (u.stats.line_of_sight for u in self.registry.units), default=0.0
+        )
+
+        # Backend de simulation : "python" (objets Unit) ou "numpy" (tableaux)
+        if engine not in self.ENGINES:
+            raise ValueError(f"Moteur inconnu : {engine}")
+        self.engine_name = engine
+        self.engine = None
+        if engine == "numpy":
+            from src.core.engine_numpy import NumpyEngine
+            self.engine = NumpyEngine(self)
+
+    def wake_near(self, unit):
+        """Réveille les dormeurs ennemis dont le rayon de réveil contient `unit`."""
+        spatial = self.world_map.spatial
+        margin = spatial.cell_size * 1.5  # l'ennemi a pu bouger dans sa cellule sans en changer
+        reach = self._max_wake_radius + margin
+        x, y, player = unit.x, unit.y, unit.player
+        for other in spatial.candidates(x, y, reach):
+            if not other._dormant or other.player is player:
+                continue
+            r = other.stats.line_of_sight + margin
+            dx, dy = other.x - x, other.y - y
+            if dx*dx + dy*dy <= r * r:
+                other.wake()
+
+    def ai_interval(self, general) -> int:
+        """Période de décision du général, en ticks logiques (1 = à chaque tick)."""
+        hz = getattr(general, "decision_hz", None)
+        if not hz:
+            return 1
+        return max(1, int(round(1.0 / (hz * self.logic_dt))))
+
+    # --------------------------------------------------
+    # IA PAR TABLEAUX (General.supports_batch)
+    # --------------------------------------------------
+
+    def _batch_view(self, player, units: List):
+        """Tableaux du tick pour give_orders_batch (moteur numpy : lus dans ses tableaux)."""
+        from src.ai.General import BatchView, UNIT_TYPE_CODES, RANGE_BY_CODE
+        import numpy as np
+
+        enemies = [u for p in self.players if p is not player for u in p.squad if u.is_alive]
+        n, m = len(units), len(enemies)
+        types = np.fromiter((UNIT_TYPE_CODES[u.unit_type] for u in units), np.int64, n)
+        etypes = np.fromiter((UNIT_TYPE_CODES[u.unit_type] for u in enemies), np.int64, m)
+
+        engine = self.engine
+        if engine is not None:
+            fi = np.fromiter((u._eidx for u in units), np.int64, n)
+            ei = np.fromiter((u._eidx for u in enemies), np.int64, m)
+            x, y, hp = engine.x[fi], engine.y[fi], engine.hp[fi]
+            ex, ey, ehp = engine.x[ei], engine.y[ei], engine.hp[ei]
+        else:
+            fi = ei = None
+            x = np.fromiter((u.x for u in units), float, n)
+            y = np.fromiter((u.y for u in units), float, n)
+            hp = np.fromiter((u.current_hp for u in units), float, n)
+            ex = np.fromiter((u.x for u in enemies), float, m)
+            ey = np.fromiter((u.y for u in enemies), float, m)
+            ehp = np.fromiter((u.current_hp for u in enemies), float, m)
+
+        view = BatchView(
+            units=units, x=x, y=y, hp=hp, type=types, range=RANGE_BY_CODE[types],
+            enemies=enemies, ex=ex, ey=ey, ehp=ehp, etype=etypes, erange=RANGE_BY_CODE[etypes],
+            map=self.map,
+        )
+        return view, fi, ei
+
+    def _run_batch_general(self, player, units: List) -> int:
+        """Appelle give_orders_batch et applique ses tableaux ; renvoie le nombre d'ordres."""
+        import numpy as np
+
+        view, fi, ei = self._batch_view(player, units)
+        result = player.general.give_orders_batch(view)
+        if result is None:
+            return 0
+        target = np.asarray(result.target, dtype=np.int64)
+        move = None if result.move is None else np.asarray(result.move, dtype=float)
+        hold = None if result.hold is None else np.asarray(result.hold, dtype=bool)
+
+        given = target >= 0
+        if move is not None:
+            given |= ~np.isnan(move[:, 0])
+        if hold is not None:
+            given |= hold
+        issued = int(given.sum())
+
+        recorder = self.recorder
+        if self.engine is not None:
+            engine = self.engine
+            if recorder is not None:
+                before = (engine.order[fi], engine.target[fi], engine.move_x[fi], engine.move_y[fi])
+            engine.apply_orders(fi, ei, target, move, hold)
+            if recorder is not None:
+                recorder.record_engine(engine, fi, before)
+            return issued
+
+        # Moteur Python : l'ordre n'est reposé (et son dict créé) que s'il change
+        enemies = view.enemies
+        targets = target.tolist()
+        moves = move.tolist() if move is not None else None
+        holds = hold.tolist() if hold is not None else None
+        for i, u in enumerate(units):
+            previous = u._order_data
+            t = targets[i]
+            if t >= 0:
+                enemy = enemies[t]
+                if u._current_order == "attack" and u._order_data.get("target") is enemy:
+                    u.needs_new_orders = False
+                else:
+                    u.set_order("attack", {"target": enemy})
+            elif moves is not None and moves[i][0] == moves[i][0]:  # pas NaN
+                u.set_order("move", {"position": (moves[i][0], moves[i][1])})
+            elif holds is not None and holds[i]:
+                u.set_order("hold", _HOLD_DATA)
+            if recorder is not None and u._order_data is not previous:
+                recorder.record(u)
+        return issued
+
+    def sync_units(self):
+        """Avec le moteur numpy, remet les objets Unit à jour depuis les tableaux."""
+        if self.engine is not None:
+            self.engine.sync()
+
     # --------------------------------------------------
     # UNITÉS
     # --------------------------------------------------
@@ -53,7 +298,8 @@ class Battle:
         return units
 
     def all_units(self) -> List:
-        return [u for u in self.collect_units() if getattr(u, "is_alive", False)]
+        """Unités vivantes (tableau partagé du registre : ne pas le modifier)."""
+        return self.registry.live_units()
 
     # --------------------------------------------------
     # UPDATE PRINCIPALE
@@ -61,14 +307,16 @@ class Battle:
 
     def update(self, delta_time: Optional[float] = None, speed: int = 1) -> Optional[Dict[str, Any]]:
         """
-        Met à jour la simulation. 
+        Met à jour la simulation.
         'speed' permet de simuler plusieurs pas logiques par frame d'affichage.
+        L'état n'est construit qu'une fois, après le dernier pas, et jamais en
+        mode headless.
         """
         if self.finished:
             return None
 
-        last_state = None
-        
+        stepped = False
+
         # Boucle d'accélération : on répète la simulation 'speed' fois
         for _ in range(speed):
             if self.finished:
@@ -84,23 +332,62 @@ class Battle:
                 break
 
             # Snapshot des unités vivantes au début de ce micro-tick
+            prof = self.metrics
+            if prof is not None:
+                prof.begin_tick()
+                t0 = prof.clock()
+            self.sync_units()
             all_units = self.all_units()
+            engine = self.engine
 
             # ===============================
             # 1) IA — Attribution des ordres
             # ===============================
-            for p in self.players:
-                # On demande des ordres seulement pour ceux qui en ont besoin
-                units_needing_orders = [
-                    u for u in p.squad
-                    if getattr(u, "needs_order", lambda: True)()
-                ]
+            self.map.invalidate_enemy_indexes()
+            recorder = self.recorder
+            if self.order_source is not None:
+                self.order_source.apply_orders(self)
+            for p in self.players if self.order_source is None else ():
+                interval = self.ai_interval(getattr(p, "general", None))
+                if interval > 1:
+                    # IA à fréquence réduite : chaque unité est re-planifiée une fois
+                    # par période (créneaux étalés), ou tout de suite si elle a perdu
+                    # son ordre (cible morte)
+                    phase = self.step_count % interval
+                    units_needing_orders = [
+                        u for u in p.squad
+                        if u.needs_new_orders or u._ai_slot % interval == phase
+                    ]
+                    for u in units_needing_orders:
+                        u.needs_new_orders = False
+                else:
+                    # On demande des ordres seulement pour ceux qui en ont besoin
+                    units_needing_orders = [
+                        u for u in p.squad
+                        if getattr(u, "needs_order", lambda: True)()
+                    ]
 
                 if not units_needing_orders:
                     continue
 
+                # Général « tableaux » : pas de dict d'ordre par unité
+                if getattr(getattr(p, "general", None), "supports_batch", False):
+                    if prof is not None:
+                        tg = prof.clock()
+                    try:
+                        issued = self._run_batch_general(p, units_needing_orders)
+                    except Exception:
+                        issued = 0
+                    if prof is not None:
+                        prof.add_orders(p.name, prof.clock() - tg, len(units_needing_orders), issued)
+                    if self.telemetry is not None:
+                        self.telemetry.add_orders(p, issued)
+                    continue
+
                 orders = []
                 if hasattr(p, "general") and hasattr(p.general, "give_orders"):
+                    if prof is not None:
+                        tg = prof.clock()
                     try:
                         orders = p.general.give_orders(
                             p,
@@ -110,7 +397,10 @@ class Battle:
                         )
                     except Exception:
                         orders = []
+                    if prof is not None:
+                        prof.add_orders(p.name, prof.clock() - tg, len(units_needing_orders), len(orders or []))
 
+                ordered_units = []
                 for order in orders or []:
                     if not order or "type" not in order or "unit" not in order:
                         continue
@@ -118,6 +408,8 @@ class Battle:
                     u = order["unit"]
                     if not getattr(u, "is_alive", False):
                         continue
+                    ordered_units.append(u)
+                    previous = u._order_data
 
                     if order["type"] == "attack" and "target" in order:
                         u.set_order("attack", {"target": order["target"]})
@@ -127,79 +419,157 @@ class Battle:
                         u.set_order("hold", {})
                     else:
                         u.clear_order()
+                    # set_order ne remplace le dict que si l'ordre change
+                    if recorder is not None and (u._order_data is not previous or u._current_order is None):
+                        recorder.record(u)
+
+                if engine is not None:
+                    engine.pull_orders(ordered_units)
+                if self.telemetry is not None:
+                    self.telemetry.add_orders(p, len(ordered_units))
+
+            if recorder is not None:
+                recorder.end_orders(self.step_count)
 
             # ===============================
             # 2) UPDATE DES UNITÉS (Mouvement & Combat)
+            # 3) CLAMP GLOBAL (Anti coordonnées hors-map)
             # ===============================
+            # Les deux passes sont fusionnées : une seule boucle sur le tableau du tick
+            world_map = self.world_map
+            registry = self.registry
+            if prof is not None:
+                t1 = prof.clock()
+                prof.add("ai", t1 - t0)
+            if engine is not None:
+                engine.step(dt)  # pas vectorisé, clamp inclus
+                all_units = ()
+            else:
+                self.scheduler.release_due(self.time)
+                if prof is not None:
+                    prof.add_units(sum(
+                        1 for u in all_units
+                        if u.is_alive and not u._parked_until and not u._dormant
+                    ))
+            if prof is not None and engine is not None:
+                prof.add_units(int(engine.alive.sum()))
             for u in all_units:
-                if hasattr(u, "update"):
-                    try:
-                        # L'unité gère maintenant son Steering et son Windup ici
-                        u.update(self, dt)
-                    except Exception:
-                        u.is_alive = False
+                if not u.is_alive:
+                    continue  # tué plus tôt dans ce tick
+                if u._parked_until or u._dormant:
+                    continue  # en attente d'un réveil : ni mouvement ni minuterie
+                try:
+                    # L'unité gère maintenant son Steering et son Windup ici
+                    u.update(self, dt)
+                except Exception:
+                    u.is_alive = False
+                    registry.mark_dead(u)
+                    continue
+                u.x, u.y = world_map.clamp_position(u.x, u.y)
+                # L'index suit l'unité au fil des déplacements du tick
+                if world_map.update_unit_position(u) and self.dormant_count:
+                    self.wake_near(u)
+                if u._watchers:
+                    u.alert_watchers()  # attaquants garés : cible hors de portée ?
 
-            # ===============================
-            # 3) CLAMP GLOBAL (Anti coordonnées hors-map)
-            # ===============================
-            for u in self.all_units():
-                u.x, u.y = self.world_map.clamp_position(u.x, u.y)
+            if prof is not None:
+                t2 = prof.clock()
+                prof.add("units", t2 - t1)
 
             # ===============================
             # 4) CONDITION DE VICTOIRE
             # ===============================
             alive_players = [
-                p for p in self.players 
-                if any(u.current_hp > 0 for u in p.squad)
+                p for p in self.players
+                if registry.alive_count(p) > 0
             ]
 
+            if prof is not None:
+                t3 = prof.clock()
+                prof.add("victory", t3 - t2)
+
             # Si c'est fini, on nettoie UNE DERNIÈRE FOIS avant de partir
             if len(alive_players) <= 1:
-                for p in self.players:
-                    p.squad = [u for u in p.squad if u.current_hp > 0]
+                registry.compact()
                 
                 self.finished = True
                 if len(alive_players) == 1:
                     self.winner = alive_players[0]
-                
-                last_state = self.get_state() # On capture l'état "propre" sans le mort
-                break 
+
+                stepped = True  # l'état final sera "propre", sans les morts
+                if prof is not None:
+                    prof.add("cleanup", prof.clock() - t3)
+                self._end_tick()
+                break
 
             # ===============================
             # 5) NETTOYAGE STANDARD (si le combat continue)
             # ===============================
-            for p in self.players:
-                p.squad = [u for u in p.squad if u.current_hp > 0]
+            # Compactage paresseux : rien à faire si personne n'est mort
+            registry.compact()
+            if prof is not None:
+                prof.add("cleanup", prof.clock() - t3)
+            self._end_tick()
 
-            # Mise à jour du state pour le tick normal
-            last_state = self.get_state()
+            stepped = True
 
-        return last_state
+        if not stepped or self.headless:
+            return None
+        if self.metrics is None:
+            return self.get_state()
+        t = self.metrics.clock()
+        state = self.get_state()
+        self.metrics.add("state", self.metrics.clock() - t)
+        return state
+
+    def _end_tick(self):
+        """Observateurs de fin de tick (replay, télémétrie)."""
+        if self.recorder is not None:
+            self.recorder.after_tick(self)
+        if self.telemetry is not None:
+            self.telemetry.sample(self)
+
+    def get_metrics(self) -> Optional[Dict[str, Any]]:
+        """Chronométrage par phase et par joueur (None si la bataille n'est pas profilée)."""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
 
     # --------------------------------------------------
     # STATE
     # --------------------------------------------------
 
+    @staticmethod
+    def _unit_state(u) -> Dict[str, Any]:
+        return {
+            "id": id(u),
+            "symbol": u.get_symbol(),
+            "x": float(u.x),
+            "y": float(u.y),
+            "hp": float(u.current_hp),
+            "order": u._current_order,
+            "direction": u.direction,
+            "state": (
+                "dead" if not u.is_alive
+                else u._current_order or "idle"
+            )
+        }
+
+    def _state_header(self) -> Dict[str, Any]:
+        return {
+            "game_time": float(self.time),
+            "total_time": float(self.max_time),
+            "finished": bool(self.finished),
+            "winner": self.winner.name if self.winner else None,
+            "_step": self.step_count
+        }
+
     def get_state(self) -> Dict[str, Any]:
+        self.sync_units()
         state_players = []
 
         for p in self.players:
-            units_state = []
-            for u in p.squad:
-                units_state.append({
-                    "id": id(u),
-                    "symbol": u.get_symbol(),
-                    "x": float(u.x),
-                    "y": float(u.y),
-                    "hp": float(u.current_hp),
-                    "order": u._current_order,
-                    "direction": u.direction,
-                    "state": (
-                        "dead" if not u.is_alive
-                        else u._current_order or "idle"
-                    )
-                    
-                })
+            units_state = [self._unit_state(u) for u in p.squad]
 
             state_players.append({
                 "name": p.name,
@@ -208,14 +578,105 @@ class Battle:
                 "units": units_state
             })
 
-        return {
+        state = {"players": state_players}
+        state.update(self._state_header())
+        return state
+
+    # --------------------------------------------------
+    # STATE DELTA (flux versionné pour les vues)
+    # --------------------------------------------------
+
+    # Un consommateur reçoit un état complet au moins une fois par fenêtre
+    KEYFRAME_INTERVAL = 200
+
+    def _scan_changes(self):
+        """
+        Compare chaque unité à la dernière valeur enregistrée et horodate
+        (version = step_count) celles qui ont bougé, changé de PV ou d'ordre,
+        sont apparues ou ont disparu. Une seule passe par version.
+        """
+        version = self.step_count
+        if self._delta_scanned == version:
+            return
+        self._delta_scanned = version
+        self._delta_pass += 1
+        mark = self._delta_pass
+        records = self._delta_records
+
+        for p in self.players:
+            for u in p.squad:
+                rec = records.get(id(u))
+                if rec is None:
+                    # [x, y, hp, ordre, direction, vivant, version, passe]
+                    records[id(u)] = [u.x, u.y, u.current_hp, u._current_order,
+                                      u.direction, u.is_alive, version, mark]
+                    continue
+                rec[7] = mark
+                if (rec[0] != u.x or rec[1] != u.y or rec[2] != u.current_hp
+                        or rec[3] != u._current_order or rec[4] != u.direction
+                        or rec[5] != u.is_alive):
+                    rec[0], rec[1], rec[2] = u.x, u.y, u.current_hp
+                    rec[3], rec[4], rec[5] = u._current_order, u.direction, u.is_alive
+                    rec[6] = version
+
+        # Unités disparues des escouades depuis la dernière passe
+        if len(records) != sum(len(p.squad) for p in self.players):
+            for key in [k for k, rec in records.items() if rec[7] != mark]:
+                del records[key]
+                self._delta_removed.append((version, key))
+
+        # Les morts antérieures à la fenêtre courante ne servent plus (keyframe)
+        floor = (version // self.KEYFRAME_INTERVAL) * self.KEYFRAME_INTERVAL
+        if self._delta_removed and self._delta_removed[0][0] <= floor:
+            self._delta_removed = [e for e in self._delta_removed if e[0] > floor]
+
+    def get_state_delta(self, since_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Variante incrémentale de get_state() :
+        - 'players[i].units' ne contient que les unités modifiées ou apparues
+          depuis 'since_version', 'removed' liste les ids disparus ;
+        - un état complet ('keyframe': True) est renvoyé au premier appel,
+          si 'since_version' est inconnu, et à chaque changement de fenêtre
+          de KEYFRAME_INTERVAL pas.
+        Le consommateur repasse la 'version' reçue au prochain appel.
+        """
+        self.sync_units()
+        self._scan_changes()
+        version = self.step_count
+        K = self.KEYFRAME_INTERVAL
+
+        keyframe = (
+            since_version is None
+            or since_version > version
+            or since_version // K != version // K
+        )
+        if keyframe:
+            state = self.get_state()
+            state.update({"version": version, "since": since_version, "keyframe": True, "removed": []})
+            return state
+
+        records = self._delta_records
+        state_players = []
+        for p in self.players:
+            state_players.append({
+                "name": p.name,
+                "color": p.color,
+                "alive_units": self.registry.alive_count(p),
+                "units": [
+                    self._unit_state(u) for u in p.squad
+                    if records[id(u)][6] > since_version
+                ]
+            })
+
+        delta = {
             "players": state_players,
-            "game_time": float(self.time),
-            "total_time": float(self.max_time),
-            "finished": bool(self.finished),
-            "winner": self.winner.name if self.winner else None,
-            "_step": self.step_count
+            "version": version,
+            "since": since_version,
+            "keyframe": False,
+            "removed": [key for v, key in self._delta_removed if v > since_version],
         }
+        delta.update(self._state_header())
+        return delta
 
     # --------------------------------------------------
     # UTILITAIRE
@@ -230,6 +691,7 @@ class Battle:
         """
         Résumé final pour la CLI / plotting
         """
+        self.sync_units()
         result = {
             "time": self.time,
             "max_time": self.max_time,
@@ -252,51 +714,105 @@ class Battle:
         return result
     
     #Save and Load
-    def save_state(self, filename="quicksave.pkl"):
-        """Sauvegarde l'état complet de la bataille dans un fichier."""
+    def save_state(self, filename="quicksave.sav", compress: bool = True):
+        """
+        Sauvegarde l'état de la bataille : format binaire .sav (voir
+        src/core/savefile.py), pickle complet si l'état n'y tient pas
+        (ordre ou général inconnu du format).
+        """
+        from src.core.savefile import SaveFormatError, write_battle
+
+        self.sync_units()
         try:
-            with open(filename, "wb") as f:
-                pickle.dump(self, f)
+            try:
+                write_battle(self, filename, compress=compress)
+            except SaveFormatError as e:
+                print(f"⚠️ [SYSTEM] Format binaire impossible ({e}) : sauvegarde pickle")
+                with open(filename, "wb") as f:
+                    pickle.dump(self, f)
             print(f"✅ [SYSTEM] Partie sauvegardée dans '{filename}'")
         except Exception as e:
             print(f"❌ [SYSTEM] Erreur de sauvegarde : {e}")
 
     @staticmethod
-    def load_state(filename="quicksave.pkl"):
-        """Charge une bataille depuis un fichier et retourne l'objet Battle."""
+    def load_state(filename="quicksave.sav"):
+        """Charge une bataille (.sav, ou ancien pickle) et retourne l'objet Battle."""
+        from src.core.savefile import is_savefile, read_battle
+
         if not os.path.exists(filename):
             print(f"⚠️ [SYSTEM] Aucun fichier de sauvegarde trouvé : '{filename}'")
             return None
         
         try:
-            with open(filename, "rb") as f:
-                battle = pickle.load(f)
+            if is_savefile(filename):
+                battle = read_battle(filename)
+            else:
+                with open(filename, "rb") as f:
+                    battle = pickle.load(f)
             print(f"📂 [SYSTEM] Partie chargée depuis '{filename}'")
             return battle
         except Exception as e:
             print(f"❌ [SYSTEM] Erreur de chargement : {e}")
             return None
    
+    def record(self, filename: str, keyframe_every: Optional[int] = None, meta: Optional[Dict] = None):
+        """Enregistre la suite de la bataille dans un replay .rpl (voir src/core/replay.py)."""
+        from src.core.replay import ReplayRecorder, DEFAULT_KEYFRAME_EVERY
+
+        self.stop_recording()
+        self.recorder = ReplayRecorder(self, filename, keyframe_every or DEFAULT_KEYFRAME_EVERY, meta)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close(self)
+            self.recorder = None
+
+    def stream_telemetry(self, out_dir: str, chunk_ticks: Optional[int] = None):
+        """Écrit les séries par tick dans `out_dir` (fragments .npz, voir src/core/telemetry.py)."""
+        from src.core.telemetry import TelemetrySink, DEFAULT_CHUNK_TICKS
+
+        self.stop_telemetry()
+        self.telemetry = TelemetrySink(self, out_dir, chunk_ticks or DEFAULT_CHUNK_TICKS)
+        return self.telemetry
+
+    def stop_telemetry(self):
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+
     # ----Pour le tournoi cli----
 
     def run(self) -> BattleResult:
         start = time.time()
 
-        while not self.finished:
-            self.update()   # ✅ pas step()
+        # Personne ne consomme les états intermédiaires : on passe en headless
+        headless, self.headless = self.headless, True
+        try:
+            while not self.finished:
+                self.update()   # ✅ pas step()
+        finally:
+            self.headless = headless
+            self.stop_recording()
+            self.stop_telemetry()
 
         duration = time.time() - start
+        self.sync_units()
 
         if self.winner:
             remaining = len([u for u in self.winner.squad if u.current_hp > 0])
             winner_name = self.winner.name
+            hp_lost = sum(u.max_hp - max(u.current_hp, 0) for u in self.winner.squad)
         else:
             remaining = 0
             winner_name = None
+            hp_lost = 0
 
         return BattleResult(
             winner=winner_name,
             turns=self.step_count,   # ✅ cohérent
             duration=duration,
-            remaining_units=remaining
+            remaining_units=remaining,
+            winner_hp_lost=hp_lost,
+            metrics=self.get_metrics()
         )
@@ -0,0 +1,138 @@
+# src/core/bench.py
+"""
+Suite de performance standard du moteur (sous-commande `bench`).
+
+Chaque cas (scénario de SCENARIO_CONFIG, ou variante à N unités) est joué
+en headless pendant un nombre fixe de ticks, dans un processus neuf pour
+que le pic de mémoire mesuré soit le sien.
+"""
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+try:  # pic de RSS : Unix uniquement
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+from src.ai import get_general
+from src.core.battle import Battle, ENGINE_VERSION
+from src.core.scenario import SCENARIO_CONFIG, scaled_args
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+DEFAULT_TICKS = 100
+DEFAULT_THRESHOLD = 0.10   # régression si ticks/s baisse de plus de 10 %
+BENCH_SEED = 1234
+
+
+def build_cases(scenarios: Optional[List[str]] = None,
+                scaled: Optional[List[str]] = None,
+                sizes=DEFAULT_SIZES) -> List[dict]:
+    """Cas du bench : scénarios tels que configurés, puis variantes de taille."""
+    cases = []
+    for name in scenarios if scenarios is not None else list(SCENARIO_CONFIG):
+        config = SCENARIO_CONFIG[name]
+        cases.append({"name": name, "scenario": name, "args": list(config.get("args", []))})
+    for name in scaled if scaled is not None else ["lanchester"]:
+        for N in sizes:
+            cases.append({"name": f"{name}@N={N}", "scenario": name, "args": scaled_args(name, N)})
+    return cases
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Ko sous Linux, octets sous macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(case: dict, ticks: int = DEFAULT_TICKS, general: str = "daft",
+             engine: str = "python") -> dict:
+    """Construit et joue un cas ; renvoie ses mesures."""
+    config = SCENARIO_CONFIG[case["scenario"]]
+
+    start = time.perf_counter()
+    players, world_map = config["fn"](*case["args"], get_general(general), get_general(general), seed=BENCH_SEED)
+    battle = Battle(players, world_map, engine=engine, headless=True, seed=BENCH_SEED)
+    build_time = time.perf_counter() - start
+
+    units = len(battle.registry.units)
+    unit_ticks = 0
+    start = time.perf_counter()
+    while battle.step_count < ticks and not battle.finished:
+        unit_ticks += len(battle.registry.units)
+        battle.update()
+    elapsed = time.perf_counter() - start
+    done = battle.step_count
+
+    return {
+        "units": units,
+        "ticks": done,
+        "ticks_per_sec": round(done / elapsed, 2) if elapsed > 0 else None,
+        "us_per_unit_tick": round(elapsed / unit_ticks * 1e6, 3) if unit_ticks else None,
+        "build_time_s": round(build_time, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_isolated(case: dict, **kwargs) -> dict:
+    # Un processus par cas : le pic de RSS ne cumule pas les cas précédents
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run_case, case, **kwargs).result()
+
+
+def run_suite(cases: List[dict], ticks: int = DEFAULT_TICKS, general: str = "daft",
+              engine: str = "python", isolate: bool = True, log=None) -> Dict:
+    results = {}
+    for case in cases:
+        runner = _run_isolated if isolate else run_case
+        results[case["name"]] = runner(case, ticks=ticks, general=general, engine=engine)
+        if log is not None:
+            r = results[case["name"]]
+            log(f"⏱  {case['name']:<22} {r['ticks_per_sec']} ticks/s, {r['us_per_unit_tick']} µs/unité-tick")
+    return {
+        "meta": {
+            "ticks": ticks,
+            "general": general,
+            "engine": engine,
+            "engine_version": ENGINE_VERSION,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+# ============================================================
+# COMPARAISON AVEC UNE RÉFÉRENCE
+# ============================================================
+
+def compare(report: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Compare ticks/s cas par cas ; renvoie une ligne par cas commun,
+    `regression` à True si la baisse dépasse `threshold`.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, cur in report.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or not base.get("ticks_per_sec") or not cur.get("ticks_per_sec"):
+            continue
+        ratio = cur["ticks_per_sec"] / base["ticks_per_sec"]
+        rows.append({
+            "name": name,
+            "baseline": base["ticks_per_sec"],
+            "current": cur["ticks_per_sec"],
+            "change": ratio - 1.0,
+            "regression": ratio < 1.0 - threshold,
+        })
+    return rows
+
+
+def load_report(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,412 @@
+"""
+engine_numpy.py
+---------------
+Backend de simulation "structure de tableaux" (NumPy) pour Battle.
+
+Positions, PV, cooldowns, windups, codes d'ordre et indices de cible sont
+stockés dans des tableaux contigus ; un pas de simulation (windup, portée,
+déplacement, séparation, glissade, dégâts) est entièrement vectorisé.
+
+Les objets Unit restent la façade publique : ils sont resynchronisés
+depuis les tableaux à la demande (avant les IA, get_state(), sauvegarde),
+si bien que les généraux et les vues fonctionnent sans modification.
+
+Différence assumée avec le moteur Python : toutes les unités sont mises à
+jour "en même temps" à partir de l'état du début du pas (au lieu d'une à
+une dans l'ordre des escouades).
+"""
+
+import numpy as np
+
+from src.core.units import UnitType
+
+TILE = 32.0
+
+ORDER_NONE, ORDER_MOVE, ORDER_ATTACK, ORDER_HOLD = 0, 1, 2, 3
+ORDER_CODES = {None: ORDER_NONE, "move": ORDER_MOVE, "attack": ORDER_ATTACK, "hold": ORDER_HOLD}
+
+DIRECTIONS = ("down", "right", "up", "left")
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+
+WINDUP_TIME = 0.12   # identique à Unit.update
+RANGE_SLACK = 5.0    # marge de tolérance de Unit.update
+
+
+class NumpyEngine:
+    """Moteur vectorisé : l'état de référence vit dans les tableaux, les Unit en sont des vues."""
+
+    def __init__(self, battle):
+        self.battle = battle
+        self.world_map = battle.world_map
+
+        # Indices stables : une unité garde sa ligne jusqu'à la fin de la bataille
+        self.units = [u for p in battle.players for u in p.squad]
+        n = len(self.units)
+        for i, u in enumerate(self.units):
+            u._eidx = i
+
+        player_index = {id(p): k for k, p in enumerate(battle.players)}
+        self.player = np.array([player_index[id(u.player)] for u in self.units], dtype=np.int32)
+
+        self._build_stats()
+        self._build_terrain()
+
+        self.x = np.zeros(n)
+        self.y = np.zeros(n)
+        self.hp = np.zeros(n)
+        self.alive = np.zeros(n, dtype=bool)
+        self.cooldown = np.zeros(n)
+        self.windup = np.zeros(n)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.order = np.zeros(n, dtype=np.int8)
+        self.target = np.full(n, -1, dtype=np.int64)
+        self.move_x = np.zeros(n)
+        self.move_y = np.zeros(n)
+
+        self.load_from_units()
+
+    # --------------------------------------------------
+    # CONSTRUCTION
+    # --------------------------------------------------
+
+    def _build_stats(self):
+        classes = []
+        for u in self.units:
+            if type(u) not in classes:
+                classes.append(type(u))
+        self.classes = classes
+        cls_index = {cls: k for k, cls in enumerate(classes)}
+        self.type = np.array([cls_index[type(u)] for u in self.units], dtype=np.int32)
+        # Indice de chaque classe dans l'enum UnitType (colonnes de la télémétrie)
+        unit_types = list(UnitType)
+        self.type_code = np.array([unit_types.index(cls.unit_type) for cls in classes], dtype=np.int64)
+
+        # Les fiches UnitStats des types deviennent des colonnes par unité
+        records = [cls.stats for cls in classes]
+
+        def table(field, dtype=float):
+            per_type = np.array([getattr(st, field) for st in records], dtype=dtype)
+            return per_type[self.type] if len(self.units) else np.zeros(0, dtype=dtype)
+
+        self.max_hp = table("max_hp")
+        self.attack = table("attack")
+        self.melee_armor = table("melee_armor")
+        self.pierce_armor = table("pierce_armor")
+        self.range = table("range")
+        self.reload = table("reload_time")
+        self.speed = table("speed")
+        self.radius = table("collision_radius")
+        self.pierce = np.array([st.damage_type != "melee" for st in records], dtype=bool)[self.type]
+        self.bonus = np.array(
+            [[dict(a.bonus).get(b.unit_type, 0) for b in classes] for a in records], dtype=float
+        ).reshape(len(records), len(records))
+
+        max_radius = float(self.radius.max()) if len(self.units) else 0.0
+        self.cell_size = max(TILE, 2.0 * max_radius)
+
+    def _build_terrain(self):
+        m = self.world_map
+        self.width = float(m.width)
+        self.height = float(m.height)
+        # Pas de la clé de cellule pour la séparation (marge pour les voisins hors carte)
+        self._stride = int(self.height // self.cell_size) + 3
+
+    def load_from_units(self):
+        """(Re)lit l'état complet depuis les objets Unit."""
+        for i, u in enumerate(self.units):
+            self.x[i] = u.x
+            self.y[i] = u.y
+            self.hp[i] = u.current_hp
+            self.alive[i] = u.is_alive
+            self.cooldown[i] = u.attack_cooldown
+            self.windup[i] = u.attack_windup_timer
+            self.direction[i] = DIRECTION_CODES.get(u.direction, 0)
+        self.pull_orders(self.units)
+        self.dirty = False
+
+    def pull_orders(self, units):
+        """Recopie dans les tableaux les ordres posés sur les Unit (après les IA)."""
+        for u in units:
+            i = getattr(u, "_eidx", None)
+            if i is None:
+                continue
+            code = ORDER_CODES.get(u._current_order, ORDER_NONE)
+            self.order[i] = code
+            self.target[i] = -1
+            if code == ORDER_ATTACK:
+                target = u._order_data.get("target")
+                self.target[i] = getattr(target, "_eidx", -1) if target is not None else -1
+            elif code == ORDER_MOVE:
+                self.move_x[i], self.move_y[i] = u._order_data.get("position", (u.x, u.y))
+
+    def apply_orders(self, units_idx, enemy_idx, target, move=None, hold=None):
+        """
+        Ordres d'un général « tableaux » écrits directement dans les tableaux
+        (indices moteur des unités et des ennemis) ; les Unit suivront au sync().
+        """
+        attack = target >= 0
+        i = units_idx[attack]
+        self.order[i] = ORDER_ATTACK
+        self.target[i] = enemy_idx[target[attack]]
+        rest = ~attack
+        if move is not None:
+            moving = rest & ~np.isnan(move[:, 0])
+            i = units_idx[moving]
+            self.order[i] = ORDER_MOVE
+            self.target[i] = -1
+            self.move_x[i], self.move_y[i] = move[moving, 0], move[moving, 1]
+            rest &= ~moving
+        if hold is not None:
+            i = units_idx[rest & hold]
+            self.order[i] = ORDER_HOLD
+            self.target[i] = -1
+        self.dirty = True
+
+    # --------------------------------------------------
+    # SYNCHRONISATION VERS LES UNIT
+    # --------------------------------------------------
+
+    def sync(self):
+        """Recopie positions, timers, directions et ordres dans les Unit."""
+        if not self.dirty:
+            return
+        world_map = self.world_map
+        units = self.units
+        xs, ys = self.x.tolist(), self.y.tolist()
+        hps = self.hp.tolist()
+        cds, wus = self.cooldown.tolist(), self.windup.tolist()
+        dirs, orders = self.direction.tolist(), self.order.tolist()
+        targets = self.target.tolist()
+        alive = self.alive.tolist()
+        for i, u in enumerate(units):
+            if not alive[i]:
+                continue
+            u.x, u.y = xs[i], ys[i]
+            u.current_hp = int(hps[i])
+            u.attack_cooldown = cds[i]
+            u.attack_windup_timer = wus[i]
+            u.direction = DIRECTIONS[dirs[i]]
+            code = orders[i]
+            if code == ORDER_NONE:
+                if u._current_order is not None:
+                    u.clear_order()
+            elif code == ORDER_ATTACK:
+                # Ordres posés par un général « tableaux » : dict créé seulement au changement
+                target = units[targets[i]]
+                if u._current_order != "attack" or u._order_data.get("target") is not target:
+                    u.set_order("attack", {"target": target})
+            elif code == ORDER_HOLD and u._current_order != "hold":
+                u.set_order("hold", {})
+            elif code == ORDER_MOVE:
+                position = (float(self.move_x[i]), float(self.move_y[i]))
+                if u._current_order != "move" or u._order_data.get("position") != position:
+                    u.set_order("move", {"position": position})
+            world_map.update_unit_position(u)
+        self.dirty = False
+
+    def _kill(self, idx):
+        """Les morts sont propagées tout de suite (registre et victoire en dépendent)."""
+        registry = self.battle.registry
+        for i in idx.tolist():
+            u = self.units[i]
+            u.current_hp = 0
+            u.is_alive = False
+            u.clear_order()
+            registry.mark_dead(u)
+
+    # --------------------------------------------------
+    # OUTILS VECTORISÉS
+    # --------------------------------------------------
+
+    def _elevation(self, x, y):
+        return self.world_map.get_elevation_at_many(x, y)
+
+    def _can_move(self, x0, y0, x1, y1):
+        """Équivalent vectorisé de Map.can_move_to (bornes + falaises)."""
+        inside = (x1 >= 0) & (x1 < self.width) & (y1 >= 0) & (y1 < self.height)
+        cliff = np.abs(self._elevation(x1, y1) - self._elevation(x0, y0)) > 1
+        return inside & ~cliff
+
+    def _set_direction(self, idx, dx, dy):
+        moving = ~((np.abs(dx) < 0.01) & (np.abs(dy) < 0.01))
+        angle = np.degrees(np.arctan2(dy, dx))
+        code = np.select(
+            [(angle >= -45) & (angle <= 45), (angle > 45) & (angle <= 135), (angle >= -135) & (angle < -45)],
+            [DIRECTION_CODES["right"], DIRECTION_CODES["down"], DIRECTION_CODES["up"]],
+            DIRECTION_CODES["left"],
+        )
+        self.direction[idx[moving]] = code[moving]
+
+    def _clear(self, idx):
+        self.order[idx] = ORDER_NONE
+        self.target[idx] = -1
+
+    def _neighbor_pairs(self, queries, data):
+        """
+        Paires candidates (q, d) dont les cellules sont voisines (3x3),
+        via un tri des clés de cellule + searchsorted.
+        """
+        cs, stride = self.cell_size, self._stride
+        dkey = (self.x[data] // cs).astype(np.int64) * stride + (self.y[data] // cs).astype(np.int64) + 1
+        order = np.argsort(dkey, kind="stable")
+        skeys, sdata = dkey[order], data[order]
+
+        qcx = (self.x[queries] // cs).astype(np.int64)
+        qcy = (self.y[queries] // cs).astype(np.int64) + 1
+        parts_q, parts_d = [], []
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                nkey = (qcx + ox) * stride + (qcy + oy)
+                lo = np.searchsorted(skeys, nkey, side="left")
+                hi = np.searchsorted(skeys, nkey, side="right")
+                counts = hi - lo
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                starts = np.repeat(lo, counts)
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                parts_q.append(np.repeat(queries, counts))
+                parts_d.append(sdata[starts + offsets])
+        if not parts_q:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(parts_q), np.concatenate(parts_d)
+
+    # --------------------------------------------------
+    # PAS DE SIMULATION
+    # --------------------------------------------------
+
+    def step(self, dt: float):
+        alive = self.alive
+        if not alive.any():
+            return
+        self.dirty = True
+        n = len(self.units)
+
+        np.maximum(self.cooldown - dt, 0.0, out=self.cooldown)
+
+        # 1) Windup : les frappes arrivent à échéance
+        in_windup = alive & (self.windup > 0)
+        self.windup[in_windup] -= dt
+        firing = np.flatnonzero(in_windup & (self.windup <= 0))
+        if firing.size:
+            self._fire(firing)
+
+        # 2) Ordres d'attaque : cible perdue, à portée (windup) ou poursuite
+        active = self.alive & ~in_windup
+        stay = np.zeros(n, dtype=bool)
+        attacking = np.flatnonzero(active & (self.order == ORDER_ATTACK))
+        if attacking.size:
+            t = self.target[attacking]
+            valid = t >= 0
+            valid[valid] = self.alive[t[valid]]
+            lost = attacking[~valid]
+            self._clear(lost)
+            stay[lost] = True
+
+            a, t = attacking[valid], t[valid]
+            dx, dy = self.x[t] - self.x[a], self.y[t] - self.y[a]
+            self._set_direction(a, dx, dy)
+            dist = np.hypot(dx, dy)
+            eff_range = self.range[a] + self.radius[a] + self.radius[t]
+            near = dist <= eff_range + RANGE_SLACK
+            ready = near & (self.cooldown[a] <= 0)
+            self.windup[a[ready]] = WINDUP_TIME
+            stay[a[near]] = True
+
+        movers = np.flatnonzero(active & ~stay)
+        if movers.size:
+            self._move(movers, dt)
+
+    def _fire(self, src):
+        t = self.target[src]
+        ok = t >= 0
+        ok[ok] = self.alive[t[ok]]
+        src, t = src[ok], t[ok]
+        if not src.size:
+            return
+
+        raw = self.attack[src] + self.bonus[self.type[src], self.type[t]]
+        my_el = self._elevation(self.x[src], self.y[src])
+        target_el = self._elevation(self.x[t], self.y[t])
+        raw = np.where(my_el > target_el, raw * 1.25, np.where(my_el < target_el, raw * 0.75, raw))
+        armor = np.where(self.pierce[src], self.pierce_armor[t], self.melee_armor[t])
+        damage = np.maximum(1.0, np.trunc(raw) - armor)  # minimum 1 dégât
+
+        np.subtract.at(self.hp, t, damage)
+        self.cooldown[src] = self.reload[src]
+        telemetry = self.battle.telemetry
+        if telemetry is not None:
+            telemetry.add_damage_many(self.player[src], self.type_code[self.type[src]], damage)
+
+        dead = np.flatnonzero(self.alive & (self.hp <= 0))
+        if dead.size:
+            self.hp[dead] = 0
+            self.alive[dead] = False
+            self._clear(dead)
+            # L'attaquant qui a achevé sa cible abandonne l'ordre
+            self._clear(src[~self.alive[t]])
+            self._kill(dead)
+
+    def _move(self, i, dt):
+        x, y = self.x[i], self.y[i]
+        code = self.order[i]
+        vx = np.zeros(i.size)
+        vy = np.zeros(i.size)
+
+        # Point visé : position de l'ordre "move" ou cible hors de portée
+        has_goal = np.zeros(i.size, dtype=bool)
+        gx, gy = x.copy(), y.copy()
+        move = code == ORDER_MOVE
+        gx[move], gy[move] = self.move_x[i[move]], self.move_y[i[move]]
+        has_goal |= move
+        chase = code == ORDER_ATTACK
+        if chase.any():
+            t = self.target[i[chase]]
+            gx[chase], gy[chase] = self.x[t], self.y[t]
+            has_goal |= chase
+
+        dx, dy = gx - x, gy - y
+        dist = np.hypot(dx, dy)
+        go = has_goal & (dist > 0.1)
+        if go.any():
+            c_el = self._elevation(x[go], y[go])
+            t_el = self._elevation(gx[go], gy[go])
+            speed_mod = np.where(t_el > c_el, 0.6, np.where(t_el < c_el, 1.2, 1.0))
+            scale = self.speed[i[go]] * speed_mod / dist[go]
+            vx[go] = dx[go] * scale
+            vy[go] = dy[go] * scale
+
+        # Séparation (anti-empilement) contre toutes les unités vivantes
+        q, d = self._neighbor_pairs(i, np.flatnonzero(self.alive))
+        if q.size:
+            sx, sy = self.x[q] - self.x[d], self.y[q] - self.y[d]
+            dist_sq = sx * sx + sy * sy
+            min_dist = (self.radius[q] + self.radius[d]) * 0.9
+            close = (q != d) & (dist_sq > 0) & (dist_sq < min_dist * min_dist)
+            if close.any():
+                q, sx, sy, min_dist = q[close], sx[close], sy[close], min_dist[close]
+                dd = np.sqrt(dist_sq[close])
+                push = (min_dist - dd) / min_dist * self.speed[q] * 1.5
+                # q est trié par bloc de requête : on repasse en position locale
+                local = np.searchsorted(i, q)
+                vx += np.bincount(local, weights=sx / dd * push, minlength=i.size)
+                vy += np.bincount(local, weights=sy / dd * push, minlength=i.size)
+
+        moving = (vx != 0) | (vy != 0)
+        if not moving.any():
+            return
+        i, x, y, vx, vy, code = i[moving], x[moving], y[moving], vx[moving], vy[moving], code[moving]
+        free = code != ORDER_ATTACK
+        self._set_direction(i[free], vx[free], vy[free])
+
+        nx, ny = x + vx * dt, y + vy * dt
+        # Glissade : plein déplacement, sinon axe X seul, sinon axe Y seul
+        ok_full = self._can_move(x, y, nx, ny)
+        ok_x = self._can_move(x, y, nx, y)
+        ok_y = self._can_move(x, y, x, ny)
+        new_x = np.where(ok_full | ok_x, nx, x)
+        new_y = np.where(ok_full, ny, np.where(ok_x, y, np.where(ok_y, ny, y)))
+
+        self.x[i] = np.clip(new_x, 0.0, self.width - 1e-3)
+        self.y[i] = np.clip(new_y, 0.0, self.height - 1e-3)
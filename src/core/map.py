@@ -1,16 +1,243 @@
+import bisect
 import math
-import random
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 # On s'assure que TILE est défini (32.0 par défaut dans ton projet)
 TILE = 32.0
 
+
+class SpatialHash:
+    """
+    Grille uniforme de buckets pour les requêtes de voisinage.
+    Chaque unité est rangée dans la cellule qui contient sa position ;
+    une requête de rayon r ne parcourt que les cellules qui recouvrent
+    le disque au lieu de toutes les unités de la bataille.
+    """
+
+    def __init__(self, cell_size: float = TILE):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Tuple[int, int], List] = {}
+        self.max_radius = 0.0  # plus grand rayon de collision indexé
+
+    def _key(self, x: float, y: float) -> Tuple[int, int]:
+        cs = self.cell_size
+        return int(x // cs), int(y // cs)
+
+    def clear(self):
+        self.cells.clear()
+        self.max_radius = 0.0
+
+    def insert(self, unit):
+        key = self._key(unit.x, unit.y)
+        # Listes (et non sets) : l'ordre d'itération reste déterministe
+        self.cells.setdefault(key, []).append(unit)
+        unit._cell = key
+        self.max_radius = max(self.max_radius, unit.get_collision_radius())
+
+    def remove(self, unit):
+        key = getattr(unit, "_cell", None)
+        if key is None:
+            return
+        bucket = self.cells.get(key)
+        if bucket is not None:
+            try:
+                bucket.remove(unit)
+            except ValueError:
+                pass
+            if not bucket:
+                del self.cells[key]
+        unit._cell = None
+
+    def move(self, unit) -> bool:
+        """Met à jour la cellule d'une unité. Renvoie True si elle a changé de cellule."""
+        key = self._key(unit.x, unit.y)
+        old = getattr(unit, "_cell", None)
+        if key == old:
+            return False
+        if old is not None:
+            self.remove(unit)
+        self.cells.setdefault(key, []).append(unit)
+        unit._cell = key
+        return True
+
+    def candidates(self, x: float, y: float, radius: float):
+        """Itère sur les unités des cellules recouvrant le carré [x±r, y±r] (sans filtre de distance)."""
+        cs = self.cell_size
+        cx0, cx1 = int((x - radius) // cs), int((x + radius) // cs)
+        cy0, cy1 = int((y - radius) // cs), int((y + radius) // cs)
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query(self, x: float, y: float, radius: float) -> List:
+        """Unités vivantes à distance <= radius de (x, y)."""
+        r2 = radius * radius
+        found = []
+        for u in self.candidates(x, y, radius):
+            if not u.is_alive:
+                continue
+            dx, dy = u.x - x, u.y - y
+            if dx * dx + dy * dy <= r2:
+                found.append(u)
+        return found
+
+
+class EnemyIndex:
+    """
+    Index des ennemis d'un joueur pour les généraux, reconstruit à chaque
+    tick (voir Map.get_enemy_index). Grille uniforme propre aux ennemis,
+    parcourue par anneaux de cellules autour du point de requête.
+
+    Les distances sont calculées comme Unit.distance_to et, à distance
+    égale, l'ennemi le plus tôt dans l'ordre des escouades l'emporte :
+    mêmes réponses qu'un min() sur la liste complète.
+    """
+
+    def __init__(self, units: List, cell_size: Optional[float] = None):
+        self.units = units
+        n = len(units)
+        if cell_size is None:
+            # ~2 ennemis par cellule en moyenne, jamais moins d'une TILE
+            if n:
+                xs = [u.x for u in units]
+                ys = [u.y for u in units]
+                area = (max(xs) - min(xs) + TILE) * (max(ys) - min(ys) + TILE)
+                cell_size = max(TILE, math.sqrt(area * 2.0 / n))
+            else:
+                cell_size = TILE
+        self.cell_size = cs = float(cell_size)
+        self.cells: Dict[Tuple[int, int], List] = {}
+        cells = self.cells
+        for i, u in enumerate(units):
+            key = (int(u.x // cs), int(u.y // cs))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [(i, u)]
+            else:
+                bucket.append((i, u))
+        if cells:
+            kx = [k[0] for k in cells]
+            ky = [k[1] for k in cells]
+            self._bbox = (min(kx), max(kx), min(ky), max(ky))
+        else:
+            self._bbox = (0, -1, 0, -1)
+        self._by_type: Dict[Tuple, "EnemyIndex"] = {}
+        self._weakest = None
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def _ring(self, cx: int, cy: int, k: int):
+        """Clés des cellules à distance de Tchebychev k de (cx, cy), bornées aux cellules occupées."""
+        x0, x1, y0, y1 = self._bbox
+        if k == 0:
+            yield (cx, cy)
+            return
+        for y in (cy - k, cy + k):
+            if y0 <= y <= y1:
+                for x in range(max(cx - k, x0), min(cx + k, x1) + 1):
+                    yield (x, y)
+        for x in (cx - k, cx + k):
+            if x0 <= x <= x1:
+                for y in range(max(cy - k + 1, y0), min(cy + k - 1, y1) + 1):
+                    yield (x, y)
+
+    def _max_ring(self, cx: int, cy: int, max_dist: float) -> int:
+        x0, x1, y0, y1 = self._bbox
+        k = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        if max_dist != math.inf:
+            k = min(k, int(max_dist // self.cell_size) + 1)
+        return k
+
+    def k_nearest(self, x: float, y: float, k: int, max_dist: float = math.inf) -> List:
+        """Les k ennemis les plus proches de (x, y) (à distance <= max_dist), du plus proche au plus lointain."""
+        if k <= 0 or not self.units:
+            return []
+        cs = self.cell_size
+        cx, cy = int(x // cs), int(y // cs)
+        cells = self.cells
+        best: List[Tuple[float, int, object]] = []
+        for ring in range(self._max_ring(cx, cy, max_dist) + 1):
+            # Tout ce qui reste est à au moins (ring - 1) cellules du point
+            if len(best) == k and best[-1][0] < (ring - 1) * cs:
+                break
+            for key in self._ring(cx, cy, ring):
+                bucket = cells.get(key)
+                if not bucket:
+                    continue
+                for i, u in bucket:
+                    dx, dy = x - u.x, y - u.y
+                    d = math.sqrt(dx * dx + dy * dy)
+                    if d > max_dist:
+                        continue
+                    if len(best) < k or (d, i) < best[-1][:2]:
+                        # (d, i) est unique : la comparaison n'atteint jamais l'unité
+                        bisect.insort(best, (d, i, u))
+                        if len(best) > k:
+                            best.pop()
+        return [u for _, _, u in best]
+
+    def nearest(self, x: float, y: float, max_dist: float = math.inf):
+        """Ennemi le plus proche de (x, y), ou None s'il n'y en a aucun à distance <= max_dist."""
+        if not self.units:
+            return None
+        cs = self.cell_size
+        cx, cy = int(x // cs), int(y // cs)
+        cells = self.cells
+        best, best_d, best_i = None, math.inf, -1
+        for ring in range(self._max_ring(cx, cy, max_dist) + 1):
+            if best is not None and best_d < (ring - 1) * cs:
+                break
+            for key in self._ring(cx, cy, ring):
+                bucket = cells.get(key)
+                if not bucket:
+                    continue
+                for i, u in bucket:
+                    dx, dy = x - u.x, y - u.y
+                    d = math.sqrt(dx * dx + dy * dy)
+                    if d < best_d or (d == best_d and i < best_i):
+                        best, best_d, best_i = u, d, i
+        if best is None or best_d > max_dist:
+            return None
+        return best
+
+    def of_type(self, unit_types) -> "EnemyIndex":
+        """Sous-index des ennemis des types donnés (construit à la demande, gardé pour le tick)."""
+        key = tuple(unit_types)
+        sub = self._by_type.get(key)
+        if sub is None:
+            sub = EnemyIndex([u for u in self.units if u.unit_type in key])
+            self._by_type[key] = sub
+        return sub
+
+    def has_type(self, unit_types) -> bool:
+        return len(self.of_type(unit_types)) > 0
+
+    def nearest_of_type(self, x: float, y: float, unit_types, max_dist: float = math.inf):
+        """Ennemi le plus proche parmi les types donnés, ou None."""
+        return self.of_type(unit_types).nearest(x, y, max_dist)
+
+    def weakest(self):
+        """Ennemi aux PV les plus bas (le premier dans l'ordre des escouades en cas d'égalité)."""
+        if self._weakest is None and self.units:
+            self._weakest = min(self.units, key=lambda e: e.current_hp)
+        return self._weakest
+
+
 class Map:
     """Classe Map - Gestion du terrain, collisions, recherche d'unités et élévation"""
 
-    def __init__(self, width: float, height: float, collision_allowance: float = 0.5):
+    def __init__(self, width: float, height: float, collision_allowance: float = 0.5,
+                 seed: Optional[int] = None):
         self.width = width
         self.height = height
+        # Graine du terrain : None = générateur global numpy (non reproductible)
+        self.seed = seed
 
         # 1. Gestion des collisions (ton code)
         # collision_allowance ∈ (0, 1]
@@ -20,32 +247,60 @@ class Map:
         self.grid_w = int(width // TILE)
         self.grid_h = int(height // TILE)
         
-        # Génération 50% niv 0, 30% niv 1, 20% niv 2
-        self.elevation_grid = []
-        for i in range(self.grid_w):
-            column = []
-            for j in range(self.grid_h):
-                r = random.random()
-                level = 0 if r < 0.50 else (1 if r < 0.80 else 2)
-                column.append(level)
-            self.elevation_grid.append(column)
-        
+        # Génération 50% niv 0, 30% niv 1, 20% niv 2 (tirage vectorisé)
+        rng = np.random.default_rng(seed) if seed is not None else np.random
+        r = rng.random((self.grid_w, self.grid_h))
+        self.elevation_grid = np.where(r < 0.50, 0, np.where(r < 0.80, 1, 2)).astype(np.uint8)
+
         # Lissage pour créer des zones cohérentes
         self._smooth_elevation()
 
+        # 3. Index spatial (rempli par Battle via build_spatial_index)
+        self.spatial = SpatialHash(TILE)
+
+        # 4. Index des ennemis par joueur pour les généraux (vidé à chaque tick par Battle)
+        self._enemy_indexes: Dict = {}
+
+    @classmethod
+    def from_elevation(cls, width: float, height: float, grid, collision_allowance: float = 0.5,
+                       seed: Optional[int] = None) -> "Map":
+        """Carte au relief donné (chargement d'une sauvegarde) : aucun tirage."""
+        m = cls.__new__(cls)
+        m.width = width
+        m.height = height
+        m.seed = seed
+        m.collision_allowance = max(0.6, min(1.0, collision_allowance))
+        m.elevation_grid = grid
+        m.spatial = SpatialHash(TILE)
+        m._enemy_indexes = {}
+        return m
+
     def _smooth_elevation(self):
         """Lissage pour éviter l'effet damier et créer des collines groupées"""
         for _ in range(2):
-            new_grid = [row[:] for row in self.elevation_grid]
-            for i in range(1, self.grid_w - 1):
-                for j in range(1, self.grid_h - 1):
-                    neighbors = [
-                        self.elevation_grid[i-1][j], self.elevation_grid[i+1][j],
-                        self.elevation_grid[i][j-1], self.elevation_grid[i][j+1]
-                    ]
-                    new_grid[i][j] = round(sum(neighbors) / len(neighbors))
+            g = self.elevation_grid.astype(np.int16)
+            new_grid = g.copy()
+            # Moyenne des 4 voisins sur l'intérieur de la grille (stencil en croix).
+            # np.rint arrondit au pair le plus proche, comme round().
+            neighbors = g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:]
+            new_grid[1:-1, 1:-1] = np.rint(neighbors / 4.0)
             self.elevation_grid = new_grid
 
+    @property
+    def elevation_grid(self) -> np.ndarray:
+        """Niveaux d'élévation (grid_w, grid_h), en lecture seule : réassigner pour modifier."""
+        return self._elevation_grid
+
+    @elevation_grid.setter
+    def elevation_grid(self, grid):
+        # Copie figée + copie plate (bytes) pour get_elevation_at : les lectures
+        # scalaires et vectorisées voient toujours la même grille
+        grid = np.array(grid, dtype=np.uint8)
+        grid.flags.writeable = False
+        self._elevation_grid = grid
+        self.grid_w, self.grid_h = grid.shape
+        self._elevation_bytes = grid.tobytes()
+
     # --------------------------------------------------
     # NOUVELLE FONCTION ÉLÉVATION
     # --------------------------------------------------
@@ -53,9 +308,20 @@ class Map:
     def get_elevation_at(self, x: float, y: float) -> int:
         ix, iy = int(x // TILE), int(y // TILE)
         if 0 <= ix < self.grid_w and 0 <= iy < self.grid_h:
-            return self.elevation_grid[ix][iy]
+            return self._elevation_bytes[ix * self.grid_h + iy]
         return 0
 
+    def get_elevation_at_many(self, xs, ys) -> np.ndarray:
+        """Version vectorisée de get_elevation_at pour des tableaux de positions."""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        ix = np.floor_divide(xs, TILE).astype(np.int64)
+        iy = np.floor_divide(ys, TILE).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.grid_w) & (iy >= 0) & (iy < self.grid_h)
+        out = np.zeros(xs.shape, dtype=np.int16)
+        out[inside] = self.elevation_grid[ix[inside], iy[inside]]
+        return out
+
     # --------------------------------------------------
     # DIMENSIONS (Ton code conservé)
     # --------------------------------------------------
@@ -94,10 +360,60 @@ class Map:
         return True
 
     # --------------------------------------------------
-    # RECHERCHE D’UNITÉS (Ton code intégralement conservé)
+    # INDEX SPATIAL
     # --------------------------------------------------
 
-    def get_units_at_position(self, x: float, y: float, radius: float, all_units: List) -> List:
+    def build_spatial_index(self, units: List):
+        """
+        (Re)construit l'index spatial. La taille de cellule vaut au moins une
+        TILE et au moins le diamètre de la plus grosse unité, pour que la
+        séparation ne regarde jamais plus loin que les 8 cellules voisines.
+        """
+        max_radius = max((u.get_collision_radius() for u in units), default=0.0)
+        self.spatial = SpatialHash(max(TILE, 2.0 * max_radius))
+        for u in units:
+            if getattr(u, "is_alive", False):
+                self.spatial.insert(u)
+
+    def update_unit_position(self, unit) -> bool:
+        return self.spatial.move(unit)
+
+    def remove_unit(self, unit):
+        self.spatial.remove(unit)
+
+    def get_neighbors(self, x: float, y: float, radius: float):
+        """Candidats proches de (x, y) sans filtre de distance (pour les boucles chaudes)."""
+        return self.spatial.candidates(x, y, radius)
+
+    def get_enemy_index(self, player, all_players) -> EnemyIndex:
+        """
+        Index des ennemis vivants de `player`, construit au premier appel du
+        tick puis partagé par toutes les requêtes du général.
+        """
+        indexes = getattr(self, "_enemy_indexes", None)
+        if indexes is None:
+            indexes = self._enemy_indexes = {}
+        index = indexes.get(player)
+        if index is None:
+            enemies = []
+            for p in all_players:
+                if p != player:
+                    enemies.extend(p.get_alive_units())
+            index = indexes[player] = EnemyIndex(enemies)
+        return index
+
+    def invalidate_enemy_indexes(self):
+        """Appelé par Battle à chaque tick : les positions et PV ont changé."""
+        self._enemy_indexes = {}
+
+    # --------------------------------------------------
+    # RECHERCHE D’UNITÉS
+    # --------------------------------------------------
+
+    def get_units_at_position(self, x: float, y: float, radius: float, all_units: Optional[List] = None) -> List:
+        # Sans liste explicite, on passe par l'index spatial
+        if all_units is None:
+            return self.spatial.query(x, y, radius)
         units_in_range = []
         for unit in all_units:
             if getattr(unit, 'is_alive', True):
@@ -106,9 +422,11 @@ class Map:
                     units_in_range.append(unit)
         return units_in_range
 
-    def get_units_in_line_of_sight(self, unit, all_units: List) -> List:
-        units_in_sight = []
+    def get_units_in_line_of_sight(self, unit, all_units: Optional[List] = None) -> List:
         sight_range = unit.get_line_of_sight()
+        if all_units is None:
+            return [u for u in self.spatial.query(unit.x, unit.y, sight_range) if u is not unit]
+        units_in_sight = []
         for other in all_units:
             if other is unit or not getattr(other, 'is_alive', True):
                 continue
@@ -0,0 +1,117 @@
+# src/core/metrics.py
+"""
+Chronométrage par phase de Battle.update (activé par Battle(profile=True)).
+
+Désactivé, Battle n'en garde aucune instance : le coût se limite à un
+test `is not None` par phase et par tick.
+"""
+from time import perf_counter
+from typing import Dict, List, Optional
+
+# Phases de Battle.update, dans l'ordre d'exécution.
+# "units" couvre update + clamp + index spatial : les passes sont fusionnées.
+PHASES = ("ai", "units", "victory", "cleanup", "state")
+
+
+class BattleMetrics:
+    """Compteurs cumulés et du dernier tick, par phase et par joueur."""
+
+    clock = staticmethod(perf_counter)
+
+    def __init__(self):
+        self.ticks = 0
+        self.total: Dict[str, float] = {p: 0.0 for p in PHASES}
+        self.last: Dict[str, float] = {p: 0.0 for p in PHASES}
+        self.units_updated = 0
+        self.last_units_updated = 0
+        # nom du joueur -> {"time", "calls", "orders", "units"}
+        self.players: Dict[str, Dict[str, float]] = {}
+
+    def begin_tick(self):
+        self.ticks += 1
+        for p in PHASES:
+            self.last[p] = 0.0
+
+    def add(self, phase: str, seconds: float):
+        self.total[phase] += seconds
+        self.last[phase] += seconds
+
+    def add_units(self, n: int):
+        self.units_updated += n
+        self.last_units_updated = n
+
+    def add_orders(self, player_name: str, seconds: float, units: int, orders: int):
+        rec = self.players.get(player_name)
+        if rec is None:
+            rec = self.players[player_name] = {"time": 0.0, "calls": 0, "orders": 0, "units": 0}
+        rec["time"] += seconds
+        rec["calls"] += 1
+        rec["orders"] += orders
+        rec["units"] += units
+
+    def snapshot(self) -> Dict:
+        return {
+            "ticks": self.ticks,
+            "phases": dict(self.total),
+            "last_tick": dict(self.last),
+            "units_updated": self.units_updated,
+            "last_units_updated": self.last_units_updated,
+            "players": {name: dict(rec) for name, rec in self.players.items()},
+        }
+
+
+def merge_metrics(snapshots: List[Dict], labels: Optional[List[Dict[str, str]]] = None) -> Optional[Dict]:
+    """
+    Somme de plusieurs get_metrics() (tournoi). `labels[i]` renomme les
+    joueurs du i-ème relevé (ex. "Army A" -> nom du général).
+    """
+    if labels is None:
+        labels = [{}] * len(snapshots)
+    pairs = [(s, l) for s, l in zip(snapshots, labels) if s]
+    if not pairs:
+        return None
+    merged = {
+        "ticks": 0,
+        "phases": {p: 0.0 for p in PHASES},
+        "last_tick": {p: 0.0 for p in PHASES},
+        "units_updated": 0,
+        "last_units_updated": 0,
+        "players": {},
+    }
+    for snap, names in pairs:
+        merged["ticks"] += snap["ticks"]
+        merged["units_updated"] += snap["units_updated"]
+        for p, v in snap["phases"].items():
+            merged["phases"][p] = merged["phases"].get(p, 0.0) + v
+        for name, rec in snap["players"].items():
+            key = names.get(name, name)
+            acc = merged["players"].setdefault(key, {"time": 0.0, "calls": 0, "orders": 0, "units": 0})
+            for field in acc:
+                acc[field] += rec[field]
+    return merged
+
+
+def format_metrics(metrics: Dict) -> str:
+    """Tableau texte : phases puis généraux (temps cumulé, moyenne par tick, part)."""
+    ticks = max(1, metrics["ticks"])
+    phases = metrics["phases"]
+    total = sum(phases.values()) or 1e-12
+    lines = [
+        f"{'PHASE':<12} {'TOTAL (s)':>10} {'MOY/TICK (ms)':>14} {'PART':>7}",
+    ]
+    for p in PHASES:
+        t = phases.get(p, 0.0)
+        lines.append(f"{p:<12} {t:>10.3f} {t / ticks * 1000:>14.3f} {t / total * 100:>6.1f}%")
+    lines.append(f"{'total':<12} {total:>10.3f} {total / ticks * 1000:>14.3f}")
+    lines.append(f"ticks : {metrics['ticks']}   unités mises à jour : {metrics['units_updated']}")
+
+    if metrics["players"]:
+        lines.append("")
+        lines.append(f"{'JOUEUR':<16} {'give_orders (s)':>15} {'MOY (ms)':>9} {'ORDRES':>8} {'UNITÉS':>8}")
+        for name, rec in metrics["players"].items():
+            calls = max(1, rec["calls"])
+            lines.append(
+                f"{name:<16} {rec['time']:>15.3f} {rec['time'] / calls * 1000:>9.3f} "
+                f"{rec['orders']:>8} {rec['units']:>8}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,254 @@
+# src/core/replay.py
+"""
+Enregistrement et relecture des batailles (.rpl).
+
+La simulation est déterministe une fois les ordres connus : un replay
+stocke l'état initial, les ordres effectivement émis par les généraux à
+chaque tick et, périodiquement, une image clé complète (format .sav).
+La relecture rejoue la physique sans appeler les généraux ; un saut
+repart de l'image clé la plus proche.
+
+    en-tête : magic (8 o), version (u16), drapeaux (u16), taille des métadonnées (u32)
+    métadonnées : JSON (graine, scénario, généraux, pas logique...)
+    blocs   : type (u8), tick (u32), taille (u32), contenu — en ajout seul
+              "K" image clé (dump_battle), "O" ordres du tick (ORDER_DTYPE, zlib),
+              "E" fin de bataille (JSON)
+"""
+import json
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.engine_numpy import ORDER_CODES, ORDER_ATTACK, ORDER_MOVE, ORDER_HOLD
+from src.core.savefile import dump_battle, load_battle
+
+MAGIC = b"MEDVRPL\x00"
+REPLAY_VERSION = 1
+DEFAULT_KEYFRAME_EVERY = 200   # ticks (10 s au pas logique par défaut)
+
+_HEADER = struct.Struct("<8sHHI")
+_CHUNK = struct.Struct("<BII")
+CHUNK_KEYFRAME, CHUNK_ORDERS, CHUNK_END = ord("K"), ord("O"), ord("E")
+
+# Un ordre émis : unité, code (moteur numpy), cible (uid ou -1), position visée
+ORDER_DTYPE = np.dtype([
+    ("uid", "<i4"), ("code", "<u1"), ("target", "<i4"), ("x", "<f8"), ("y", "<f8"),
+])
+
+
+class ReplayFormatError(ValueError):
+    """Fichier qui n'est pas un replay lisible par cette version."""
+
+
+# ============================================================
+# ENREGISTREMENT
+# ============================================================
+
+class ReplayRecorder:
+    """
+    Attaché à une Battle (Battle.record) : Battle lui signale chaque ordre
+    qui change l'état d'une unité, puis la fin de chaque tick.
+    """
+
+    def __init__(self, battle, filename: str, keyframe_every: int = DEFAULT_KEYFRAME_EVERY,
+                 meta: Optional[Dict] = None):
+        self.filename = filename
+        self.keyframe_every = max(1, int(keyframe_every))
+        self._rows: List[Tuple] = []
+        # État initial sérialisé avant d'ouvrir le fichier : une bataille non
+        # sauvegardable (SaveFormatError) ne laisse ni fichier ni descripteur
+        initial = dump_battle(battle)
+        header = {
+            "seed": battle.seed,
+            "logic_dt": battle.logic_dt,
+            "engine": battle.engine_name,
+            "keyframe_every": self.keyframe_every,
+            "start_step": battle.step_count,
+            "players": [p.name for p in battle.players],
+        }
+        header.update(meta or {})
+        raw = json.dumps(header).encode("utf-8")
+        self.file = open(filename, "wb")
+        self.file.write(_HEADER.pack(MAGIC, REPLAY_VERSION, 0, len(raw)))
+        self.file.write(raw)
+        self._chunk(CHUNK_KEYFRAME, battle.step_count, initial)
+        self.file.flush()
+
+    def _chunk(self, kind: int, step: int, payload: bytes):
+        self.file.write(_CHUNK.pack(kind, step, len(payload)))
+        self.file.write(payload)
+
+    def record(self, unit):
+        """Ordre courant d'une unité (objets Unit)."""
+        code = ORDER_CODES.get(unit._current_order, 0)
+        target, x, y = -1, 0.0, 0.0
+        if code == ORDER_ATTACK:
+            t = unit._order_data.get("target")
+            target = t.uid if t is not None else -1
+        elif code == ORDER_MOVE:
+            x, y = unit._order_data.get("position", (unit.x, unit.y))
+        self._rows.append((unit.uid, code, target, x, y))
+
+    def record_engine(self, engine, idx: np.ndarray, before: Tuple):
+        """Lignes du moteur numpy modifiées par apply_orders (`before` : colonnes avant)."""
+        order0, target0, mx0, my0 = before
+        order, target = engine.order[idx], engine.target[idx]
+        mx, my = engine.move_x[idx], engine.move_y[idx]
+        changed = (order != order0) | (target != target0) | (mx != mx0) | (my != my0)
+        units = engine.units
+        for k in np.flatnonzero(changed).tolist():
+            code = int(order[k])
+            t = int(target[k])
+            self._rows.append((
+                units[int(idx[k])].uid, code,
+                units[t].uid if code == ORDER_ATTACK and t >= 0 else -1,
+                float(mx[k]) if code == ORDER_MOVE else 0.0,
+                float(my[k]) if code == ORDER_MOVE else 0.0,
+            ))
+
+    def end_orders(self, step: int):
+        """Fin de la phase IA du tick : écrit les ordres accumulés."""
+        if not self._rows:
+            return
+        rows = np.array(self._rows, dtype=ORDER_DTYPE)
+        self._rows = []
+        self._chunk(CHUNK_ORDERS, step, zlib.compress(rows.tobytes(), 1))
+
+    def after_tick(self, battle):
+        if battle.step_count % self.keyframe_every == 0:
+            self.keyframe(battle)
+
+    def keyframe(self, battle):
+        self._chunk(CHUNK_KEYFRAME, battle.step_count, dump_battle(battle))
+        self.file.flush()
+
+    def close(self, battle=None):
+        if self.file.closed:
+            return
+        if battle is not None:
+            end = {
+                "step": battle.step_count,
+                "time": battle.time,
+                "finished": battle.finished,
+                "winner": battle.winner.name if battle.winner else None,
+            }
+            self._chunk(CHUNK_END, battle.step_count, json.dumps(end).encode("utf-8"))
+        self.file.close()
+
+
+# ============================================================
+# RELECTURE
+# ============================================================
+
+class ReplayReader:
+    """
+    Index d'un fichier .rpl (images clés et ordres par tick, lus une fois à
+    l'ouverture) ; sert d'`order_source` aux batailles qu'il reconstruit.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.keyframes: List[Tuple[int, int, int]] = []   # (tick, position, taille)
+        self.orders: Dict[int, bytes] = {}
+        self.end: Optional[Dict] = None
+        self._by_uid: Dict = {}
+        self._battle = None
+
+        with open(filename, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            raw = f.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                raise ReplayFormatError("Fichier tronqué")
+            magic, version, _, meta_len = _HEADER.unpack(raw)
+            if magic != MAGIC:
+                raise ReplayFormatError("Pas un replay .rpl")
+            if version > REPLAY_VERSION:
+                raise ReplayFormatError(f"Version de replay {version} non gérée (max {REPLAY_VERSION})")
+            self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+
+            while True:
+                head = f.read(_CHUNK.size)
+                if len(head) < _CHUNK.size:
+                    break  # fin du fichier (ou enregistrement interrompu)
+                kind, step, size = _CHUNK.unpack(head)
+                pos = f.tell()
+                if pos + size > file_size:
+                    break  # dernier bloc incomplet
+                if kind == CHUNK_KEYFRAME:
+                    self.keyframes.append((step, pos, size))
+                    f.seek(size, 1)
+                else:
+                    payload = f.read(size)
+                    if len(payload) < size:
+                        break
+                    if kind == CHUNK_ORDERS:
+                        self.orders[step] = payload
+                    elif kind == CHUNK_END:
+                        self.end = json.loads(payload.decode("utf-8"))
+        if not self.keyframes:
+            raise ReplayFormatError("Replay sans état initial")
+
+    @property
+    def first_step(self) -> int:
+        return self.keyframes[0][0]
+
+    @property
+    def last_step(self) -> int:
+        """Dernier tick rejouable (fin de bataille, ou dernier bloc écrit)."""
+        if self.end is not None:
+            return self.end["step"]
+        return max([self.keyframes[-1][0]] + list(self.orders))
+
+    def battle_at(self, step: int):
+        """Bataille dans l'état de la fin du tick `step` : image clé puis avance rapide."""
+        step = max(self.first_step, min(step, self.last_step))
+        key_step, pos, size = self.keyframes[0]
+        for k in self.keyframes:
+            if k[0] > step:
+                break
+            key_step, pos, size = k
+        with open(self.filename, "rb") as f:
+            f.seek(pos)
+            battle = load_battle(f.read(size))
+        battle.headless = True
+        battle.order_source = self
+        self._battle = battle
+        self._by_uid = {u.uid: u for p in battle.players for u in p.squad}
+        while battle.step_count < step and not battle.finished:
+            battle.update()
+        return battle
+
+    def orders_at(self, step: int) -> Optional[np.ndarray]:
+        payload = self.orders.get(step)
+        if payload is None:
+            return None
+        return np.frombuffer(zlib.decompress(payload), dtype=ORDER_DTYPE)
+
+    def apply_orders(self, battle):
+        """Phase IA d'une bataille rejouée : pose les ordres enregistrés pour ce tick."""
+        rows = self.orders_at(battle.step_count)
+        if rows is None:
+            return
+        if battle is not self._battle:
+            self._battle = battle
+            self._by_uid = {u.uid: u for p in battle.players for u in p.squad}
+        by_uid = self._by_uid
+        ordered = []
+        for uid, code, target, x, y in rows.tolist():
+            u = by_uid.get(uid)
+            if u is None or not u.is_alive:
+                continue
+            if code == ORDER_ATTACK:
+                u.set_order("attack", {"target": by_uid.get(target)})
+            elif code == ORDER_MOVE:
+                u.set_order("move", {"position": (x, y)})
+            elif code == ORDER_HOLD:
+                u.set_order("hold", {})
+            else:
+                u.clear_order()
+            ordered.append(u)
+        if battle.engine is not None:
+            battle.engine.pull_orders(ordered)
@@ -0,0 +1,134 @@
+# src/core/result_cache.py
+"""
+Cache disque des BattleResult de batailles reproductibles (avec graine).
+
+Une entrée = un petit fichier JSON nommé par l'empreinte de
+(scénario, arguments, généraux, graine, version du moteur, backend).
+La taille totale est bornée : au-delà, les entrées les moins récemment
+utilisées sont supprimées.
+"""
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from enum import Enum
+from typing import Dict, Optional, Sequence
+
+from src.core.battle import BattleResult, ENGINE_VERSION
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MEDIEVAIL_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "medievail", "results"),
+)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _jsonable(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Argument de scénario non sérialisable : {obj!r}")
+
+
+def battle_key(scenario: str, args: Sequence, generals: Sequence[str],
+               seed: int, engine: str = "python", options: Optional[Dict] = None) -> str:
+    """
+    Empreinte stable d'une bataille : même clé = même issue.
+    `options` : réglages qui changent l'issue (ex. fréquence de l'IA) ;
+    absents, les clés restent celles des versions précédentes.
+    """
+    fields = {
+        "scenario": scenario,
+        "args": list(args),
+        "generals": list(generals),
+        "seed": seed,
+        "engine_version": ENGINE_VERSION,
+        "engine": engine,
+    }
+    if options:
+        fields["options"] = options
+    payload = json.dumps(fields, default=_jsonable, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Cache LRU sur disque, borné à `max_bytes` octets."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+        # Taille courante, maintenue à chaque écriture (pas de rescan par put)
+        self._sizes: Dict[str, int] = {}
+        for name in os.listdir(path):
+            if name.endswith(".json"):
+                try:
+                    self._sizes[name] = os.path.getsize(os.path.join(path, name))
+                except OSError:
+                    pass
+        self._total = sum(self._sizes.values())
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, key: str) -> Optional[BattleResult]:
+        filename = self._file(key)
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            result = BattleResult(**data)
+        except (OSError, ValueError, TypeError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(filename)  # date d'accès pour l'éviction LRU
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: BattleResult):
+        name = key + ".json"
+        filename = os.path.join(self.path, name)
+        tmp = filename + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(result), f)
+            os.replace(tmp, filename)  # écriture atomique
+            size = os.path.getsize(filename)
+        except OSError:
+            return
+        self._total += size - self._sizes.get(name, 0)
+        self._sizes[name] = size
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les plus anciennes jusqu'à 90 % de la borne."""
+        def mtime(name):
+            try:
+                return os.path.getmtime(os.path.join(self.path, name))
+            except OSError:
+                return 0.0
+
+        target = int(self.max_bytes * 0.9)
+        for name in sorted(self._sizes, key=mtime):
+            if self._total <= target:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            self._total -= self._sizes.pop(name)
+
+    def clear(self):
+        for name in list(self._sizes):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+        self._sizes.clear()
+        self._total = 0
@@ -0,0 +1,329 @@
+# src/core/savefile.py
+"""
+Format binaire versionné des sauvegardes de bataille (.sav).
+
+    en-tête   : magic (8 o), version (u16), drapeaux (u16), taille des métadonnées (u32)
+    métadonnées : JSON UTF-8 (temps, joueurs, généraux, carte, graine...)
+    corps     : tableau d'unités empaqueté (UNIT_DTYPE) puis grille d'élévation
+                (uint8), compressé par zlib si FLAG_ZLIB
+
+Les métadonnées ne sont jamais compressées : read_metadata() lit l'en-tête
+sans toucher au corps (listing des sauvegardes). Contrairement au pickle
+du graphe d'objets, le fichier ne dépend pas des classes Python : seuls
+les champs listés ici sont écrits, les cibles sont des indices d'unité.
+"""
+import io
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.core.engine_numpy import DIRECTIONS, DIRECTION_CODES, ORDER_CODES, ORDER_ATTACK, ORDER_MOVE
+from src.core.units import UnitType, create_unit
+
+MAGIC = b"MEDVSAV\x00"
+FORMAT_VERSION = 2   # 2 : "uid" stable par unité, minuteries du moteur numpy
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct("<8sHHI")
+
+# Codes des types d'unités (ordre de l'enum) et des ordres (ceux du moteur numpy)
+_TYPES = list(UnitType)
+_TYPE_CODES = {t: k for k, t in enumerate(_TYPES)}
+_ORDER_NAMES = {code: name for name, code in ORDER_CODES.items()}
+
+# Bits du champ "flags"
+_NEEDS_ORDERS, _DORMANT, _PARK_SOFT = 1, 2, 4
+
+_V1_FIELDS = [
+    ("player", "<u1"), ("type", "<u1"), ("alive", "<u1"), ("direction", "<u1"),
+    ("order", "<u1"), ("flags", "<u1"),
+    ("hp", "<i4"), ("target", "<i4"), ("ai_slot", "<i4"),
+    ("x", "<f8"), ("y", "<f8"),
+    ("ready_at", "<f8"), ("windup_until", "<f8"),
+    ("parked_until", "<f8"), ("sleep_retry_at", "<f8"),
+    ("move_x", "<f8"), ("move_y", "<f8"),
+]
+# cooldown/windup : valeurs relatives exactes du moteur numpy (la conversion
+# en instants absolus des Unit n'est pas réversible au bit près)
+UNIT_DTYPE = np.dtype(_V1_FIELDS + [("uid", "<i4"), ("cooldown", "<f8"), ("windup", "<f8")])
+_UNIT_DTYPES = {1: np.dtype(_V1_FIELDS), 2: UNIT_DTYPE}
+
+
+class SaveFormatError(ValueError):
+    """Fichier qui n'est pas une sauvegarde .sav lisible par cette version."""
+
+
+def is_savefile(filename: str) -> bool:
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# ============================================================
+# ÉCRITURE
+# ============================================================
+
+def _general_key(general) -> str:
+    from src.ai import GENERALS
+    for key, cls in GENERALS.items():
+        if type(general) is cls:
+            return key
+    raise SaveFormatError(f"Général hors du registre : {type(general).__name__}")
+
+
+def _jsonable_color(color):
+    try:
+        json.dumps(color)
+        return color
+    except TypeError:
+        return None
+
+
+def _pack_units(battle) -> Tuple[np.ndarray, List[int]]:
+    """Toutes les unités des escouades (morts non compactés compris), dans l'ordre."""
+    units = [u for p in battle.players for u in p.squad]
+    index = {id(u): i for i, u in enumerate(units)}
+    player_index = {id(p): k for k, p in enumerate(battle.players)}
+
+    orders, targets, move_x, move_y = [], [], [], []
+    for u in units:
+        code = ORDER_CODES.get(u._current_order)
+        if code is None:
+            raise SaveFormatError(f"Ordre non sérialisable : {u._current_order!r}")
+        target, mx, my = -1, 0.0, 0.0
+        if code == ORDER_ATTACK:
+            target = index.get(id(u._order_data.get("target")), -1)
+        elif code == ORDER_MOVE:
+            mx, my = u._order_data.get("position", (u.x, u.y))
+        orders.append(code)
+        targets.append(target)
+        move_x.append(mx)
+        move_y.append(my)
+
+    # Remplissage par colonnes : une affectation numpy par champ
+    arr = np.zeros(len(units), dtype=UNIT_DTYPE)
+    arr["player"] = [player_index[id(u.player)] for u in units]
+    arr["type"] = [_TYPE_CODES[u.unit_type] for u in units]
+    arr["alive"] = [u.is_alive for u in units]
+    arr["direction"] = [DIRECTION_CODES.get(u.direction, 0) for u in units]
+    arr["order"] = orders
+    arr["flags"] = [(_NEEDS_ORDERS if u.needs_new_orders else 0)
+                    | (_DORMANT if u._dormant else 0)
+                    | (_PARK_SOFT if u._park_soft else 0) for u in units]
+    arr["hp"] = [u.current_hp for u in units]
+    arr["target"] = targets
+    arr["ai_slot"] = [u._ai_slot for u in units]
+    arr["x"] = [u.x for u in units]
+    arr["y"] = [u.y for u in units]
+    arr["ready_at"] = [u._ready_at for u in units]
+    arr["windup_until"] = [u._windup_until for u in units]
+    arr["parked_until"] = [u._parked_until for u in units]
+    arr["sleep_retry_at"] = [u._sleep_retry_at for u in units]
+    arr["move_x"] = move_x
+    arr["move_y"] = move_y
+    arr["uid"] = [u.uid for u in units]
+    engine = battle.engine
+    if engine is not None:
+        arr["cooldown"] = [engine.cooldown[u._eidx] if u._eidx is not None else 0.0 for u in units]
+        arr["windup"] = [engine.windup[u._eidx] if u._eidx is not None else 0.0 for u in units]
+    counts = [len(p.squad) for p in battle.players]
+    return arr, counts
+
+
+def build_metadata(battle, counts: List[int]) -> Dict:
+    m = battle.world_map
+    return {
+        "format": FORMAT_VERSION,
+        "saved_at": time.time(),
+        "time": battle.time,
+        "step_count": battle.step_count,
+        "logic_dt": battle.logic_dt,
+        "max_time": battle.max_time,
+        "engine": battle.engine_name,
+        "seed": battle.seed,
+        "finished": battle.finished,
+        "winner": battle.players.index(battle.winner) if battle.winner in battle.players else None,
+        "players": [
+            {
+                "name": p.name,
+                "general": _general_key(p.general),
+                "decision_hz": getattr(p.general, "decision_hz", None),
+                "color": _jsonable_color(p.color),
+                "units": count,
+                "alive": sum(1 for u in p.squad if u.is_alive),
+            }
+            for p, count in zip(battle.players, counts)
+        ],
+        "map": {
+            "width": m.width,
+            "height": m.height,
+            "collision_allowance": m.collision_allowance,
+            "seed": m.seed,
+            "grid": [m.grid_w, m.grid_h],
+        },
+    }
+
+
+def dump_battle(battle, compress: bool = True) -> bytes:
+    """Sérialise la bataille au format .sav (en mémoire : images clés des replays)."""
+    battle.sync_units()
+    units, counts = _pack_units(battle)
+    meta = json.dumps(build_metadata(battle, counts)).encode("utf-8")
+    grid = np.ascontiguousarray(battle.world_map.elevation_grid, dtype=np.uint8)
+    body = units.tobytes() + grid.tobytes()
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(meta)) + meta + body
+
+
+def write_battle(battle, filename: str, compress: bool = True):
+    """Écrit la bataille au format .sav, de façon atomique."""
+    data = dump_battle(battle, compress=compress)
+    tmp = filename + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, filename)
+
+
+# ============================================================
+# LECTURE
+# ============================================================
+
+def _read_header(f) -> Tuple[int, int, Dict]:
+    raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise SaveFormatError("Fichier tronqué")
+    magic, version, flags, meta_len = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise SaveFormatError("Pas une sauvegarde .sav")
+    if version > FORMAT_VERSION:
+        raise SaveFormatError(f"Version de format {version} non gérée (max {FORMAT_VERSION})")
+    meta = json.loads(f.read(meta_len).decode("utf-8"))
+    return version, flags, meta
+
+
+def read_metadata(filename: str) -> Dict:
+    """Métadonnées seules (le corps n'est ni lu ni décompressé)."""
+    with open(filename, "rb") as f:
+        _, _, meta = _read_header(f)
+    return meta
+
+
+def read_battle(filename: str):
+    """Reconstruit une Battle depuis un fichier .sav."""
+    with open(filename, "rb") as f:
+        return _read_battle(f)
+
+
+def load_battle(data: bytes):
+    """Reconstruit une Battle depuis le contenu d'un .sav (voir dump_battle)."""
+    return _read_battle(io.BytesIO(data))
+
+
+def _read_battle(f):
+    from src.ai import GENERALS
+    from src.core.battle import Battle
+    from src.core.map import Map
+    from src.core.player import Player
+
+    version, flags, meta = _read_header(f)
+    body = f.read()
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    n = sum(p["units"] for p in meta["players"])
+    grid_w, grid_h = meta["map"]["grid"]
+    dtype = _UNIT_DTYPES[version]
+    split = n * dtype.itemsize
+    if len(body) != split + grid_w * grid_h:
+        raise SaveFormatError("Taille du corps incohérente avec les métadonnées")
+    arr = np.frombuffer(body[:split], dtype=dtype)
+    grid = np.frombuffer(body[split:], dtype=np.uint8).reshape(grid_w, grid_h)
+
+    mm = meta["map"]
+    world_map = Map.from_elevation(mm["width"], mm["height"], grid,
+                                   collision_allowance=mm["collision_allowance"], seed=mm["seed"])
+
+    players = []
+    for info in meta["players"]:
+        general_cls = GENERALS.get(info["general"])
+        if general_cls is None:
+            raise SaveFormatError(f"Général inconnu dans la sauvegarde : {info['general']}")
+        p = Player(info["name"], general_cls)
+        if info.get("decision_hz"):
+            p.general.decision_hz = info["decision_hz"]
+        p.color = info.get("color")
+        players.append(p)
+
+    # 1. Unités (sans les ordres : les cibles peuvent être plus loin dans le tableau)
+    c = {name: arr[name].tolist() for name in dtype.names}  # colonnes en listes Python
+    if "uid" not in c:
+        c["uid"] = list(range(n))  # format 1 : l'ordre des escouades
+    units = []
+    for i in range(n):
+        p = players[c["player"][i]]
+        u = create_unit(_TYPES[c["type"][i]], c["x"][i], c["y"][i], p)
+        u.current_hp = c["hp"][i]
+        u.is_alive = bool(c["alive"][i])
+        u.direction = DIRECTIONS[c["direction"][i]]
+        u._ready_at = c["ready_at"][i]
+        u._windup_until = c["windup_until"][i]
+        u._sleep_retry_at = c["sleep_retry_at"][i]
+        u._registry_dead = not u.is_alive
+        units.append(u)
+        p.squad.append(u)
+
+    # 2. Ordres
+    for i, u in enumerate(units):
+        name = _ORDER_NAMES.get(c["order"][i])
+        if name == "attack":
+            # Cible hors du fichier (tuée après le passage de l'unité dans le tick
+            # sauvegardé) : l'ordre reste, la prochaine mise à jour l'abandonne
+            t = c["target"][i]
+            u._current_order, u._order_data = "attack", {"target": units[t] if t >= 0 else None}
+        elif name == "move":
+            u._current_order, u._order_data = "move", {"position": (c["move_x"][i], c["move_y"][i])}
+        elif name == "hold":
+            u._current_order, u._order_data = "hold", {}
+        u.needs_new_orders = bool(c["flags"][i] & _NEEDS_ORDERS)
+
+    battle = Battle(players, world_map, logic_dt=meta["logic_dt"], max_time=meta["max_time"],
+                    engine=meta["engine"], seed=meta["seed"])
+    battle.time = meta["time"]
+    battle.step_count = meta["step_count"]
+    battle.finished = meta["finished"]
+    if meta["winner"] is not None:
+        battle.winner = players[meta["winner"]]
+
+    # 3. État de planification (après Battle, qui réattribue créneaux d'IA et uid)
+    for i, u in enumerate(units):
+        u._ai_slot = c["ai_slot"][i]
+        u.uid = c["uid"][i]
+        if not u.is_alive:
+            continue
+        flags = c["flags"][i]
+        if c["parked_until"][i]:
+            battle.scheduler.park(u, c["parked_until"][i], interruptible=bool(flags & _PARK_SOFT))
+            target = u._order_data.get("target") if u._current_order == "attack" else None
+            if flags & _PARK_SOFT and target is not None:
+                u._watch(target)  # garée en rechargement : sa cible la réveillera
+        if flags & _DORMANT:
+            u._dormant = True
+            battle.dormant_count += 1
+    if battle.engine is not None:
+        engine = battle.engine
+        engine.load_from_units()
+        if "cooldown" in c:
+            # Le moteur reprend ses lignes dans l'ordre du fichier
+            engine.cooldown[:] = c["cooldown"]
+            engine.windup[:] = c["windup"]
+    return battle
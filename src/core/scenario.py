@@ -92,7 +92,7 @@ def spawn_square(player, world_map, all_units,
 
 import math
 
-def lanchester_scenario(unit_type, N, general_a, general_b):
+def lanchester_scenario(unit_type, N, general_a, general_b, seed=None):
     """
     Scénario Lanchester(type, N) avec formations carrées
     - Armée A : N unités
@@ -106,7 +106,7 @@ def lanchester_scenario(unit_type, N, general_a, general_b):
     player_b = Player("Army B", general_b)
     player_b.color = "Red"
 
-    world_map = Map(width = 120 * TILE, height = 120 * TILE,collision_allowance=0.2)
+    world_map = Map(width = 120 * TILE, height = 120 * TILE,collision_allowance=0.2, seed=seed)
     all_units = []
 
     SPACING = int(1.5 * TILE)
@@ -176,14 +176,14 @@ def lanchester_scenario(unit_type, N, general_a, general_b):
 
 
 
-def mirror_scenario(unit_type , N, general_a, general_b):
+def mirror_scenario(unit_type , N, general_a, general_b, seed=None):
    
     player_a = Player("Army A", general_a)
     player_a.color = "Blue"
     player_b = Player("Army B", general_b)
     player_b.color = "Red"
 
-    world_map = Map(width = 120 * TILE, height = 120 * TILE,collision_allowance=0.5)
+    world_map = Map(width = 120 * TILE, height = 120 * TILE,collision_allowance=0.5, seed=seed)
     all_units = []
 
     SPACING = int(1.5 * TILE)
@@ -246,18 +246,20 @@ def mirror_scenario(unit_type , N, general_a, general_b):
     return [player_a, player_b], world_map
 
 
-def skirmish_scenario(unit_type, N, general_a, general_b):
+def skirmish_scenario(unit_type, N, general_a, general_b, seed=None):
     """
     Combat désorganisé : unités réparties aléatoirement
+    (placement reproductible si `seed` est fourni)
     """
     import random
+    rng = random.Random(seed) if seed is not None else random
 
     player_a = Player("Army A", general_a)
     player_a.color = "Blue"
     player_b = Player("Army B", general_b)
     player_b.color = "Red"
 
-    world_map = Map(120 * TILE, 80 * TILE)
+    world_map = Map(120 * TILE, 80 * TILE, seed=seed)
 
     all_units = []
 
@@ -265,16 +267,16 @@ def skirmish_scenario(unit_type, N, general_a, general_b):
         # Army A (un peu plus à droite)
         spawn_unit_safe(
             unit_type,
-            random.uniform(40 * TILE, 55 * TILE),
-            random.uniform(10 * TILE, 70 * TILE),
+            rng.uniform(40 * TILE, 55 * TILE),
+            rng.uniform(10 * TILE, 70 * TILE),
             player_a, world_map, all_units
         )
 
         # Army B (un peu plus à gauche)
         spawn_unit_safe(
             unit_type,
-            random.uniform(65 * TILE, 80 * TILE),
-            random.uniform(10 * TILE, 70 * TILE),
+            rng.uniform(65 * TILE, 80 * TILE),
+            rng.uniform(10 * TILE, 70 * TILE),
             player_b, world_map, all_units
         )
 
@@ -300,55 +302,101 @@ def skirmish_scenario(unit_type, N, general_a, general_b):
 from src.core.battle import Battle
 
 
-def run_lanchester_experiment(
-    general_name: str,
-    unit_types: list,
-    N_range: range,
-    repeats: int = 30
-):
+def lanchester_jobs(general_name: str, unit_types: list, N_range: range, repeats: int,
+                    seed=None) -> list:
+    """Jobs (général, type, N, répétition, graine) dans l'ordre de la boucle historique."""
+    from src.core.tournament import derive_seed
+
+    return [
+        (general_name, unit_type, N, r, derive_seed(seed, "lanchester", general_name, unit_type, N, r))
+        for unit_type in unit_types
+        for N in N_range
+        for r in range(repeats)
+    ]
+
+
+def play_lanchester(job):
+    """Joue une bataille de Lanchester (point d'entrée des workers) ; renvoie son BattleResult."""
     from src.ai import get_general
 
-    data = {}  # data[unit_type][N] = list of losses_of_winner
+    general_name, unit_type, N, _, seed = job
+    general = get_general(general_name)
 
-    for unit_type in unit_types:
-        data[unit_type] = {}
+    players, world_map = lanchester_scenario(
+        unit_type, N, general, general, seed=seed
+    )
 
-        for N in N_range:
-            data[unit_type][N] = []
+    # run() renvoie aussi les pertes du gagnant (winner_hp_lost)
+    return Battle(players, world_map, headless=True, seed=seed).run()
 
-            for _ in range(repeats):
-                general = get_general(general_name)
 
-                players, world_map = lanchester_scenario(
-                    unit_type, N, general, general
-                )
+def _lanchester_key(job):
+    from src.core.result_cache import battle_key
 
-                battle = Battle(players, world_map)
+    general_name, unit_type, N, _, seed = job
+    if seed is None:
+        return None
+    return battle_key("lanchester", [unit_type, N], (general_name, general_name), seed)
 
-                while not battle.finished:
-                    battle.update()
 
-                if not battle.winner:
-                    continue
+def iter_lanchester_results(
+    general_name: str,
+    unit_types: list,
+    N_range: range,
+    repeats: int = 30,
+    jobs: int = 1,
+    seed=None,
+    cache=None
+):
+    """
+    Générateur des résultats bataille par bataille : (unit_type, N, pertes du
+    gagnant), pertes à None en cas de nul.
+    Avec jobs != 1, les batailles sont réparties sur un pool de processus ;
+    l'ordre de sortie reste celui de la boucle séquentielle. Avec une graine
+    et un cache, les batailles déjà simulées ne sont pas rejouées.
+    """
+    from src.core.tournament import resolve_workers, run_cached
+
+    work = lanchester_jobs(general_name, unit_types, N_range, repeats, seed)
+    workers = resolve_workers(jobs)
+    # Batailles courtes : on envoie les jobs par paquets pour amortir l'IPC
+    chunksize = max(1, len(work) // (workers * 8))
+    results = run_cached(play_lanchester, work, _lanchester_key, workers, cache, chunksize=chunksize)
+    for (_, unit_type, N, _, _), result in zip(work, results):
+        # 🔹 pertes du GAGNANT UNIQUEMENT
+        yield unit_type, N, (result.winner_hp_lost if result.winner else None)
+
+
+def run_lanchester_experiment(
+    general_name: str,
+    unit_types: list,
+    N_range: range,
+    repeats: int = 30,
+    jobs: int = 1,
+    seed=None,
+    cache=None
+):
+    data = {}  # data[unit_type][N] = list of losses_of_winner
+    for unit_type in unit_types:
+        data[unit_type] = {N: [] for N in N_range}
 
-                # 🔹 pertes du GAGNANT UNIQUEMENT
-                total_hp_lost = sum(
-                    u.max_hp - max(u.current_hp, 0)
-                    for u in battle.winner.squad
-                )
-                data[unit_type][N].append(total_hp_lost)
-                # print( f"N={N} | winner={battle.winner.name} | "f"total_hp_lost={total_hp_lost}")
+    for unit_type, N, total_hp_lost in iter_lanchester_results(
+        general_name, unit_types, N_range, repeats, jobs, seed, cache
+    ):
+        if total_hp_lost is None:
+            continue
+        data[unit_type][N].append(total_hp_lost)
 
     return data
 
-def combined_arms_scenario(N, types_a, types_b, general_a, general_b):
+def combined_arms_scenario(N, types_a, types_b, general_a, general_b, seed=None):
     player_a = Player("Army A", general_a)
     player_a.color = "Blue"
     player_b = Player("Army B", general_b)
     player_b.color = "Red"
 
     # Carte élargie en largeur pour accommoder les troupes côte à côte
-    world_map = Map(width=160 * TILE, height=100 * TILE, collision_allowance=0.2)
+    world_map = Map(width=160 * TILE, height=100 * TILE, collision_allowance=0.2, seed=seed)
     all_units = []
     
     SPACING = int(1.1 * TILE)
@@ -405,21 +453,35 @@ def combined_arms_scenario(N, types_a, types_b, general_a, general_b):
 SCENARIO_CONFIG = {
     "lanchester": {
         "fn": lanchester_scenario,
-        "args": [UnitType.KNIGHT, 10]  # [Type, N]
+        "args": [UnitType.KNIGHT, 10],  # [Type, N]
+        "n_arg": 1                      # position de N dans args (variantes de taille)
     },
     "mirror": {
         "fn": mirror_scenario,
-        "args": [UnitType.PIKEMAN, 10]
+        "args": [UnitType.PIKEMAN, 10],
+        "n_arg": 1
     },
     "skirmish": {
         "fn": skirmish_scenario,
-        "args": [UnitType.CROSSBOWMAN, 10]
+        "args": [UnitType.CROSSBOWMAN, 10],
+        "n_arg": 1
     },
     "combined": {
         "fn": combined_arms_scenario,
-        "args": [40, [UnitType.PIKEMAN, UnitType.CROSSBOWMAN, UnitType.KNIGHT,UnitType.LONGSWORDSMAN,UnitType.ELITESKIRMISHER], [UnitType.LONGSWORDSMAN, UnitType.KNIGHT, UnitType.CROSSBOWMAN, UnitType.PIKEMAN,UnitType.ELITESKIRMISHER]] # [N, types_a, types_b]
+        "args": [40, [UnitType.PIKEMAN, UnitType.CROSSBOWMAN, UnitType.KNIGHT,UnitType.LONGSWORDSMAN,UnitType.ELITESKIRMISHER], [UnitType.LONGSWORDSMAN, UnitType.KNIGHT, UnitType.CROSSBOWMAN, UnitType.PIKEMAN,UnitType.ELITESKIRMISHER]], # [N, types_a, types_b]
+        "n_arg": 0
     }
 }
+def scaled_args(name: str, N: int) -> list:
+    """Arguments du scénario `name` avec N remplacé (variantes de taille du bench)."""
+    config = get_scenario(name)
+    args = list(config.get("args", []))
+    if "n_arg" not in config:
+        raise ValueError(f"Le scénario {name} n'a pas de paramètre N")
+    args[config["n_arg"]] = N
+    return args
+
+
 def get_scenario(name: str):
     try:
         return SCENARIO_CONFIG[name.lower()]
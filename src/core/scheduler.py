@@ -0,0 +1,52 @@
+# src/core/scheduler.py
+
+import heapq
+from typing import List, Tuple
+
+# Tolérance sur les instants : le temps de bataille s'accumule par pas
+# flottants, un réveil prévu à t ne doit pas glisser d'un tick pour 1e-15.
+TIME_EPS = 1e-9
+
+
+class EventScheduler:
+    """
+    File de priorité (heapq) des réveils d'unités mises en attente.
+
+    Une unité « garée » (fin de windup, fin de rechargement, ré-évaluation
+    de son ordre) est sautée par la boucle de Battle jusqu'à son échéance :
+    les armées qui attendent surtout leur rechargement ne coûtent plus
+    qu'un test par unité et par tick.
+
+    Chaque mise en attente incrémente le jeton de l'unité ; un événement
+    dont le jeton n'est plus le bon est périmé et ignoré au dépilage.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int, object]] = []
+        self._seq = 0  # départage les égalités sans jamais comparer les unités
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def park(self, unit, until: float, interruptible: bool = True):
+        """Gare l'unité jusqu'à `until` (temps de bataille absolu)."""
+        unit._park_token += 1
+        unit._parked_until = until
+        unit._park_soft = interruptible
+        self._seq += 1
+        heapq.heappush(self._heap, (until, self._seq, unit._park_token, unit))
+
+    def release_due(self, now: float) -> int:
+        """Réveille les unités dont l'échéance est atteinte ; renvoie leur nombre."""
+        heap = self._heap
+        limit = now + TIME_EPS
+        released = 0
+        while heap and heap[0][0] <= limit:
+            _, _, token, unit = heapq.heappop(heap)
+            if token == unit._park_token and unit._parked_until:
+                unit._parked_until = 0.0
+                released += 1
+        return released
+
+    def clear(self):
+        self._heap = []
@@ -0,0 +1,135 @@
+# src/core/telemetry.py
+"""
+Séries temporelles par tick d'une bataille (run --telemetry out_dir).
+
+Battle alimente le collecteur pendant le tick (dégâts, ordres) puis
+l'échantillonne à la fin de chaque tick. Les colonnes vivent dans des
+tableaux de taille fixe (`chunk_ticks` lignes) : une fois pleins, ils
+sont écrits dans un fragment .npz et réutilisés. La mémoire reste
+constante quelle que soit la durée de la bataille.
+
+Colonnes (P joueurs, T types d'unités, dans l'ordre de meta.json) :
+    step (n,), time (n,)
+    alive (n, P)      unités vivantes en fin de tick
+    hp (n, P)         PV cumulés des vivants
+    damage (n, P, T)  dégâts infligés pendant le tick (après armure), par type d'attaquant
+    orders (n, P)     ordres appliqués pendant la phase IA
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.core.units import UnitType
+
+DEFAULT_CHUNK_TICKS = 1024
+
+UNIT_TYPES = list(UnitType)
+UNIT_TYPE_INDEX = {t: k for k, t in enumerate(UNIT_TYPES)}
+
+
+class TelemetrySink:
+    """Collecteur à tampon borné, écrit par fragments dans `out_dir`."""
+
+    def __init__(self, battle, out_dir: str, chunk_ticks: int = DEFAULT_CHUNK_TICKS):
+        self.out_dir = out_dir
+        self.chunk_ticks = max(1, int(chunk_ticks))
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.player_index = {id(p): k for k, p in enumerate(battle.players)}
+        P, T, n = len(battle.players), len(UNIT_TYPES), self.chunk_ticks
+        self.step = np.zeros(n, dtype=np.int64)
+        self.time = np.zeros(n)
+        self.alive = np.zeros((n, P), dtype=np.int32)
+        self.hp = np.zeros((n, P), dtype=np.int64)
+        self.damage = np.zeros((n, P, T))
+        self.orders = np.zeros((n, P), dtype=np.int32)
+
+        # Accumulateurs du tick en cours
+        self._damage = np.zeros((P, T))
+        self._orders = np.zeros(P, dtype=np.int32)
+        self._rows = 0
+        self.shards = 0
+        self.ticks = 0
+
+        self.meta = {
+            "players": [p.name for p in battle.players],
+            "unit_types": [t.value for t in UNIT_TYPES],
+            "logic_dt": battle.logic_dt,
+            "seed": battle.seed,
+            "engine": battle.engine_name,
+            "chunk_ticks": self.chunk_ticks,
+            "shards": 0,
+            "ticks": 0,
+        }
+        self._write_meta()
+
+    # ---- Pendant le tick ----
+
+    def add_damage(self, unit, amount: float):
+        self._damage[self.player_index[id(unit.player)], UNIT_TYPE_INDEX[unit.unit_type]] += amount
+
+    def add_damage_many(self, players: np.ndarray, types: np.ndarray, amounts: np.ndarray):
+        """Version tableaux (moteur numpy) : indices de joueur et de type par attaquant."""
+        np.add.at(self._damage, (players, types), amounts)
+
+    def add_orders(self, player, count: int):
+        self._orders[self.player_index[id(player)]] += count
+
+    # ---- Fin de tick ----
+
+    def sample(self, battle):
+        k = self._rows
+        self.step[k] = battle.step_count
+        self.time[k] = battle.time
+        engine = battle.engine
+        if engine is not None:
+            P = len(battle.players)
+            self.hp[k] = np.bincount(engine.player, weights=engine.hp * engine.alive, minlength=P)
+        for p in battle.players:
+            j = self.player_index[id(p)]
+            self.alive[k, j] = battle.registry.alive_count(p)
+            if engine is None:
+                self.hp[k, j] = sum(u.current_hp for u in p.squad if u.is_alive)
+        self.damage[k] = self._damage
+        self.orders[k] = self._orders
+        self._damage.fill(0.0)
+        self._orders.fill(0)
+        self._rows += 1
+        self.ticks += 1
+        if self._rows == self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        """Écrit les lignes en tampon dans un nouveau fragment."""
+        n = self._rows
+        if not n:
+            return
+        path = os.path.join(self.out_dir, f"telemetry_{self.shards:05d}.npz")
+        np.savez(path, step=self.step[:n], time=self.time[:n], alive=self.alive[:n],
+                 hp=self.hp[:n], damage=self.damage[:n], orders=self.orders[:n])
+        self.shards += 1
+        self._rows = 0
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+
+    def _write_meta(self):
+        self.meta["shards"] = self.shards
+        self.meta["ticks"] = self.ticks - self._rows  # lignes déjà sur disque
+        with open(os.path.join(self.out_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+
+def load_telemetry(out_dir: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Recolle les fragments d'un dossier (pour l'analyse) ; `meta` est dans meta.json."""
+    with open(os.path.join(out_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    parts: Dict[str, list] = {}
+    for k in range(meta["shards"]):
+        with np.load(os.path.join(out_dir, f"telemetry_{k:05d}.npz")) as shard:
+            for name in columns or shard.files:
+                parts.setdefault(name, []).append(shard[name])
+    return {name: np.concatenate(chunks) for name, chunks in parts.items()}
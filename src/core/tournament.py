@@ -0,0 +1,207 @@
+# src/core/tournament.py
+"""
+Planification et exécution des matchs de tournoi.
+
+Le module n'importe ni pygame ni les vues : il est chargé par les
+processus du pool quand `tourney --jobs` est utilisé.
+"""
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.ai import get_general
+from src.core.battle import Battle, BattleResult
+from src.core.result_cache import ResultCache, battle_key
+from src.core.scenario import SCENARIO_CONFIG
+
+
+@dataclass(frozen=True)
+class MatchJob:
+    """Un match à jouer : case (ai1, ai2) du tableau, généraux des armées A et B."""
+    scenario: str
+    ai1: str        # ligne du tableau des stats
+    ai2: str        # colonne du tableau des stats
+    a_name: str     # général de l'armée A
+    b_name: str     # général de l'armée B
+    engine: str = "python"
+    seed: Optional[int] = None   # None : tirage libre, résultat non mis en cache
+    profile: bool = False        # chronométrage par phase (BattleResult.metrics)
+    ai_hz: Optional[float] = None  # fréquence de décision imposée aux deux généraux
+    index: int = 0                 # répétition du match dans sa case
+    record_dir: Optional[str] = None  # dossier des replays (un .rpl par match)
+
+    @property
+    def replay_name(self) -> str:
+        return f"{self.scenario}-{self.a_name}-vs-{self.b_name}-{self.index:03d}.rpl"
+
+    @property
+    def is_mirror(self) -> bool:
+        return self.ai1 == self.ai2
+
+
+# ============================================================
+# PLANIFICATION
+# ============================================================
+
+def derive_seed(base: Optional[int], *parts) -> Optional[int]:
+    """
+    Graine d'un match dérivée de la graine de base et de son identité
+    (scénario, généraux, répétition...) : elle ne dépend pas de la
+    composition du tournoi, un même match retombe sur la même entrée de cache.
+    """
+    if base is None:
+        return None
+    text = "|".join(str(getattr(p, "value", p)) for p in (base,) + parts)
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def build_jobs(scenarios: List[str], generals: List[str], N: int,
+               na: bool = False, engine: str = "python",
+               seed: Optional[int] = None, profile: bool = False,
+               ai_hz: Optional[float] = None, record_dir: Optional[str] = None) -> List[MatchJob]:
+    """
+    Liste ordonnée des matchs, dans l'ordre exact de la boucle séquentielle
+    historique : l'agrégation suit cet ordre, quel que soit le nombre de processus.
+    """
+    jobs = []
+    for scenario_name in scenarios:
+        if scenario_name not in SCENARIO_CONFIG:
+            continue
+        for ai1, ai2 in product(generals, repeat=2):
+            for n in range(N):
+                if ai1 == ai2:
+                    # IA contre elle-même : une seule case, pas d'échange de camps
+                    a_name, b_name = ai1, ai2
+                else:
+                    # Équité des camps
+                    a_name, b_name = (ai2, ai1) if (not na and n % 2 == 1) else (ai1, ai2)
+                job_seed = derive_seed(seed, scenario_name, a_name, b_name, n)
+                jobs.append(MatchJob(scenario_name, ai1, ai2, a_name, b_name, engine, job_seed, profile, ai_hz,
+                                     n, record_dir))
+    return jobs
+
+
+# ============================================================
+# EXÉCUTION
+# ============================================================
+
+def play_match(job: MatchJob) -> BattleResult:
+    """Construit le scénario et joue le match (point d'entrée des workers)."""
+    config = SCENARIO_CONFIG[job.scenario]
+    players, world_map = config["fn"](*config.get("args", []), get_general(job.a_name), get_general(job.b_name),
+                                      seed=job.seed)
+    players[0].name, players[1].name = "Army A", "Army B"
+    set_decision_rate(players, job.ai_hz)
+    battle = Battle(players, world_map, engine=job.engine, seed=job.seed, profile=job.profile)
+    if job.record_dir:
+        battle.record(os.path.join(job.record_dir, job.replay_name),
+                      meta={"scenario": job.scenario, "generals": [job.a_name, job.b_name]})
+    return battle.run()
+
+
+def match_key(job: MatchJob) -> str:
+    config = SCENARIO_CONFIG[job.scenario]
+    options = {"ai_hz": job.ai_hz} if job.ai_hz else None
+    return battle_key(job.scenario, config.get("args", []), (job.a_name, job.b_name), job.seed, job.engine,
+                      options)
+
+
+def set_decision_rate(players, ai_hz: Optional[float]):
+    """Impose une fréquence de décision (Hz) aux généraux ; None garde la leur."""
+    if ai_hz:
+        for p in players:
+            p.general.decision_hz = ai_hz
+
+
+def _init_worker():
+    # Les workers forkés héritent de l'état des générateurs du parent :
+    # sans nouvelle graine, ils joueraient tous les mêmes tirages.
+    random.seed()
+    np.random.seed()
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """--jobs : 1 (ou None) = dans ce processus ; 0 ou moins = un processus par cœur."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def run_ordered(fn: Callable, jobs: List, workers: Optional[int] = 1, chunksize: int = 1) -> Iterator:
+    """
+    Applique `fn` (fonction de module, picklable) à chaque job et renvoie les
+    résultats au fil de l'eau, dans l'ordre de `jobs`.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield fn(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        # map() rend les résultats dans l'ordre de soumission
+        yield from pool.map(fn, jobs, chunksize=chunksize)
+
+
+def run_cached(fn: Callable, jobs: List, key_fn: Callable, workers: Optional[int] = 1,
+               cache: Optional[ResultCache] = None, chunksize: int = 1) -> Iterator:
+    """
+    Comme run_ordered, mais les jobs déjà dans le cache ne sont pas rejoués.
+    key_fn(job) renvoie la clé de cache, ou None si le job n'est pas reproductible.
+    """
+    keys = [key_fn(job) if cache is not None else None for job in jobs]
+    cached = [cache.get(k) if k is not None else None for k in keys]
+    todo = [job for job, hit in zip(jobs, cached) if hit is None]
+    fresh = run_ordered(fn, todo, workers, chunksize=chunksize)
+    try:
+        for key, hit in zip(keys, cached):
+            if hit is None:
+                hit = next(fresh)
+                if key is not None:
+                    cache.put(key, hit)
+            yield hit
+    finally:
+        fresh.close()  # libère le pool même si l'appelant s'arrête en route
+
+
+def iter_results(jobs: List[MatchJob], workers: Optional[int] = 1,
+                 cache: Optional[ResultCache] = None) -> Iterator[Tuple[MatchJob, BattleResult]]:
+    """Joue les matchs et renvoie (job, résultat) dans l'ordre de `jobs`."""
+    # Un match profilé ou enregistré doit être rejoué : le cache n'a ni chronos ni replay
+    key_fn = lambda job: (match_key(job) if job.seed is not None and not job.profile and not job.record_dir
+                          else None)
+    return zip(jobs, run_cached(play_match, jobs, key_fn, workers, cache))
+
+
+# ============================================================
+# AGRÉGATION
+# ============================================================
+
+def match_id(job: MatchJob) -> str:
+    """Identité d'un match dans son tournoi (reprise avec --resume)."""
+    return f"{job.scenario}|{job.ai1}|{job.ai2}|{job.index}"
+
+
+def match_outcome(job: MatchJob, result: BattleResult) -> Tuple[Optional[str], bool, bool]:
+    """
+    (général vainqueur, victoire pour la ligne ai1, nul) d'un match.
+    Si c'est ai2 qui gagne, rien n'est compté dans cette case : le point
+    l'est quand la boucle passe sur (ai2, ai1).
+    """
+    if job.is_mirror:
+        # Dans un miroir, c'est forcément une victoire pour l'IA concernée
+        if result.winner is None:
+            return None, False, True
+        return job.ai1, True, False
+
+    name_map = {"Army A": job.a_name, "Army B": job.b_name, None: None}
+    real_winner = name_map.get(result.winner)
+    # Le nul profite aux deux cases
+    return real_winner, real_winner == job.ai1, real_winner is None
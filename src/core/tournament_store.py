@@ -0,0 +1,133 @@
+# src/core/tournament_store.py
+"""
+Résultats de tournoi persistés dans une base SQLite (tourney -d fichier).
+
+Chaque match est enregistré dès qu'il se termine : un tournoi interrompu
+reprend avec --resume sans rejouer les matchs déjà en base, et le rapport
+est calculé par agrégats SQL.
+"""
+import datetime
+import json
+import sqlite3
+from typing import Dict, Optional, Set, Tuple
+
+from src.core.tournament import MatchJob, match_id, match_outcome
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT NOT NULL,
+    config      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id   INTEGER NOT NULL REFERENCES tournaments(id),
+    match_id        TEXT NOT NULL,
+    scenario        TEXT NOT NULL,
+    ai1             TEXT NOT NULL,     -- ligne du tableau
+    ai2             TEXT NOT NULL,     -- colonne du tableau
+    a_name          TEXT NOT NULL,     -- général de l'armée A
+    b_name          TEXT NOT NULL,     -- général de l'armée B
+    rep             INTEGER NOT NULL,
+    seed            INTEGER,
+    winner          TEXT,              -- général vainqueur, NULL = nul
+    winner_side     TEXT,              -- "Army A" / "Army B" / NULL
+    row_win         INTEGER NOT NULL,  -- compte comme victoire pour ai1
+    draw            INTEGER NOT NULL,
+    duration        REAL,
+    turns           INTEGER,
+    remaining_units INTEGER,
+    winner_hp_lost  INTEGER,
+    recorded_at     TEXT NOT NULL,
+    PRIMARY KEY (tournament_id, match_id)
+);
+CREATE INDEX IF NOT EXISTS matches_by_cell ON matches (tournament_id, ai1, ai2, scenario);
+"""
+
+
+class TournamentStore:
+    """Base des tournois ; un enregistrement = une transaction (rien n'est perdu en cas d'arrêt)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---- Tournois ----
+
+    def open_tournament(self, config: Dict, resume: bool = False) -> Tuple[int, bool]:
+        """
+        Renvoie (id, repris). Avec `resume`, le dernier tournoi de même
+        configuration est repris ; sinon un nouveau tournoi est créé.
+        """
+        text = json.dumps(config, sort_keys=True)
+        if resume:
+            row = self.conn.execute(
+                "SELECT id FROM tournaments WHERE config = ? ORDER BY id DESC LIMIT 1", (text,)
+            ).fetchone()
+            if row is not None:
+                return row[0], True
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO tournaments (created_at, config) VALUES (?, ?)",
+                (datetime.datetime.now().isoformat(timespec="seconds"), text),
+            )
+        return cur.lastrowid, False
+
+    def done_ids(self, tournament_id: int) -> Set[str]:
+        rows = self.conn.execute("SELECT match_id FROM matches WHERE tournament_id = ?", (tournament_id,))
+        return {r[0] for r in rows}
+
+    def record(self, tournament_id: int, job: MatchJob, result) -> Optional[str]:
+        """Enregistre un match terminé ; renvoie le nom du général vainqueur."""
+        winner, row_win, draw = match_outcome(job, result)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    tournament_id, match_id(job), job.scenario, job.ai1, job.ai2,
+                    job.a_name, job.b_name, job.index, job.seed,
+                    winner, result.winner, int(row_win), int(draw),
+                    result.duration, result.turns, result.remaining_units, result.winner_hp_lost,
+                    datetime.datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        return winner
+
+    # ---- Agrégats du rapport ----
+
+    def ranking(self, tournament_id: int) -> Dict[str, Tuple[int, int, int]]:
+        """Général (ligne) -> (victoires, nuls, matchs), tous scénarios et adversaires."""
+        rows = self.conn.execute(
+            "SELECT ai1, SUM(row_win), SUM(draw), COUNT(*) FROM matches "
+            "WHERE tournament_id = ? GROUP BY ai1",
+            (tournament_id,),
+        )
+        return {g: (w, d, t) for g, w, d, t in rows}
+
+    def cross_matrix(self, tournament_id: int) -> Dict[Tuple[str, str], Tuple[int, int, int]]:
+        """(ligne, colonne) -> (victoires de la ligne, nuls, matchs), tous scénarios."""
+        rows = self.conn.execute(
+            "SELECT ai1, ai2, SUM(row_win), SUM(draw), COUNT(*) FROM matches "
+            "WHERE tournament_id = ? GROUP BY ai1, ai2",
+            (tournament_id,),
+        )
+        return {(g1, g2): (w, d, t) for g1, g2, w, d, t in rows}
+
+    def by_scenario(self, tournament_id: int) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """(général, scénario) -> (victoires, matchs) contre tous les adversaires."""
+        rows = self.conn.execute(
+            "SELECT ai1, scenario, SUM(row_win), COUNT(*) FROM matches "
+            "WHERE tournament_id = ? GROUP BY ai1, scenario",
+            (tournament_id,),
+        )
+        return {(g, sc): (w, t) for g, sc, w, t in rows}
+
+    def match_count(self, tournament_id: int) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM matches WHERE tournament_id = ?", (tournament_id,)
+        ).fetchone()[0]
@@ -1,9 +1,23 @@
 import math
 import random
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional, Tuple, List
 
+from src.core.scheduler import TIME_EPS
+
 TILE = 32.0  # 1 tile = 32 pixels
+WINDUP_TIME = 0.12           # durée du windup avant l'impact
+SLEEP_RETRY_TIME = 0.5       # délai entre deux essais d'endormissement ratés
+
+def _facing(dx: float, dy: float) -> Optional[str]:
+    """Direction du sprite pour le vecteur (dx, dy) ; None s'il est trop court."""
+    if abs(dx) < 0.01 and abs(dy) < 0.01: return None
+    angle = math.degrees(math.atan2(dy, dx))
+    if -45 <= angle <= 45: return "right"
+    elif 45 < angle <= 135: return "down"
+    elif -135 <= angle < -45: return "up"
+    return "left"
 
 class UnitType(Enum):
     KNIGHT = "knight"
@@ -12,55 +26,180 @@ class UnitType(Enum):
     LONGSWORDSMAN = "longswordsman"
     ELITESKIRMISHER = "eliteskirmisher"
 
+
+@dataclass(frozen=True)
+class UnitStats:
+    """Fiche de stats immuable, partagée par toutes les unités d'un même type."""
+    max_hp: int
+    attack: int
+    melee_armor: int
+    pierce_armor: int
+    range: float
+    reload_time: float
+    speed: float
+    line_of_sight: float
+    symbol: str
+    collision_radius: float
+    damage_type: str = "melee"
+    bonus: Tuple[Tuple[UnitType, int], ...] = ()  # (type ciblé, bonus de dégâts)
+
+
+UNIT_STATS = {
+    UnitType.KNIGHT: UnitStats(
+        max_hp=100, attack=10, melee_armor=2, pierce_armor=2,
+        range=2.0,  # Mêlée quasi-contact
+        reload_time=1.8, speed=1.35 * TILE, line_of_sight=4.0 * TILE,
+        symbol="K", collision_radius=0.20 * TILE,
+    ),
+    UnitType.PIKEMAN: UnitStats(
+        max_hp=55, attack=4, melee_armor=0, pierce_armor=0,
+        range=3.0, reload_time=3.0, speed=1.0 * TILE, line_of_sight=4.0 * TILE,
+        symbol="P", collision_radius=0.15 * TILE,
+        bonus=((UnitType.KNIGHT, 22),),
+    ),
+    UnitType.CROSSBOWMAN: UnitStats(
+        max_hp=35, attack=5, melee_armor=0, pierce_armor=0,
+        range=5.0 * TILE, reload_time=2.0, speed=0.96 * TILE, line_of_sight=7.0 * TILE,
+        symbol="C", collision_radius=0.15 * TILE, damage_type="pierce",
+    ),
+    UnitType.LONGSWORDSMAN: UnitStats(
+        max_hp=60, attack=9, melee_armor=1, pierce_armor=1,
+        range=2.0, reload_time=2.0, speed=0.9 * TILE, line_of_sight=4.0 * TILE,
+        symbol="S", collision_radius=0.15 * TILE,
+    ),
+    UnitType.ELITESKIRMISHER: UnitStats(
+        max_hp=30, attack=3, melee_armor=0, pierce_armor=4,
+        range=5.0 * TILE, reload_time=3.0, speed=0.96 * TILE, line_of_sight=7.0 * TILE,
+        symbol="E", collision_radius=0.15 * TILE, damage_type="pierce",
+        bonus=((UnitType.CROSSBOWMAN, 4), (UnitType.PIKEMAN, 4)),
+    ),
+}
+
+
+# Données d'ordre vides partagées (jamais modifiées sur place : set_order
+# remplace toujours le dict) — évite un dict alloué par unité inactive.
+_NO_ORDER_DATA: dict = {}
+
+
 class Unit:
+    # Pas de __dict__ par instance : l'état tient dans ces slots,
+    # les stats sont lues dans la fiche partagée `stats` du type.
+    __slots__ = (
+        "x", "y", "player", "current_hp", "is_alive",
+        "_current_order", "_order_data", "needs_new_orders",
+        "_ready_at",        # instant (temps de bataille) de fin de rechargement
+        "_windup_until",    # instant de fin de windup, 0.0 hors windup
+        "_parked_until", "_park_token", "_park_soft",  # attente dans l'EventScheduler
+        "_watchers",        # attaquants garés en rechargement sur cette unité
+        "_watching",        # cible sur laquelle l'unité est garée en rechargement
+        "_dormant",         # endormie : sautée par Battle jusqu'au réveil
+        "_sleep_retry_at",  # pas de nouvel essai d'endormissement avant cet instant
+        "_ai_slot",         # créneau stable de re-planification (IA à fréquence réduite)
+        "uid",              # identifiant stable dans la bataille (sauvegardes, replays)
+        "direction", "battle",
+        "_cell",            # cellule courante dans l'index spatial de la Map
+        "_registry_dead",   # mort déjà signalée au registre de Battle
+        "_eidx",            # ligne dans les tableaux du moteur numpy
+    )
+
+    unit_type: Optional[UnitType] = None
+    stats: Optional[UnitStats] = None
+
     def __init__(self, x: float, y: float, player):
         self.x = x
         self.y = y
         self.player = player
-        self.max_hp = self.get_max_hp()
-        self.current_hp = self.max_hp
+        self.current_hp = self.stats.max_hp
         self.is_alive = True
         self._current_order = None
-        self._order_data = {}
+        self._order_data = _NO_ORDER_DATA
         self.needs_new_orders = True
-        self.attack_cooldown = 0.0
-        self.attack_windup_timer = 0.0
+        self._ready_at = 0.0
+        self._windup_until = 0.0
+        self._parked_until = 0.0
+        self._park_token = 0
+        self._park_soft = True
+        self._watchers = ()
+        self._watching = None
+        self._dormant = False
+        self._sleep_retry_at = 0.0
+        self._ai_slot = 0
+        self.uid = -1
         self.direction = "down"
         self.battle = None
+        self._cell = None
+        self._registry_dead = False
+        self._eidx = None
+
+    @property
+    def max_hp(self) -> int:
+        return self.stats.max_hp
+
+    # ===== MINUTERIES (stockées en instants absolus) =====
+    def _now(self) -> float:
+        return self.battle.time if self.battle is not None else 0.0
+
+    @property
+    def attack_cooldown(self) -> float:
+        return max(0.0, self._ready_at - self._now())
 
-    # ===== MÉTHODES ABSTRAITES (Stats) =====
-    def get_max_hp(self) -> int: raise NotImplementedError
-    def get_attack(self) -> int: raise NotImplementedError
-    def get_melee_armor(self) -> int: raise NotImplementedError
-    def get_pierce_armor(self) -> int: raise NotImplementedError
-    def get_range(self) -> float: raise NotImplementedError
-    def get_reload_time(self) -> float: raise NotImplementedError
-    def get_speed(self) -> float: raise NotImplementedError
-    def get_line_of_sight(self) -> float: raise NotImplementedError
-    def get_symbol(self) -> str: raise NotImplementedError
-    def get_collision_radius(self) -> float: raise NotImplementedError
+    @attack_cooldown.setter
+    def attack_cooldown(self, value: float):
+        self._ready_at = self._now() + value
+
+    @property
+    def attack_windup_timer(self) -> float:
+        if not self._windup_until: return 0.0
+        return max(0.0, self._windup_until - self._now())
+
+    @attack_windup_timer.setter
+    def attack_windup_timer(self, value: float):
+        self._windup_until = self._now() + value if value > 0 else 0.0
+
+    # ===== STATS (lues dans la fiche du type) =====
+    def get_max_hp(self) -> int: return self.stats.max_hp
+    def get_attack(self) -> int: return self.stats.attack
+    def get_melee_armor(self) -> int: return self.stats.melee_armor
+    def get_pierce_armor(self) -> int: return self.stats.pierce_armor
+    def get_range(self) -> float: return self.stats.range
+    def get_reload_time(self) -> float: return self.stats.reload_time
+    def get_speed(self) -> float: return self.stats.speed
+    def get_line_of_sight(self) -> float: return self.stats.line_of_sight
+    def get_symbol(self) -> str: return self.stats.symbol
+    def get_collision_radius(self) -> float: return self.stats.collision_radius
 
     # ===== LOGIQUE DE COMBAT (Fusionnée) =====
     def get_bonus_damage(self, target: 'Unit') -> int:
-        return 0  # Surchargé dans les sous-classes
+        for unit_type, bonus in self.stats.bonus:
+            if target.unit_type is unit_type:
+                return bonus
+        return 0
 
     def get_damage_type(self) -> str:
-        return "melee"  # Surchargé pour les archers
+        return self.stats.damage_type
 
-    def take_damage(self, damage: int, damage_type: str = "melee"):
-        if not self.is_alive: return
-        armor = self.get_melee_armor() if damage_type == "melee" else self.get_pierce_armor()
-        self.current_hp -= max(1, damage - armor) # Minimum 1 dégât
+    def take_damage(self, damage: int, damage_type: str = "melee") -> int:
+        """Applique les dégâts ; renvoie les dégâts après armure."""
+        if not self.is_alive: return 0
+        if self._dormant: self.wake()
+        stats = self.stats
+        armor = stats.melee_armor if damage_type == "melee" else stats.pierce_armor
+        dealt = max(1, damage - armor) # Minimum 1 dégât
+        self.current_hp -= dealt
         if self.current_hp <= 0:
             self.current_hp = 0
             self.is_alive = False
             self.clear_order()
+            if self.battle is not None:
+                self.battle.registry.mark_dead(self)
+        return dealt
 
     def _apply_combat_damage(self):
         target = self._order_data.get("target")
         if target and target.is_alive:
             # Calcul base + bonus (Diallo)
-            raw_dmg = self.get_attack() + self.get_bonus_damage(target)
+            stats = self.stats
+            raw_dmg = stats.attack + self.get_bonus_damage(target)
             
             # Modificateur de hauteur (Chef)
             my_el = self.battle.world_map.get_elevation_at(self.x, self.y)
@@ -69,14 +208,17 @@ class Unit:
             if my_el > target_el: raw_dmg *= 1.25
             elif my_el < target_el: raw_dmg *= 0.75
             
-            target.take_damage(int(raw_dmg), self.get_damage_type())
-            self.attack_cooldown = self.get_reload_time()
+            dealt = target.take_damage(int(raw_dmg), stats.damage_type)
+            if self.battle.telemetry is not None:
+                self.battle.telemetry.add_damage(self, dealt)
+            self._ready_at = self.battle.time + stats.reload_time
             if not target.is_alive: self.clear_order()
 
     # ===== MOUVEMENT (Ta version stable) =====
     def _compute_steering(self, battle) -> Tuple[float, float]:
         vx, vy = 0.0, 0.0
         target_pos = None
+        stats = self.stats
 
         if self._current_order == "move":
             target_pos = self._order_data.get("position")
@@ -85,7 +227,7 @@ class Unit:
             if target and target.is_alive:
                 dist = self.distance_to(target)
                 # On utilise la portée réelle sans "visual overlap" pour éviter le bégaiement
-                eff_range = self.get_range() + self.get_collision_radius() + target.get_collision_radius()
+                eff_range = stats.range + stats.collision_radius + target.stats.collision_radius
                 if dist > eff_range:
                     target_pos = (target.x, target.y)
 
@@ -97,30 +239,37 @@ class Unit:
                 c_el = battle.world_map.get_elevation_at(self.x, self.y)
                 t_el = battle.world_map.get_elevation_at(target_pos[0], target_pos[1])
                 speed_mod = 0.6 if t_el > c_el else (1.2 if t_el < c_el else 1.0)
-                vx = (dx / dist) * self.get_speed() * speed_mod
-                vy = (dy / dist) * self.get_speed() * speed_mod
+                vx = (dx / dist) * stats.speed * speed_mod
+                vy = (dy / dist) * stats.speed * speed_mod
 
-        # Séparation (Anti-empilement)
-        for other in battle.all_units():
+        # Séparation (Anti-empilement) : seuls les voisins de l'index spatial
+        my_radius = stats.collision_radius
+        spatial = battle.world_map.spatial
+        reach = (my_radius + spatial.max_radius) * 0.9
+        for other in spatial.candidates(self.x, self.y, reach):
             if other is self or not other.is_alive: continue
             dx, dy = self.x - other.x, self.y - other.y
             dist_sq = dx*dx + dy*dy
-            min_dist = (self.get_collision_radius() + other.get_collision_radius()) * 0.9
+            min_dist = (my_radius + other.stats.collision_radius) * 0.9
             if dist_sq < min_dist * min_dist and dist_sq > 0:
+                if other._dormant: other.wake()  # on la bouscule : elle doit s'écarter
                 d = math.sqrt(dist_sq)
                 push = (min_dist - d) / min_dist
-                vx += (dx / d) * push * self.get_speed() * 1.5
-                vy += (dy / d) * push * self.get_speed() * 1.5
+                vx += (dx / d) * push * stats.speed * 1.5
+                vy += (dy / d) * push * stats.speed * 1.5
         return vx, vy
 
     def update(self, battle, delta_time: float):
         if not self.is_alive: return
         self.battle = battle
-        self.attack_cooldown = max(0.0, self.attack_cooldown - delta_time)
+        now = battle.time
 
-        if self.attack_windup_timer > 0:
-            self.attack_windup_timer -= delta_time
-            if self.attack_windup_timer <= 0: self._apply_combat_damage()
+        # Les minuteries ne sont plus décomptées : Battle saute l'unité tant
+        # que son réveil (fin de windup / de rechargement) n'est pas échu.
+        if self._windup_until:
+            if now + TIME_EPS < self._windup_until: return
+            self._windup_until = 0.0
+            self._apply_combat_damage()
             return
 
         if self._current_order == "attack":
@@ -131,115 +280,151 @@ class Unit:
             self._update_direction(target.x - self.x, target.y - self.y)
             
             dist = self.distance_to(target)
-            eff_range = self.get_range() + self.get_collision_radius() + target.get_collision_radius()
-            
+            stats = self.stats
+            eff_range = stats.range + stats.collision_radius + target.stats.collision_radius
+
             if dist <= eff_range + 5.0: # Marge de tolérance
-                if self.attack_cooldown <= 0:
-                    self.attack_windup_timer = 0.12 # Windup court
+                if now + TIME_EPS >= self._ready_at:
+                    self._windup_until = now + WINDUP_TIME # Windup court
+                    battle.scheduler.park(self, self._windup_until, interruptible=False)
+                else:
+                    # Au contact, en rechargement : rien à faire avant la fin du
+                    # rechargement, sauf si la cible meurt ou bouge (alert_watchers)
+                    battle.scheduler.park(self, self._ready_at)
+                    self._watch(target)
                 return
 
         vx, vy = self._compute_steering(battle)
-        if vx != 0 or vy != 0:
-            if self._current_order != "attack": self._update_direction(vx, vy)
-            nx, ny = self.x + vx * delta_time, self.y + vy * delta_time
-            # Glissade
-            if battle.world_map.can_move_to(self, nx, ny, battle.all_units()):
-                self.x, self.y = nx, ny
-            elif battle.world_map.can_move_to(self, nx, self.y, battle.all_units()):
-                self.x = nx
-            elif battle.world_map.can_move_to(self, self.x, ny, battle.all_units()):
-                self.y = ny
-            self.x, self.y = battle.world_map.clamp_position(self.x, self.y)
+        if vx == 0 and vy == 0:
+            # Sans ordre actif ni poussée : candidate au sommeil
+            if self._current_order in (None, "hold") and now >= self._sleep_retry_at:
+                if not self._try_sleep(battle):
+                    self._sleep_retry_at = now + SLEEP_RETRY_TIME
+            return
+        if self._current_order != "attack": self._update_direction(vx, vy)
+        nx, ny = self.x + vx * delta_time, self.y + vy * delta_time
+        # Glissade (le tableau des vivants est celui du registre, pas de copie)
+        world_map, units = battle.world_map, battle.registry.units
+        if world_map.can_move_to(self, nx, ny, units):
+            self.x, self.y = nx, ny
+        elif world_map.can_move_to(self, nx, self.y, units):
+            self.x = nx
+        elif world_map.can_move_to(self, self.x, ny, units):
+            self.y = ny
+        self.x, self.y = battle.world_map.clamp_position(self.x, self.y)
+
+    # ===== SOMMEIL (unités inactives loin du combat) =====
+    def _try_sleep(self, battle) -> bool:
+        """S'endort si aucun ennemi n'est dans le rayon de réveil (marge d'une cellule)."""
+        spatial = battle.world_map.spatial
+        reach = self.stats.line_of_sight + spatial.cell_size * 1.5
+        reach_sq = reach * reach
+        x, y, player = self.x, self.y, self.player
+        for other in spatial.candidates(x, y, reach):
+            if other.player is player or not other.is_alive: continue
+            dx, dy = other.x - x, other.y - y
+            if dx*dx + dy*dy <= reach_sq:
+                return False
+        self._dormant = True
+        battle.dormant_count += 1
+        return True
+
+    # ===== ATTAQUANTS GARÉS (réveillés par leur cible) =====
+    def _watch(self, target: 'Unit'):
+        """Se signale à la cible, qui réveillera l'unité garée si besoin."""
+        if self._watching is target: return
+        self._watching = target
+        if target._watchers:
+            target._watchers.append(self)
+        else:
+            target._watchers = [self]
+
+    def alert_watchers(self):
+        """
+        Appelé par Battle après le déplacement de l'unité et à sa mort : réveille
+        les attaquants garés sur elle dont la mise à jour ferait quelque chose
+        (cible morte, hors de portée, direction du sprite à changer). Les autres
+        restent garés, exactement comme s'ils avaient été mis à jour.
+        """
+        keep = []
+        for a in self._watchers:
+            if a._watching is not self:
+                continue  # garée depuis sur une autre cible (ou doublon déjà vu)
+            a._watching = None
+            if not (a._parked_until and a._park_soft and a.is_alive):
+                continue  # réveillée entre-temps : elle se réinscrira si besoin
+            if self.is_alive:
+                stats = a.stats
+                eff_range = stats.range + stats.collision_radius + self.stats.collision_radius
+                if a.distance_to(self) <= eff_range + 5.0:
+                    facing = _facing(self.x - a.x, self.y - a.y)
+                    if facing is None or facing == a.direction:
+                        keep.append(a)
+                        continue
+            a._parked_until = 0.0
+        for a in keep:
+            a._watching = self
+        self._watchers = keep or ()
+
+    def wake(self):
+        if not self._dormant: return
+        self._dormant = False
+        self._sleep_retry_at = 0.0
+        if self.battle is not None:
+            self.battle.dormant_count -= 1
 
     def _update_direction(self, dx: float, dy: float):
-        if abs(dx) < 0.01 and abs(dy) < 0.01: return
-        angle = math.degrees(math.atan2(dy, dx))
-        if -45 <= angle <= 45: self.direction = "right"
-        elif 45 < angle <= 135: self.direction = "down"
-        elif -135 <= angle < -45: self.direction = "up"
-        else: self.direction = "left"
+        facing = _facing(dx, dy)
+        if facing is not None: self.direction = facing
 
     def set_order(self, order_type: str, data: dict):
+        if order_type == self._current_order and data == self._order_data:
+            self.needs_new_orders = False  # même ordre : l'unité reste garée
+            return
+        if self._parked_until and self._park_soft:
+            self._parked_until = 0.0  # nouvel ordre : ré-évaluation immédiate
+        if self._dormant: self.wake()
         self._current_order = order_type
         self._order_data = data
         self.needs_new_orders = False
 
     def clear_order(self):
+        if self._parked_until and self._park_soft:
+            self._parked_until = 0.0
         self._current_order = None
-        self._order_data = {}
+        self._order_data = _NO_ORDER_DATA
         self.needs_new_orders = True
 
     def distance_to(self, other: 'Unit') -> float:
         return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2)
 
 # ===== UNITÉS SPÉCIFIQUES =====
+# Chaque classe ne fait que pointer vers sa fiche de stats.
 
 class Knight(Unit):
-    def get_max_hp(self): return 100
-    def get_attack(self): return 10
-    def get_melee_armor(self): return 2
-    def get_pierce_armor(self): return 2
-    def get_range(self): return 2.0 # Mêlée quasi-contact
-    def get_reload_time(self): return 1.8
-    def get_speed(self): return 1.35 * TILE
-    def get_line_of_sight(self): return 4.0 * TILE
-    def get_symbol(self): return "K"
-    def get_collision_radius(self): return 0.20 * TILE
+    __slots__ = ()
+    unit_type = UnitType.KNIGHT
+    stats = UNIT_STATS[UnitType.KNIGHT]
 
 class Pikeman(Unit):
-    def get_max_hp(self): return 55
-    def get_attack(self): return 4
-    def get_melee_armor(self): return 0
-    def get_pierce_armor(self): return 0
-    def get_range(self): return 3.0
-    def get_reload_time(self): return 3.0
-    def get_speed(self): return 1.0 * TILE
-    def get_line_of_sight(self): return 4.0 * TILE
-    def get_symbol(self): return "P"
-    def get_collision_radius(self): return 0.15 * TILE
-    def get_bonus_damage(self, target):
-        return 22 if isinstance(target, Knight) else 0
+    __slots__ = ()
+    unit_type = UnitType.PIKEMAN
+    stats = UNIT_STATS[UnitType.PIKEMAN]
 
 class Crossbowman(Unit):
-    def get_max_hp(self): return 35
-    def get_attack(self): return 5
-    def get_melee_armor(self): return 0
-    def get_pierce_armor(self): return 0
-    def get_range(self): return 5.0 * TILE
-    def get_reload_time(self): return 2.0
-    def get_speed(self): return 0.96 * TILE
-    def get_line_of_sight(self): return 7.0 * TILE
-    def get_symbol(self): return "C"
-    def get_collision_radius(self): return 0.15 * TILE
-    def get_damage_type(self): return "pierce"
+    __slots__ = ()
+    unit_type = UnitType.CROSSBOWMAN
+    stats = UNIT_STATS[UnitType.CROSSBOWMAN]
 
 class LongSwordsman(Unit):
-    def get_max_hp(self): return 60
-    def get_attack(self): return 9
-    def get_melee_armor(self): return 1
-    def get_pierce_armor(self): return 1
-    def get_range(self): return 2.0
-    def get_reload_time(self): return 2.0
-    def get_speed(self): return 0.9 * TILE
-    def get_line_of_sight(self): return 4.0 * TILE
-    def get_symbol(self): return "S"
-    def get_collision_radius(self): return 0.15 * TILE
+    __slots__ = ()
+    unit_type = UnitType.LONGSWORDSMAN
+    stats = UNIT_STATS[UnitType.LONGSWORDSMAN]
 
 class EliteSkirmisher(Unit):
-    def get_max_hp(self): return 30
-    def get_attack(self): return 3
-    def get_melee_armor(self): return 0
-    def get_pierce_armor(self): return 4
-    def get_range(self): return 5.0 * TILE
-    def get_reload_time(self): return 3.0
-    def get_speed(self): return 0.96 * TILE
-    def get_line_of_sight(self): return 7.0 * TILE
-    def get_symbol(self): return "E"
-    def get_collision_radius(self): return 0.15 * TILE
-    def get_damage_type(self): return "pierce"
-    def get_bonus_damage(self, target):
-        if isinstance(target, (Crossbowman, Pikeman)): return 4
-        return 0
+    __slots__ = ()
+    unit_type = UnitType.ELITESKIRMISHER
+    stats = UNIT_STATS[UnitType.ELITESKIRMISHER]
 
 def create_unit(unit_type: UnitType, x: float, y: float, player) -> Unit:
     mapping = {
@@ -1,15 +1,49 @@
+"""
+Historique des batailles (run) : chaque bataille est une ligne d'une base
+SQLite en ajout seul (history.db), indexée par date, général et scénario.
+
+Les pages HTML sont générées à partir de la base : history.html montre les
+PAGE_SIZE dernières batailles, les blocs complets de PAGE_SIZE batailles
+sont figés dans history_pages/page_NNNNN.html. Ajouter une bataille ne
+réécrit que ces pages-là, quelle que soit la taille de l'historique.
+"""
 import datetime
+import html
+import json
 import os
+import sqlite3
+from typing import List, Optional, Tuple
 
 FILENAME = "history.html"
+DB_FILENAME = "history.db"
+LEGACY_FILENAME = "history_legacy.html"
+ARCHIVE_DIR = "history_pages"
+PAGE_SIZE = 100
 
-def init_history_file():
-    """Initialise le fichier (Version sans tableau des scores)."""
-    # Si le fichier existe déjà, on ne touche à rien
-    if os.path.exists(FILENAME):
-        return
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fights (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    played_at   TEXT NOT NULL,     -- ISO, heure locale
+    scenario    TEXT,
+    p1_name     TEXT NOT NULL,
+    p2_name     TEXT NOT NULL,
+    ia1         TEXT NOT NULL,
+    ia2         TEXT NOT NULL,
+    u1_start    INTEGER NOT NULL,
+    u2_start    INTEGER NOT NULL,
+    winner      TEXT NOT NULL,     -- nom du joueur ou "DRAW"
+    duration    REAL NOT NULL,
+    survivors   TEXT NOT NULL      -- JSON [[symbole, joueur], ...]
+);
+CREATE INDEX IF NOT EXISTS fights_by_date ON fights (played_at);
+CREATE INDEX IF NOT EXISTS fights_by_ia1 ON fights (ia1, played_at);
+CREATE INDEX IF NOT EXISTS fights_by_ia2 ON fights (ia2, played_at);
+CREATE INDEX IF NOT EXISTS fights_by_scenario ON fights (scenario, played_at);
+"""
+COLUMNS = ("id, played_at, scenario, p1_name, p2_name, ia1, ia2, u1_start, u2_start,"
+           " winner, duration, survivors")
 
-    html_content = """<!DOCTYPE html>
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset='utf-8'>
@@ -104,29 +138,200 @@ def init_history_file():
         .ub-m { background: rgba(255, 0, 85, 0.1); color: var(--magenta); border-color: rgba(255, 0, 85, 0.2); }
         .ub-icon { margin-right: 3px; }
 
+        /* NAVIGATION ENTRE PAGES */
+        .subtitle { text-align: center; color: #888; margin-top: -30px; margin-bottom: 30px; font-size: 0.9rem; }
+        .nav { max-width: 900px; margin: 30px auto 0 auto; display: flex; justify-content: space-between; font-family: 'Rajdhani', sans-serif; }
+        .nav a { color: var(--gold); text-decoration: none; }
+        .nav-off { color: #444; }
+
     </style>
 </head>
 <body>
 
     <h1>MEDIEVALI <span style="font-weight:300; opacity:0.5">CHAMPIONSHIP</span></h1>
+    <p class="subtitle">{subtitle}</p>
 
     <div class="timeline">
 """
-    with open(FILENAME, "w", encoding="utf-8") as f:
-        f.write(html_content)
 
-def add_fight_history(p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, duration, survivors_data):
-    # Sécurité : Si le fichier n'existe pas, on le crée
-    if not os.path.exists(FILENAME):
-        init_history_file()
+PAGE_FOOT = """
+    </div>
+{nav}
+</body>
+</html>
+"""
+
+
+def _connect(path: str = DB_FILENAME) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def init_history_file():
+    """
+    Crée la base d'historique. Un ancien history.html (cartes HTML ajoutées
+    bout à bout) est conservé sous history_legacy.html, sans être relu.
+    """
+    if os.path.exists(DB_FILENAME):
+        return
+    if os.path.exists(FILENAME) and not os.path.exists(LEGACY_FILENAME):
+        os.replace(FILENAME, LEGACY_FILENAME)
+    _connect().close()
+
+
+def add_fight_history(p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, duration, survivors_data,
+                      scenario=None):
+    """
+    Ajoute une bataille : une insertion en base, puis réécriture de la page
+    des dernières batailles (PAGE_SIZE cartes) et, quand un bloc de
+    PAGE_SIZE batailles se termine, de sa page d'archive. Le coût ne dépend
+    pas de la taille de l'historique.
+    """
+    init_history_file()
+    conn = _connect()
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO fights (played_at, scenario, p1_name, p2_name, ia1, ia2, u1_start, u2_start,"
+                " winner, duration, survivors) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    datetime.datetime.now().isoformat(timespec="seconds"), scenario,
+                    p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, duration,
+                    json.dumps([[str(sym), team] for sym, team in survivors_data], ensure_ascii=False),
+                ),
+            )
+        fight_id = cur.lastrowid
+        if fight_id % PAGE_SIZE == 0:
+            block = fight_id // PAGE_SIZE - 1
+            _write_archive(conn, block)
+            if block > 0:
+                _write_archive(conn, block - 1)  # son lien « plus récentes » pointe désormais sur ce bloc
+        _write_latest(conn)
+    finally:
+        conn.close()
+
+
+# ============================================================
+# RENDU DES PAGES
+# ============================================================
+
+def _rows(conn, where: str = "", params: Tuple = (), limit: int = PAGE_SIZE, offset: int = 0) -> List[tuple]:
+    """Batailles de la page, de la plus ancienne à la plus récente (la timeline les inverse)."""
+    rows = conn.execute(
+        f"SELECT {COLUMNS} FROM fights {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+        params + (limit, offset),
+    ).fetchall()
+    rows.reverse()
+    return rows
+
+
+def _archive_name(block: int) -> str:
+    return os.path.join(ARCHIVE_DIR, f"page_{block:05d}.html")
+
+
+def _full_blocks(conn) -> int:
+    last = conn.execute("SELECT MAX(id) FROM fights").fetchone()[0] or 0
+    return last // PAGE_SIZE
+
+
+def _link(label: str, href: Optional[str]) -> str:
+    if href is None:
+        return f"<span class='nav-off'>{label}</span>"
+    return f"<a href='{href}'>{label}</a>"
+
+
+def _write_page(filename: str, rows: List[tuple], subtitle: str, nav: str):
+    cards = "".join(_card(r) for r in rows)
+    if not rows:
+        cards = "<p style='text-align:center; color:#555'>Aucune bataille.</p>"
+    head = PAGE_HEAD.replace("{subtitle}", html.escape(subtitle))
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(head + cards + PAGE_FOOT.format(nav=nav))
+
+
+def _write_latest(conn):
+    """history.html : les PAGE_SIZE dernières batailles, lien vers la dernière archive complète."""
+    blocks = _full_blocks(conn)
+    older = _archive_name(blocks - 1).replace(os.sep, "/") if blocks else None
+    nav = f"<div class='nav'>{_link('Batailles plus anciennes ▶', older)}</div>"
+    total = conn.execute("SELECT COUNT(*) FROM fights").fetchone()[0]
+    _write_page(FILENAME, _rows(conn), f"Dernières batailles ({total} au total)", nav)
+
+
+def _write_archive(conn, block: int):
+    """Page d'archive figée : batailles d'id block*PAGE_SIZE+1 à (block+1)*PAGE_SIZE."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    first, last = block * PAGE_SIZE + 1, (block + 1) * PAGE_SIZE
+    rows = conn.execute(
+        f"SELECT {COLUMNS} FROM fights WHERE id BETWEEN ? AND ? ORDER BY id", (first, last)
+    ).fetchall()
+    # Liens relatifs au dossier des archives
+    newer = f"page_{block + 1:05d}.html" if block + 1 < _full_blocks(conn) else "../" + FILENAME
+    older = f"page_{block - 1:05d}.html" if block > 0 else None
+    nav = (f"<div class='nav'>{_link('◀ Batailles plus récentes', newer)}"
+           f"{_link('Dernières batailles', '../' + FILENAME)}"
+           f"{_link('Batailles plus anciennes ▶', older)}</div>")
+    _write_page(_archive_name(block), rows, f"Archives : batailles #{first} à #{last}", nav)
+
+
+def rebuild_history_pages():
+    """Réécrit history.html et toutes les archives depuis la base (mise en forme modifiée...)."""
+    init_history_file()
+    conn = _connect()
+    try:
+        for block in range(_full_blocks(conn)):
+            _write_archive(conn, block)
+        _write_latest(conn)
+    finally:
+        conn.close()
+
+
+def render_history_view(filename: str, general: Optional[str] = None, scenario: Optional[str] = None,
+                        since: Optional[str] = None, page: int = 0) -> int:
+    """
+    Vue filtrée générée à la demande (par index : général, scénario, date
+    ISO minimale). `page` 0 = les plus récentes. Renvoie le nombre de
+    batailles correspondantes.
+    """
+    init_history_file()
+    clauses, params = [], []
+    if general:
+        clauses.append("(ia1 = ? OR ia2 = ?)")
+        params += [general, general]
+    if scenario:
+        clauses.append("scenario = ?")
+        params.append(scenario)
+    if since:
+        clauses.append("played_at >= ?")
+        params.append(since)
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    conn = _connect()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM fights {where}", tuple(params)).fetchone()[0]
+        rows = _rows(conn, where, tuple(params), offset=page * PAGE_SIZE)
+    finally:
+        conn.close()
+    pages = max(1, -(-total // PAGE_SIZE))
+    filters = ", ".join(f"{k} = {v}" for k, v in
+                        (("général", general), ("scénario", scenario), ("depuis", since)) if v)
+    subtitle = f"{total} batailles{' (' + filters + ')' if filters else ''} — page {page + 1}/{pages}"
+    _write_page(filename, rows, subtitle, "")
+    return total
+
+
+def _card(row) -> str:
+    fight_id, played_at, scenario, p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, duration, survivors = row
+    survivors_data = json.loads(survivors)
+    when = datetime.datetime.fromisoformat(played_at).strftime("%d/%m/%Y %H:%M")
 
-    now = datetime.datetime.now().strftime("%H:%M")
-    
     count_p1 = len([s for s in survivors_data if s[1] == p1_name])
     count_p2 = len([s for s in survivors_data if s[1] == p2_name])
     total = count_p1 + count_p2 if (count_p1 + count_p2) > 0 else 1
     pct_p1 = (count_p1 / total) * 100
-    
+
     card_class = ""
     tag_p1, tag_p2 = "<span class='tag tag-lose'>DÉFAITE</span>", "<span class='tag tag-lose'>DÉFAITE</span>"
     winner_attr = "draw"
@@ -145,16 +350,16 @@ def add_fight_history(p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, du
         for symbol, team in survivors_data:
             css = "ub-c" if team == p1_name else "ub-m"
             icon = "♞" if "K" in str(symbol) else "♟"
-            badges += f"<span class='u-badge {css}'><span class='ub-icon'>{icon}</span>{symbol}</span>"
+            badges += f"<span class='u-badge {css}'><span class='ub-icon'>{icon}</span>{html.escape(symbol)}</span>"
     else:
         badges = "<span style='color:#555; font-size:0.8em'>☠️ Destruction Totale</span>"
 
-    html = f"""
+    return f"""
         <div class="match-card {card_class}" data-winner="{winner_attr}">
             <div class="m-header">
-                <span>MATCH #{int(datetime.datetime.now().timestamp())%1000}</span>
+                <span>MATCH #{fight_id}{' • ' + html.escape(scenario) if scenario else ''}</span>
                 <span>⏱ {duration:.1f}s</span>
-                <span>{now}</span>
+                <span>{when}</span>
             </div>
             
             <div class="hp-bar">
@@ -164,16 +369,16 @@ def add_fight_history(p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, du
 
             <div class="m-content">
                 <div class="m-player">
-                    <div class="mp-name" style="color:var(--cyan)">{p1_name}</div>
-                    <div class="mp-info">{ia1} • {u1_start} Unités</div>
+                    <div class="mp-name" style="color:var(--cyan)">{html.escape(p1_name)}</div>
+                    <div class="mp-info">{html.escape(str(ia1))} • {u1_start} Unités</div>
                     {tag_p1}
                 </div>
                 
                 <div class="m-vs">VS</div>
                 
                 <div class="m-player">
-                    <div class="mp-name" style="color:var(--magenta)">{p2_name}</div>
-                    <div class="mp-info">{ia2} • {u2_start} Unités</div>
+                    <div class="mp-name" style="color:var(--magenta)">{html.escape(p2_name)}</div>
+                    <div class="mp-info">{html.escape(str(ia2))} • {u2_start} Unités</div>
                     {tag_p2}
                 </div>
             </div>
@@ -186,5 +391,3 @@ def add_fight_history(p1_name, p2_name, ia1, ia2, u1_start, u2_start, winner, du
             </details>
         </div>
         """
-    with open(FILENAME, "a", encoding="utf-8") as f:
-        f.write(html)
\ No newline at end of file
@@ -3,9 +3,10 @@ import os
 
 FILENAME = "tournament_results.html"
 
-def generate_tournament_report(stats, generals, scenarios):
+def generate_tournament_report(store, tournament_id, generals, scenarios):
     """
-    Génère un rapport HTML complet basé sur les statistiques du tournoi.
+    Génère un rapport HTML complet à partir des agrégats SQL du tournoi
+    (TournamentStore) : rien n'est recompté en Python.
     """
     css = """
     <style>
@@ -37,15 +38,11 @@ def generate_tournament_report(stats, generals, scenarios):
     html += "<h2>1. Classement Général (Toutes maps confondues)</h2>"
     html += "<table><tr><th>Général</th><th>Victoires</th><th>Nuls</th><th>Matchs Joués</th><th>% Victoire</th></tr>"
     
-    global_stats = {g: {'wins': 0, 'draws': 0, 'total': 0} for g in generals}
-    for sc in scenarios:
-        for g1 in generals:
-            for g2 in generals:
-                if g2 in stats[sc][g1]:
-                    d = stats[sc][g1][g2]
-                    global_stats[g1]['wins'] += d['wins']
-                    global_stats[g1]['draws'] += d.get('draws', 0)
-                    global_stats[g1]['total'] += d['matches']
+    ranking = store.ranking(tournament_id)
+    global_stats = {}
+    for g in generals:
+        w, d, t = ranking.get(g, (0, 0, 0))
+        global_stats[g] = {'wins': w, 'draws': d, 'total': t}
 
     # Tri par taux de victoire décroissant
     sorted_gens = sorted(generals, key=lambda g: (global_stats[g]['wins']/global_stats[g]['total'] if global_stats[g]['total']>0 else 0), reverse=True)
@@ -62,17 +59,12 @@ def generate_tournament_report(stats, generals, scenarios):
     html += "<h2>2. Matrice Croisée (Général vs Général)</h2>"
     html += "<table><tr><th>VS</th>" + "".join([f"<th>{g}</th>" for g in generals]) + "</tr>"
     
+    cross = store.cross_matrix(tournament_id)
     for g1 in generals:
         html += f"<tr><th>{g1}</th>"
         for g2 in generals:
-            w, d, t = 0, 0, 0
-            # On cumule les résultats de ce duel sur tous les scénarios
-            for sc in scenarios:
-                if g2 in stats[sc][g1]:
-                    w += stats[sc][g1][g2]['wins']
-                    d += stats[sc][g1][g2].get('draws', 0)
-                    t += stats[sc][g1][g2]['matches']
-            
+            # Résultats de ce duel cumulés sur tous les scénarios
+            w, d, t = cross.get((g1, g2), (0, 0, 0))
             pct = (w / t * 100) if t > 0 else 0
             # Style visuel selon la performance
             cls = "self-match" if g1 == g2 else ("win-high" if pct > 55 else "win-low" if pct < 45 else "")
@@ -85,12 +77,12 @@ def generate_tournament_report(stats, generals, scenarios):
     html += "<h2>3. Performance par Scénario</h2>"
     html += "<table><tr><th>Général</th>" + "".join([f"<th>{sc}</th>" for sc in scenarios]) + "</tr>"
     
+    per_scenario = store.by_scenario(tournament_id)
     for g in generals:
         html += f"<tr><th>{g}</th>"
         for sc in scenarios:
-            # On calcule le taux de victoire de g contre TOUS les opposants sur ce scénario précis
-            w = sum(stats[sc][g][opp]['wins'] for opp in generals if opp in stats[sc][g])
-            t = sum(stats[sc][g][opp]['matches'] for opp in generals if opp in stats[sc][g])
+            # Taux de victoire de g contre TOUS les opposants sur ce scénario précis
+            w, t = per_scenario.get((g, sc), (0, 0))
             pct = (w/t*100) if t > 0 else 0
             html += f"<td>{pct:.1f}%</td>"
         html += "</tr>"
@@ -2,11 +2,50 @@ import os
 import pygame
 import sys
 import math
+from collections import OrderedDict
+from operator import itemgetter
 from typing import Tuple, Dict
+
+import numpy as np
 from src.vis.view_base import View
 
 TILE = 32.0
 
+# ================== ZOOM ==================
+# Échelle d'un sprite à l'écran : zoom * SPRITE_SCALE. Les sprites sont
+# précalculés (smoothscale) à des échelles discrètes PYRAMID_MIN * PYRAMID_STEP**k
+# jusqu'à PYRAMID_MAX ; le rendu prend le niveau le plus proche. Au-delà de
+# PYRAMID_TOLERANCE d'écart (zooms extrêmes), le niveau le plus proche est
+# redimensionné par un simple transform.scale.
+SPRITE_SCALE = 5.0
+PYRAMID_MIN = 0.25
+PYRAMID_MAX = 2.0
+PYRAMID_STEP = 2 ** 0.25
+PYRAMID_TOLERANCE = 1.1
+PYRAMID_SCALES = [
+    PYRAMID_MIN * PYRAMID_STEP ** k
+    for k in range(round(math.log(PYRAMID_MAX / PYRAMID_MIN, PYRAMID_STEP)) + 1)
+]
+
+ELEVATION_STEP = 15.0   # décalage vertical (pixels au zoom 1) par niveau d'élévation
+MAX_ELEVATION = 2
+
+# ================== TERRAIN ==================
+# Relief de Map.elevation_grid : une tuile losange par case, surélevée de
+# ELEVATION_STEP par niveau, avec un flanc sombre vers la caméra. Les tuiles
+# sont pré-dessinées par blocs d'environ TERRAIN_CHUNK_PX de côté, pour la
+# carte et le zoom courants ; une image ne fait qu'un blits() des blocs
+# visibles. Au-delà (tuile plus grande qu'un bloc), les quelques tuiles
+# visibles sont posées directement.
+TERRAIN_COLORS = [(62, 84, 52), (88, 112, 66), (118, 138, 86)]   # par niveau
+TERRAIN_SIDE_SHADE = 0.6
+TERRAIN_KEY = (255, 0, 255)  # fond transparent (colorkey) des tuiles et des blocs
+TERRAIN_CHUNK_PX = 512
+TERRAIN_TILE_MAX_PX = 1024  # au-delà, les tuiles sont tracées à chaque image (zoom extrême)
+TERRAIN_MAX_CHUNKS = 96     # blocs gardés par zoom (LRU)
+TERRAIN_BUILDS_PER_FRAME = 4
+TERRAIN_ZOOM_LAYERS = 3     # zooms gardés en cache
+
 # ================== PATHS ==================
 SPRITES_ROOT = os.path.join(os.getcwd(), "Sprites")
 BG_IMAGE_PATH = os.path.join(SPRITES_ROOT, "sol.png")
@@ -43,11 +82,14 @@ class IsometricView(View):
         self.camera_x = 0.0
         self.camera_y = 0.0
         self.zoom = 0.15
-        self.last_zoom = 0.2 
         self.freeze_camera_frames = 0
         
         self.minimap_size = 200
         self.minimap_margin = 20
+        # La mini-carte montre toute l'armée : redessinée une image sur minimap_every
+        self.minimap_every = 5
+        self._minimap = None
+        self._minimap_age = 0
         self.minimap_rect = pygame.Rect(
             self.width - self.minimap_size - self.minimap_margin,
             self.height - self.minimap_size - self.minimap_margin,
@@ -65,8 +107,20 @@ class IsometricView(View):
         self.last_mouse = None
 
         self.sprites = {} 
-        self.scaled_cache = {} 
+        self.pyramid = {}       # type > couleur > direction -> [surface par niveau de PYRAMID_SCALES]
+        self.scaled_cache = {}  # redimensionnements hors pyramide, pour le zoom courant
+        self.shadow_cache = {}  # échelle effective -> ellipse d'ombre
+        self.terrain_layers = OrderedDict()  # zoom -> (tuile par niveau, OrderedDict((bx, by) -> bloc))
+        self._terrain_grid = None            # élévation (copie) de la carte des blocs en cache
+        self._terrain_rows = None            # même grille en listes (accès rapide au dessin)
+        self._terrain_last_zoom = None
+        self._terrain_map = None
+        self._sprite_extent = (0, 0)  # plus grand sprite de base (largeur, hauteur)
         self.loaded = False
+        self._level_zoom = None
+        self._level = 0
+        self._level_exact = True
+        self._sprite_scale = PYRAMID_SCALES[0]
 
         self.bg = None
         if os.path.isfile(BG_IMAGE_PATH):
@@ -76,7 +130,10 @@ class IsometricView(View):
     def load_sprites(self):
         """Charge les sprites en les classant par Type > Couleur > Direction."""
         self.sprites.clear()
+        self.pyramid.clear()
         self.scaled_cache.clear()
+        self.shadow_cache.clear()
+        self._level_zoom = None
         if not os.path.isdir(SPRITES_ROOT): return
 
         for unit_type_folder in os.listdir(SPRITES_ROOT):
@@ -113,8 +170,55 @@ class IsometricView(View):
                     # On utilise le nom du fichier (sans extension) comme clé de direction
                     direction_name = os.path.splitext(fname)[0].lower()
                     self.sprites[u_key][c_key][direction_name] = surf
+        self.build_pyramid()
         self.loaded = True
 
+    def build_pyramid(self):
+        """Précalcule chaque sprite à toutes les échelles de PYRAMID_SCALES (une fois par chargement)."""
+        self.pyramid = {
+            u_key: {
+                c_key: {
+                    d: [
+                        pygame.transform.smoothscale(
+                            surf, (max(1, int(surf.get_width() * s)), max(1, int(surf.get_height() * s))))
+                        for s in PYRAMID_SCALES
+                    ]
+                    for d, surf in dirs.items()
+                }
+                for c_key, dirs in colors.items()
+            }
+            for u_key, colors in self.sprites.items()
+        }
+        sizes = [surf.get_size() for colors in self.sprites.values()
+                 for dirs in colors.values() for surf in dirs.values()]
+        self._sprite_extent = (max((w for w, _ in sizes), default=0), max((h for _, h in sizes), default=0))
+
+    def select_zoom_level(self):
+        """Niveau de pyramide le plus proche du zoom courant (recalculé seulement si le zoom change)."""
+        if self.zoom == self._level_zoom:
+            return
+        self._level_zoom = self.zoom
+        wanted = self.zoom * SPRITE_SCALE
+        k = round(math.log(wanted / PYRAMID_MIN, PYRAMID_STEP))
+        self._level = min(max(k, 0), len(PYRAMID_SCALES) - 1)
+        ratio = wanted / PYRAMID_SCALES[self._level]
+        self._level_exact = 1 / PYRAMID_TOLERANCE <= ratio <= PYRAMID_TOLERANCE
+        self._sprite_scale = PYRAMID_SCALES[self._level] if self._level_exact else wanted
+        self.scaled_cache.clear()
+
+    def get_shadow(self):
+        """Ellipse d'ombre à l'échelle effective des sprites, créée une fois par niveau."""
+        self.select_zoom_level()
+        shadow = self.shadow_cache.get(self._sprite_scale)
+        if shadow is None:
+            if len(self.shadow_cache) > 4 * len(PYRAMID_SCALES):
+                self.shadow_cache.clear()  # zooms extrêmes successifs : le cache reste borné
+            v_s = self._sprite_scale
+            shadow = pygame.Surface((max(1, int(TILE * 0.8 * v_s)), max(1, int(TILE * 0.4 * v_s))), pygame.SRCALPHA)
+            pygame.draw.ellipse(shadow, (0, 0, 0, 70), shadow.get_rect())
+            self.shadow_cache[self._sprite_scale] = shadow
+        return shadow
+
     def get_direction_str(self, vx: float, vy: float) -> str:
         """Détermine la direction cardinale à partir d'un vecteur."""
         if abs(vx) < 0.01 and abs(vy) < 0.01:
@@ -128,26 +232,29 @@ class IsometricView(View):
         return "left"
 
     def get_scaled_sprite(self, unit_type, color, direction="down"):
-        """Récupère le sprite orienté et mis à l'échelle."""
-        ut = self.sprites.get(unit_type)
+        """Récupère le sprite orienté au niveau de pyramide du zoom courant."""
+        ut = self.pyramid.get(unit_type)
         if not ut: return None
         cl = ut.get(color)
         if not cl: return None
         
         # On cherche la direction spécifiée, sinon "down", sinon la première disponible
-        base_surf = cl.get(direction) or cl.get("down") or next(iter(cl.values()))
-        
-        if abs(self.zoom - self.last_zoom) > 0.01:
-            self.scaled_cache.clear()
-            self.last_zoom = self.zoom
-            
-        cache_key = f"{unit_type}_{color}_{direction}"
-        if cache_key not in self.scaled_cache:
-            s_fact = self.zoom * 5.0
-            nw = max(1, int(base_surf.get_width() * s_fact))
-            nh = max(1, int(base_surf.get_height() * s_fact))
-            self.scaled_cache[cache_key] = pygame.transform.smoothscale(base_surf, (nw, nh))
-        return self.scaled_cache[cache_key]
+        levels = cl.get(direction) or cl.get("down") or next(iter(cl.values()))
+
+        self.select_zoom_level()
+        if self._level_exact:
+            return levels[self._level]
+
+        # Hors pyramide : redimensionnement rapide du niveau le plus proche
+        cache_key = (unit_type, color, direction)
+        surf = self.scaled_cache.get(cache_key)
+        if surf is None:
+            base = self.sprites[unit_type][color]
+            base_surf = base.get(direction) or base.get("down") or next(iter(base.values()))
+            nw = max(1, int(base_surf.get_width() * self._sprite_scale))
+            nh = max(1, int(base_surf.get_height() * self._sprite_scale))
+            surf = self.scaled_cache[cache_key] = pygame.transform.scale(levels[self._level], (nw, nh))
+        return surf
 
     def handle_input(self):
         for event in pygame.event.get():
@@ -177,6 +284,10 @@ class IsometricView(View):
                 if event.key == pygame.K_p: return "pause"
                 if event.key == pygame.K_k: return "accelerer"
                 if event.key == pygame.K_r: return "normal"
+                # Navigation dans un replay
+                if event.key == pygame.K_PAGEUP: return "seek_back"
+                if event.key == pygame.K_PAGEDOWN: return "seek_forward"
+                if event.key == pygame.K_HOME: return "seek_start"
             
                 if event.key == pygame.K_F9: return "switch_view"
                 if event.key == pygame.K_c: self.center_on_units()
@@ -213,11 +324,17 @@ class IsometricView(View):
     def draw_unit_counters(self, game_state):
         if self.ui_mode not in (1, 3): return
         y_off = 20
-        for p in game_state.get("players", []):
+        index = game_state.get("index")
+        for k, p in enumerate(game_state.get("players", [])):
             c_name = p.get("color", "white")
             counts = {"knight": 0, "pikeman": 0, "crossbowman": 0 , "longswordman": 0 , "eliteskirmisher": 0}
-            for u in p.get("units", []):
-                counts[symbol_to_type(u.get("symbol"))] += 1
+            if index is not None:
+                for (player, symbol), n in index.counts.items():
+                    if player == k:
+                        counts[symbol_to_type(symbol)] += n
+            else:
+                for u in p.get("units", []):
+                    counts[symbol_to_type(u.get("symbol"))] += 1
             
             header = self.font.render(f"PLAYER {c_name.upper()} : {len(p.get('units', []))}", True, pygame.Color(c_name))
             self.screen.blit(header, (20, y_off))
@@ -230,16 +347,26 @@ class IsometricView(View):
 
     def draw_minimap(self, game_state):
         if self.ui_mode not in (2, 3): return
-        pygame.draw.rect(self.screen, (25, 25, 25), self.minimap_rect)
-        pygame.draw.rect(self.screen, (150, 150, 150), self.minimap_rect, 1)
-        if not game_state or not hasattr(self, 'battle'): return
+        self._minimap_age += 1
+        if self._minimap is None or self._minimap_age >= self.minimap_every:
+            self._minimap_age = 0
+            self._minimap = self.build_minimap(game_state)
+        self.screen.blit(self._minimap, self.minimap_rect.topleft)
+
+    def build_minimap(self, game_state):
+        minimap = pygame.Surface(self.minimap_rect.size)
+        minimap.fill((25, 25, 25))
+        pygame.draw.rect(minimap, (150, 150, 150), minimap.get_rect(), 1)
+        if not game_state or not hasattr(self, 'battle'): return minimap
         
         mw, mh = self.battle.map.width, self.battle.map.height
+        size = self.minimap_size
+        x0, y0 = self.minimap_rect.topleft  # arrondis identiques au dessin direct à l'écran
         for p in game_state.get("players", []):
+            color = pygame.Color(p.get("color", "white"))
             for u in p.get("units", []):
-                mx = self.minimap_rect.x + (u["x"] / mw) * self.minimap_size
-                my = self.minimap_rect.y + (u["y"] / mh) * self.minimap_size
-                pygame.draw.rect(self.screen, p.get("color", "white"), (int(mx), int(my), 2, 2))
+                minimap.fill(color, (int(x0 + (u["x"] / mw) * size) - x0, int(y0 + (u["y"] / mh) * size) - y0, 2, 2))
+        return minimap
 
     def move_camera_to_minimap(self, pos):
         rx = (pos[0] - self.minimap_rect.x) / self.minimap_size
@@ -248,18 +375,77 @@ class IsometricView(View):
             self.camera_x, self.camera_y = rx * self.battle.map.width, ry * self.battle.map.height
             self.auto_follow = False
 
+    def cull_margin(self) -> int:
+        """Débord (pixels écran) d'une unité autour de son point au sol : sprite et ombre."""
+        self.select_zoom_level()
+        w, h = self._sprite_extent
+        return int(max(w, h, TILE) * self._sprite_scale) + 1
+
+    def screen_to_world(self, px, py):
+        """Point au sol (élévation 0) affiché en (px, py) : projection isométrique inverse."""
+        k = (TILE / 2) * self.zoom
+        d = (px - self.width / 2) / k    # tx - ty
+        s = (py - self.height / 2) / k   # tx + ty
+        return (s + d) / 2 + self.camera_x, (s - d) / 2 + self.camera_y
+
+    def world_bounds(self, margin: int):
+        """
+        Boîte englobante, en coordonnées monde, des points au sol visibles :
+        l'écran élargi de `margin` pixels (et du décalage d'élévation maximal
+        vers le bas) ramené par la projection isométrique inverse.
+        """
+        bottom = self.height + margin + MAX_ELEVATION * ELEVATION_STEP * self.zoom
+        corners = [self.screen_to_world(px, py)
+                   for px in (-margin, self.width + margin) for py in (-margin, bottom)]
+        xs, ys = [c[0] for c in corners], [c[1] for c in corners]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def terrain_covers_screen(self) -> bool:
+        """Vrai si le terrain recouvre tout l'écran (le fond devient inutile)."""
+        world_map = self.battle.world_map
+        lo, hi_x, hi_y = TILE, world_map.grid_w * TILE - TILE, world_map.grid_h * TILE - TILE
+        for px in (0, self.width):
+            for py in (0, self.height):
+                wx, wy = self.screen_to_world(px, py)
+                if not (lo <= wx <= hi_x and lo <= wy <= hi_y):
+                    return False
+        return True
+
+    def visible_units(self, game_state, margin: int):
+        """
+        (unité, couleur, ordre) dont le point au sol peut apparaître à l'écran ;
+        `ordre` trie comme les listes de l'état (joueur, puis unité).
+        """
+        colors = [p.get("color", "blue").lower() for p in game_state.get("players", [])]
+        index = game_state.get("index")
+        if index is None:
+            # État sans index (get_state() direct) : toutes les unités, déjà dans l'ordre
+            for k, (color, p) in enumerate(zip(colors, game_state.get("players", []))):
+                for rank, u in enumerate(p.get("units", [])):
+                    yield u, color, (k, rank)
+            return
+        for u, k, rank in index.query(*self.world_bounds(margin)):
+            yield u, colors[k], (k, rank)
+
     def render(self, game_state):
-        # Auto-follow
-        if self.auto_follow and getattr(self, "battle", None):
-            gs = self.battle.get_state()
-            all_u = [u for p in gs.get("players", []) for u in p.get("units", [])]
-            if all_u:
-                tx, ty = sum(u["x"] for u in all_u)/len(all_u), sum(u["y"] for u in all_u)/len(all_u)
+        # Auto-follow (sur l'état reçu : pas de get_state() supplémentaire par frame)
+        if self.auto_follow and game_state:
+            index = game_state.get("index")
+            if index is not None:
+                center = index.centroid()
+            else:
+                all_u = [u for p in game_state.get("players", []) for u in p.get("units", [])]
+                center = (sum(u["x"] for u in all_u)/len(all_u), sum(u["y"] for u in all_u)/len(all_u)) if all_u else None
+            if center:
+                tx, ty = center
                 self.camera_x += (tx - self.camera_x) * self.follow_smooth
                 self.camera_y += (ty - self.camera_y) * self.follow_smooth
 
-        # Dessin Background
-        if self.bg:
+        # Dessin Background (inutile si le terrain recouvre l'écran)
+        has_map = hasattr(self, 'battle')
+        if has_map and self.terrain_covers_screen():
+            pass
+        elif self.bg:
             cx, cy = iso_project(self.camera_x, self.camera_y)
             ox, oy = int(cx * self.zoom) % self.bg.get_width(), int(cy * self.zoom) % self.bg.get_height()
             self.screen.blit(self.bg, (-ox, -oy))
@@ -268,60 +454,220 @@ class IsometricView(View):
             self.screen.blit(self.bg, (-ox + self.bg.get_width(), -oy + self.bg.get_height()))
         else: self.screen.fill((40, 40, 50))
 
+        if has_map:
+            self.draw_terrain()
+
         if not game_state: return
 
-        render_list = []
-        for p in game_state.get("players", []):
-            color = p.get("color", "blue").lower()
-            for u in p.get("units", []):
-                # DETERMINATION DE LA DIRECTION POUR LE SPRITE
-                # Si l'unité a une cible, elle regarde vers elle, sinon vers son mouvement
-                order = u.get("order_type")
-                look_vx, look_vy = 0, 0
-                
-                # Récupération de la direction depuis l'objet réel si possible
-                # (Assumes l'unité stocke sa 'direction' calculée dans Unit.update)
-                direction = u.get("direction", "down")
-                
-                surf = self.get_scaled_sprite(symbol_to_type(u.get("symbol")), color, direction)
-                if surf:
-                    sx, sy = self.world_to_screen(u["x"], u["y"])
-                    el = self.battle.world_map.get_elevation_at(u["x"], u["y"])
-                    render_list.append((sy, surf, sx, sy, el))
-
-        # Tri par profondeur (Z-ordering)
-        render_list.sort(key=lambda e: e[0])
-        v_s = self.zoom * 5.0 
-
-        for _, surf, sx, sy, el in render_list:
-            # Ancrage : centre horizontal, bas du sprite
-            ax, ay = surf.get_width() // 2, int(surf.get_height() * 0.85)
-            
-            # 1. SOL (Indicateur sobre d'élévation)
-            if el > 0:
-                terrain_color = (60, 80, 60) if el == 1 else (90, 110, 90)
-                pygame.draw.circle(self.screen, terrain_color, (sx, sy), int(TILE * 0.6 * self.zoom))
-
-            # 2. OMBRE
-            sh_w, sh_h = TILE * 0.8 * v_s, TILE * 0.4 * v_s
-            shadow = pygame.Surface((int(sh_w), int(sh_h)), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow, (0, 0, 0, 70), shadow.get_rect())
-            self.screen.blit(shadow, (sx - sh_w // 2, sy - sh_h // 2))
-            
-            # 3. UNITÉ
-            self.screen.blit(surf, (sx - ax, sy - ay))
+        # Tri par profondeur (Z-ordering) : un seau par ligne d'écran (sy entier),
+        # trié par (joueur, unité) : même ordre qu'un tri stable des listes sur sy
+        margin = self.cull_margin()
+        rows = [[] for _ in range(self.height + 2 * margin + 1)]
+        world_map = self.battle.world_map
+        W, H = self.width, self.height
+        for u, color, order in self.visible_units(game_state, margin):
+            # Direction calculée par Unit.update (transmise dans l'état)
+            surf = self.get_scaled_sprite(symbol_to_type(u.get("symbol")), color, u.get("direction", "down"))
+            if not surf:
+                continue
+            el = world_map.get_elevation_at(u["x"], u["y"])
+            sx, sy = self.world_to_screen(u["x"], u["y"], el)
+            # Culling précis à l'écran (sprite ancré en bas, 0.85 de sa hauteur au-dessus du sol)
+            w, h = surf.get_size()
+            if sx + w < 0 or sx - w > W or sy - h > H or sy + h < 0:
+                continue
+            rows[min(max(sy + margin, 0), len(rows) - 1)].append((order, surf, sx, sy))
+
+        shadow = self.get_shadow()
+        sh_w, sh_h = shadow.get_size()
+        batch = []
+        for row in rows:
+            if not row:
+                continue
+            if len(row) > 1:
+                row.sort(key=itemgetter(0))
+            for _, surf, sx, sy in row:
+                # 1. OMBRE
+                batch.append((shadow, (sx - sh_w // 2, sy - sh_h // 2)))
+                # 2. UNITÉ (ancrage : centre horizontal, bas du sprite)
+                batch.append((surf, (sx - surf.get_width() // 2, sy - int(surf.get_height() * 0.85))))
+        self.screen.blits(batch, doreturn=False)
 
         self.draw_unit_counters(game_state)
         self.draw_minimap(game_state)
         pygame.display.flip()
         self.clock.tick(60)
 
-    def world_to_screen(self, wx, wy):
+    # ---- Terrain ----
+
+    def terrain_layer(self, settled: bool):
+        """
+        [tuiles, blocs] du zoom courant : une tuile pré-dessinée par niveau
+        d'élévation et les blocs déjà composés. Les grandes tuiles ne sont
+        dessinées qu'une fois le zoom stabilisé (`settled`), jamais au zoom
+        extrême. Le cache est vidé si le relief de la carte change.
+        """
+        world_map = self.battle.world_map
+        if world_map is not self._terrain_map:
+            grid = world_map.elevation_grid
+            if self._terrain_grid is None or not np.array_equal(grid, self._terrain_grid):
+                self.terrain_layers.clear()
+                self._terrain_grid = grid.copy()
+                self._terrain_rows = grid.tolist()
+            self._terrain_map = world_map
+        key = round(self.zoom, 6)
+        layer = self.terrain_layers.get(key)
+        if layer is None:
+            if len(self.terrain_layers) >= TERRAIN_ZOOM_LAYERS:
+                self.terrain_layers.popitem(last=False)
+            layer = self.terrain_layers[key] = [[], OrderedDict()]
+        else:
+            self.terrain_layers.move_to_end(key)
+        tile_px = 2 * TILE * (TILE / 2) * self.zoom
+        if not layer[0] and (tile_px <= TERRAIN_CHUNK_PX or (settled and tile_px <= TERRAIN_TILE_MAX_PX)):
+            levels = max(MAX_ELEVATION, int(self._terrain_grid.max())) + 1
+            layer[0] = [self.build_terrain_tile(el) for el in range(levels)]
+        return layer
+
+    def draw_tile(self, target, px, py, el):
+        """Tuile de niveau `el` dont le coin haut, au sol, est en (px, py) : flanc puis dessus."""
+        ai = int(math.ceil(TILE * (TILE / 2) * self.zoom))  # arrondi par excès : pas de jour entre tuiles
+        color = TERRAIN_COLORS[min(el, len(TERRAIN_COLORS) - 1)]
+        h = round(el * ELEVATION_STEP * self.zoom)
+        top = py - h
+        if h:
+            side = tuple(int(c * TERRAIN_SIDE_SHADE) for c in color)
+            pygame.draw.polygon(target, side, [
+                (px - ai, top + ai), (px, top + 2 * ai), (px + ai, top + ai),
+                (px + ai, py + ai), (px, py + 2 * ai), (px - ai, py + ai),
+            ])
+        pygame.draw.polygon(target, color, [
+            (px, top), (px + ai, top + ai), (px, top + 2 * ai), (px - ai, top + ai),
+        ])
+
+    def build_terrain_tile(self, el):
+        """Tuile isolée (fond TERRAIN_KEY transparent), coin haut au sol en (ai, h)."""
+        ai = int(math.ceil(TILE * (TILE / 2) * self.zoom))
+        h = round(el * ELEVATION_STEP * self.zoom)
+        tile = pygame.Surface((2 * ai + 1, 2 * ai + h + 1))
+        tile.fill(TERRAIN_KEY)
+        self.draw_tile(tile, ai, h, el)
+        tile.set_colorkey(TERRAIN_KEY, pygame.RLEACCEL)
+        return tile
+
+    def tile_positions(self, ix0, ix1, iy0, iy1, ox, oy):
+        """(ix, iy, px, py) des tuiles [ix0, ix1) x [iy0, iy1), de l'arrière vers l'avant."""
+        a = TILE * (TILE / 2) * self.zoom   # demi-largeur d'une tuile à l'écran
+        for s in range(ix0 + iy0, ix1 + iy1 - 1):
+            for ix in range(max(ix0, s - iy1 + 1), min(ix1, s - iy0 + 1)):
+                iy = s - ix
+                yield ix, iy, ox + round((ix - iy) * a), oy + round((ix + iy) * a)
+
+    def build_terrain_chunk(self, tiles, bx, by, size):
+        """Bloc de size x size tuiles composé à partir des tuiles pré-dessinées."""
+        gw, gh = self.battle.world_map.grid_w, self.battle.world_map.grid_h
+        ix0, iy0 = bx * size, by * size
+        ix1, iy1 = min(ix0 + size, gw), min(iy0 + size, gh)
+        a = TILE * (TILE / 2) * self.zoom
+        ai = int(math.ceil(a))
+        lift = max(t.get_height() for t in tiles) - (2 * ai + 1)
+        # Coin haut du bloc (tuile ix0, iy0) placé en (left, lift) dans la surface
+        left = int(math.ceil((iy1 - iy0) * a)) + 1
+        width = left + int(math.ceil((ix1 - ix0) * a)) + 2
+        height = lift + int(math.ceil((ix1 - ix0 + iy1 - iy0) * a)) + 2
+        chunk = pygame.Surface((width, height))
+        chunk.fill(TERRAIN_KEY)
+        gx, gy = round((ix0 - iy0) * a), round((ix0 + iy0) * a)
+        rows = self._terrain_rows
+        batch = []
+        for ix, iy, px, py in self.tile_positions(ix0, ix1, iy0, iy1, left - gx, lift - gy):
+            tile = tiles[rows[ix][iy]]
+            batch.append((tile, (px - ai, py + 2 * ai + 1 - tile.get_height())))
+        chunk.blits(batch, doreturn=False)
+        chunk.set_colorkey(TERRAIN_KEY, pygame.RLEACCEL)
+        return chunk, (gx - left, gy - lift)
+
+    def draw_terrain(self):
+        """
+        Fond de terrain : les blocs visibles en un blits(). Tant qu'il en manque
+        (zoom qui change, zone découverte), les tuiles visibles sont posées
+        directement et au plus TERRAIN_BUILDS_PER_FRAME blocs sont composés par
+        image, une fois le zoom stabilisé : zoomer ne provoque pas de rafale.
+        """
+        world_map = self.battle.world_map
+        gw, gh = world_map.grid_w, world_map.grid_h
+        settled = self.zoom == self._terrain_last_zoom
+        self._terrain_last_zoom = self.zoom
+        tiles, chunks = self.terrain_layer(settled)
+        a = TILE * (TILE / 2) * self.zoom
+        W, H = self.width, self.height
+        # Position entière du coin (0, 0) de la carte à l'écran (commune à tous les blocs)
+        cx, cy = iso_project(-self.camera_x, -self.camera_y)
+        ox = round(cx * self.zoom + W / 2)
+        oy = round(cy * self.zoom + H / 2)
+
+        # Cases dont le sol peut apparaître (flancs compris)
+        lift = int(self._terrain_grid.max()) * ELEVATION_STEP * self.zoom
+        margin = int(math.ceil(lift + 2 * a)) + 1
+        x0, y0, x1, y1 = self.world_bounds(margin)
+        ix0, iy0 = max(0, int(x0 // TILE)), max(0, int(y0 // TILE))
+        ix1, iy1 = min(gw, int(x1 // TILE) + 1), min(gh, int(y1 // TILE) + 1)
+        if ix0 >= ix1 or iy0 >= iy1:
+            return
+
+        rows = self._terrain_rows
+        if not tiles:
+            # Zoom extrême ou en cours : quelques grandes tuiles, tracées directement
+            for ix, iy, px, py in self.tile_positions(ix0, ix1, iy0, iy1, ox, oy):
+                self.draw_tile(self.screen, px, py, rows[ix][iy])
+            return
+
+        # Blocs dont l'emprise à l'écran (losanges surélevés compris) est visible ;
+        # une tuile plus grande qu'un bloc est posée directement
+        size = max(1, int(TERRAIN_CHUNK_PX // (2 * a)))
+        if 2 * a > TERRAIN_CHUNK_PX:
+            bx0, bx1, by0, by1 = 0, -1, 0, -1
+        else:
+            bx0, bx1, by0, by1 = ix0 // size, (ix1 - 1) // size, iy0 // size, (iy1 - 1) // size
+        visible = []
+        for s in range(bx0 + by0, bx1 + by1 + 1):
+            for bx in range(max(bx0, s - by1), min(bx1, s - by0) + 1):
+                by = s - bx
+                tx0, ty0 = bx * size, by * size
+                nx, ny = min(tx0 + size, gw) - tx0, min(ty0 + size, gh) - ty0
+                tx, ty = ox + (tx0 - ty0) * a, oy + (tx0 + ty0) * a
+                if not (tx - ny * a > W or tx + nx * a < 0 or ty - lift > H or ty + (nx + ny) * a < 0):
+                    visible.append((bx, by))
+
+        missing = [key for key in visible if key not in chunks]
+        if settled:
+            for key in missing[:TERRAIN_BUILDS_PER_FRAME]:
+                chunks[key] = self.build_terrain_chunk(tiles, key[0], key[1], size)
+                if len(chunks) > TERRAIN_MAX_CHUNKS:
+                    chunks.popitem(last=False)
+            missing = missing[TERRAIN_BUILDS_PER_FRAME:]
+
+        batch = []
+        if missing or not visible or any(key not in chunks for key in visible):
+            ai = int(math.ceil(a))
+            for ix, iy, px, py in self.tile_positions(ix0, ix1, iy0, iy1, ox, oy):
+                if -ai <= px <= W + ai and -2 * ai <= py - lift and py <= H:
+                    tile = tiles[rows[ix][iy]]
+                    batch.append((tile, (px - ai, py + 2 * ai + 1 - tile.get_height())))
+        else:
+            for key in visible:
+                chunks.move_to_end(key)
+                chunk, (dx, dy) = chunks[key]
+                batch.append((chunk, (ox + dx, oy + dy)))
+        self.screen.blits(batch, doreturn=False)
+
+    def world_to_screen(self, wx, wy, elevation=None):
         tx, ty = wx - self.camera_x, wy - self.camera_y
         sx, sy = iso_project(tx, ty)
-        elevation = self.battle.world_map.get_elevation_at(wx, wy)
+        if elevation is None:
+            elevation = self.battle.world_map.get_elevation_at(wx, wy)
         # Décalage vertical sobre par niveau
-        height_offset = elevation * 15.0 * self.zoom
+        height_offset = elevation * ELEVATION_STEP * self.zoom
         return round(sx * self.zoom + self.width/2), round((sy * self.zoom) - height_offset + self.height/2)
 
     def center_on_units(self, initial_game_state=None):
@@ -334,11 +680,15 @@ class IsometricView(View):
 
     def on_enter(self, battle, game_state):
         self.battle = battle
+        self._minimap = None
         self.load_sprites()
         self.center_on_units(game_state)
         self.auto_follow = True
 
     def on_exit(self): 
         self.sprites.clear()
+        self.pyramid.clear()
         self.scaled_cache.clear()
+        self.shadow_cache.clear()
+        self.terrain_layers.clear()
         pygame.quit()
\ No newline at end of file
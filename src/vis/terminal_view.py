@@ -93,6 +93,14 @@ class TerminalView(View) :
         if key== ord('k') or key == ord('K'):
             return "accelerer"
 
+        # Navigation dans un replay
+        if key == curses.KEY_PPAGE:
+            return "seek_back"
+        if key == curses.KEY_NPAGE:
+            return "seek_forward"
+        if key == curses.KEY_HOME:
+            return "seek_start"
+
         """#Recentrer caméra
         if key== ord('c'):
             self.center_camera(game_state)"""
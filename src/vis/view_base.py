@@ -1,5 +1,156 @@
 from abc import ABC, abstractmethod
 
+VIEW_CELL = 128.0  # côté des cellules de ViewIndex (4 tuiles)
+
+
+class ViewIndex:
+    """
+    Index spatial des unités d'un état de vue (dicts de StateMirror), tenu à
+    jour avec les deltas : une vue ne parcourt que les cellules qu'elle
+    affiche. Garde aussi la somme des positions (barycentre du suivi caméra)
+    et le nombre d'unités par (joueur, symbole) (compteurs du HUD).
+    Chaque unité reçoit un rang d'insertion : (joueur, rang) redonne l'ordre
+    des listes d'unités de l'état.
+    """
+
+    def __init__(self, cell_size: float = VIEW_CELL):
+        self.cell_size = float(cell_size)
+        self.cells = {}    # (cx, cy) -> {id: (dict unité, indice du joueur, rang)}
+        self._where = {}   # id -> (cellule, x, y, joueur, symbole, rang) à la dernière indexation
+        self._next_rank = 0
+        self.counts = {}   # (joueur, symbole) -> unités
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def clear(self):
+        self.cells.clear()
+        self._where.clear()
+        self.counts.clear()
+        self.sum_x = self.sum_y = 0.0
+        self._next_rank = 0
+
+    def place(self, u, player: int):
+        """Ajoute l'unité ou suit son déplacement."""
+        uid, x, y = u["id"], u["x"], u["y"]
+        cs = self.cell_size
+        key = (int(x // cs), int(y // cs))
+        old = self._where.get(uid)
+        if old is not None:
+            self.sum_x -= old[1]
+            self.sum_y -= old[2]
+            if old[0] != key:
+                self._drop(uid, old[0])
+            rank = old[5]
+        else:
+            kind = (player, u["symbol"])
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            rank = self._next_rank
+            self._next_rank += 1
+        if old is None or old[0] != key:
+            self.cells.setdefault(key, {})[uid] = (u, player, rank)
+        self._where[uid] = (key, x, y, player, u["symbol"], rank)
+        self.sum_x += x
+        self.sum_y += y
+
+    def remove(self, uid):
+        old = self._where.pop(uid, None)
+        if old is not None:
+            self.sum_x -= old[1]
+            self.sum_y -= old[2]
+            self._drop(uid, old[0])
+            self.counts[old[3:5]] -= 1
+
+    def _drop(self, uid, key):
+        bucket = self.cells[key]
+        del bucket[uid]
+        if not bucket:
+            del self.cells[key]
+
+    def centroid(self):
+        n = len(self._where)
+        return (self.sum_x / n, self.sum_y / n) if n else None
+
+    def query(self, x0: float, y0: float, x1: float, y1: float):
+        """Itère sur les (unité, joueur, rang) des cellules qui recouvrent [x0, x1] x [y0, y1]."""
+        cs = self.cell_size
+        cx0, cx1 = int(x0 // cs), int(x1 // cs)
+        cy0, cy1 = int(y0 // cs), int(y1 // cs)
+        cells = self.cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) >= len(cells):
+            # Vue plus large que la zone occupée : on filtre les cellules non vides
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield from bucket.values()
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket.values()
+
+
+class StateMirror:
+    """
+    Copie locale de l'état de la bataille, tenue à jour avec
+    Battle.get_state_delta() : seules les unités modifiées sont recopiées
+    (les dicts existants sont mis à jour sur place).
+
+    'state' garde la forme de get_state() ; 'players[i]["units"]' est une
+    vue sur un dict id -> unité (itérable et len(), pas d'indexation) et
+    'state["index"]' un ViewIndex de ces mêmes unités.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.state = None
+        self._units = []
+        self.index = ViewIndex()
+
+    def reset(self):
+        self.version = None
+        self.state = None
+        self._units = []
+        self.index = ViewIndex()
+
+    def pull(self, battle):
+        self.apply(battle.get_state_delta(self.version))
+        return self.state
+
+    def apply(self, delta):
+        index = self.index
+        if delta.get("keyframe") or self.state is None:
+            self._units = [{u["id"]: u for u in p["units"]} for p in delta["players"]]
+            self.state = delta
+            index.clear()  # reconstruit : les sommes de positions repartent de zéro
+            for k, by_id in enumerate(self._units):
+                for u in by_id.values():
+                    index.place(u, k)
+        else:
+            for k, (by_id, p) in enumerate(zip(self._units, delta["players"])):
+                for u in p["units"]:
+                    current = by_id.get(u["id"])
+                    if current is None:
+                        by_id[u["id"]] = current = u
+                    else:
+                        current.update(u)
+                    index.place(current, k)
+            for uid in delta["removed"]:
+                for by_id in self._units:
+                    by_id.pop(uid, None)
+                index.remove(uid)
+            for mirror_p, p in zip(self.state["players"], delta["players"]):
+                mirror_p["alive_units"] = p["alive_units"]
+            for key in ("game_time", "total_time", "finished", "winner", "_step"):
+                self.state[key] = delta[key]
+        for mirror_p, by_id in zip(self.state["players"], self._units):
+            mirror_p["units"] = by_id.values()
+        self.state["index"] = index
+        self.version = delta["version"]
+
+
 class View(ABC):
     """
     Classe abstraite pour toutes les vues (Terminal, Isometric, etc.).